@@ -42,6 +42,7 @@ class Keybindings:
             "switch_main": parent.switch_main,
             "undo": parent.core.undo_last_move,
             "redo": parent.core.redo_last_move,
+            "computer_move": parent.core.computer_move,
             "focus_input": parent.focus_input,
         }
         # The parent whose keybindings these are
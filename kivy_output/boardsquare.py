@@ -1,4 +1,4 @@
-from typing import Iterable, Generator
+from typing import Generator, Optional
 
 from kivy.uix.button import Button
 
@@ -65,23 +65,21 @@ class BoardSquare(Button):
     def valid_moves(
             self,
             current_board: shogi.Board,
-            checking_spaces: Iterable[shogi.AbsoluteCoord]
+            safety: Optional[shogi.KingSafety] = None
     ) -> Generator:
         """Get valid moves for square, given current board.
 
-        This function takes an iterable of spaces checking the king
-        and the current board state in order to produce the set of
-        spaces to which it may travel.
+        This function takes the safety of the king and the current
+        board state in order to produce the set of spaces to which it
+        may travel.
 
         :param current_board: current board position
-        :param checking_spaces: spaces checking king
+        :param safety: safety of the king, if already worked out
         :return: set of valid spaces
         """
-        current_piece = current_board[self.board_position]
         # Test each of the spaces the piece could possibly move to
         yield from shogi.test_spaces(
             current_board,
             self.board_position,
-            current_piece.valid_spaces(),
-            checking_spaces=checking_spaces
+            safety=safety
         )
@@ -1,3 +1,4 @@
+import threading
 from collections import deque
 from typing import Dict, List, Optional, Deque
 
@@ -5,6 +6,7 @@ from kivy.clock import Clock
 from kivy.uix.widget import Widget
 
 import shogi
+from shogi import engine
 from .boardsquare import BoardSquare
 from .capturedsquare import CapturedSquare
 from .inputs import MateWindow, PromotionWindow
@@ -21,11 +23,14 @@ class AppCore(Widget):
     :ivar make_move: whether next click highlights or moves
     :ivar move_from: space where the next move starts
     :ivar in_check: pieces checking each king, arranged by color
+    :ivar safety: safety of the king of the player to move
     :ivar to_add: piece to be dropped
     :ivar to_promote: whether or not to promote the piece
     :ivar game_log: log of current game
     :ivar undone_moves: log of moves that have been undone
     :ivar popup_open: whether or not the promotion popup is open
+    :ivar thinking: whether or not the computer is searching for a move
+    :ivar engine_limits: limits of the computer's search
     :ivar captured_spaces: index of CapturedGrids for each color
     :ivar main_board: Kivy widget representing the main board
     :ivar board_spaces: Dict of coords to each Kivy board space
@@ -45,11 +50,14 @@ class AppCore(Widget):
             shogi.Color(0): set(),
             shogi.Color(1): set()
         }
+        self.safety: Optional[shogi.KingSafety] = None
         self.to_add: shogi.Piece = shogi.NoPiece()
         self.to_promote: Optional[bool] = None
         self.game_log: List[List[shogi.Move]] = []
         self.undone_moves: Deque[shogi.Move] = deque()
         self.popup_open: bool = False
+        self.thinking: bool = False
+        self.engine_limits: engine.Limits = engine.Limits(time=5.0)
         # Vars set in _set_id_based:
         self.captured_spaces: Dict[shogi.Color, Widget] = {}
         self.main_board: shogi.Board = None
@@ -76,18 +84,12 @@ class AppCore(Widget):
         """
         move = (current, to)
         # If the move is not legal, end right there
-        if not shogi.check_move(
-            self.board,
-            move,
-            checking_spaces=(
-                x for x in self.in_check[self.board.current_player]
-                if x != to
-            )
-        ):
+        self.safety = shogi.king_safety(self.board, safety=self.safety)
+        if not shogi.check_move(self.board, move, self.safety):
             return
+        piece = self.board[current]
         captured_piece = self.board[to]
-        self.board.move(*move)
-        can_promote = self.board.can_promote(to)
+        can_promote = self.board.can_promote(to, piece)
 
         # Standard cleanup call, needed b/c execution continues when a
         # popup window is opened, for some reason
@@ -98,8 +100,8 @@ class AppCore(Widget):
         )
 
         # Handle promotion and call cleanup function
-        if can_promote and not self.board[to].is_promoted:
-            if self.board.auto_promote(to):
+        if can_promote and not piece.is_promoted:
+            if self.board.auto_promote(to, piece):
                 self.to_promote = True
                 std_cleanup()
             else:
@@ -116,13 +118,12 @@ class AppCore(Widget):
             captured_piece: shogi.Piece = None,
             dropped_piece: shogi.Piece = None,
             clear_undone: bool = True,
-            update_game_log: bool = True,
     ):
         """Cleanup operations for a piece move.
 
-        This function is called as a byproduct of make_moves.
-        It runs all of the post-move cleanup, and the check and mate
-        validation.
+        This function is called as a byproduct of make_moves and
+        drop_piece. It makes the move on the board, and runs all of
+        the post-move cleanup, and the check and mate validation.
         It modifies the state of the application, and so it probably
         should not be called by itself without good cause.
 
@@ -130,25 +131,29 @@ class AppCore(Widget):
         :param captured_piece: piece captured (None if no capture)
         :param dropped_piece: piece to be dropped, if it is a drop
         :param clear_undone: if the undone moves should be cleared
-        :param update_game_log: if game log should be updated
         """
         self.popup_open = False
         current, to = move
         is_a_capture = bool(captured_piece)
-        if self.to_promote:
-            self.board.promote(to)
+        # Make the move (which also flips the turn), so it can be
+        # undone exactly later on
+        self.board.make(shogi.MoveRecord(
+            current,
+            to,
+            self.board[current] if dropped_piece is None else dropped_piece,
+            is_promote=self.to_promote
+        ))
         is_in_check = shogi.is_check(
             self.board,
             move,
-            self.board.other_player,
+            self.board.current_player,
             dropped_piece=dropped_piece
         )
-        # Run mate stuff, if there is a check
+        self.board.checkers = is_in_check
+        # Run mate stuff, if there is a check: it's mate if the
+        # player in check has no legal moves
         if is_in_check:
-            mate = shogi.mate_check(
-                self.board,
-                is_in_check
-            )
+            mate = next(shogi.generate_moves(self.board), None) is None
             if mate:
                 pops = MateWindow()
                 pops.open()
@@ -156,18 +161,15 @@ class AppCore(Widget):
         else:
             mate = False
         # Update the spaces attacking the king
-        self.in_check[self.board.other_player] = is_in_check
-        # Update the game log, but only if permitted
-        # Not called when undoing a move, for example
-        if update_game_log:
-            self.update_game_log(
-                move,
-                is_a_capture=is_a_capture,
-                captured_piece=captured_piece,
-                is_a_promote=self.to_promote,
-                is_a_drop=(dropped_piece is not None),
-                is_mate=(mate if is_in_check else None)
-            )
+        self.in_check[self.board.current_player] = is_in_check
+        self.update_game_log(
+            move,
+            is_a_capture=is_a_capture,
+            captured_piece=captured_piece,
+            is_a_promote=self.to_promote,
+            is_a_drop=(dropped_piece is not None),
+            is_mate=(mate if is_in_check else None)
+        )
         # Clear the undone moves log (prevents weird breakage with
         # redoing into a weird state)
         # Not called when undoing or redoing a move, e.g.
@@ -175,7 +177,6 @@ class AppCore(Widget):
             self.undone_moves.clear()
         # Reset all of the game-state variables back to their pre-
         # move states, ready for the next turn
-        self.board.flip_turn()
         self.make_move = False
         self.move_from = shogi.NullCoord()
         self.to_add = None
@@ -193,14 +194,15 @@ class AppCore(Widget):
         :param space_to: space to drop piece at
         """
         if shogi.is_legal_drop(self.board, self.to_add, space_to):
-            self.board.put_in_play(self.to_add, space_to)
-            self.update_board(space_to)
-            self.update_captured(self.board)
             self.cleanup((None, space_to), dropped_piece=self.to_add)
+            self.update_captured(self.board)
 
     def undo_last_move(self):
         """Undo the last move made."""
 
+        # The board can't change under the computer's search
+        if self.thinking:
+            return
         # If the game log does not exist (e.g. undoing before the
         # first move), don't do anything
         if not self.game_log:
@@ -210,51 +212,23 @@ class AppCore(Widget):
         last_move = self.game_log[-1].pop()
         if not self.game_log[-1]:
             self.game_log.pop()
-        # If the last move was a drop, un-drop the piece
-        if last_move.is_drop:
-            self.board.un_drop(last_move.end)
-        # Otherwise, move the piece backwards
-        else:
-            self.board.move(last_move.end, last_move.start)
-            # Undo any capturing, if it happened
-            if last_move.is_capture:
-                in_play = last_move.captured_piece.flip_sides()
-                if in_play.prom:
-                    in_play = in_play.demote()
-                self.board.put_in_play(
-                    in_play,
-                    last_move.end,
-                    player=last_move.captured_piece.color.other,
-                    flip_sides=True
-                )
-                if last_move.captured_piece.prom:
-                    self.board.promote(last_move.end)
-            # Demote the piece, if it was promoted
-            if last_move.is_promote:
-                self.board.demote(last_move.start)
-        if self.game_log:
-            # Fix the game log to reflect the new reality
-            earlier_move = self.game_log[-1][-1]
-            self.cleanup(
-                earlier_move.tuple,
-                captured_piece=earlier_move.captured_piece,
-                dropped_piece=(earlier_move.piece
-                               if earlier_move.is_drop
-                               else None),
-                clear_undone=False,    # Don't update the game log in
-                update_game_log=False  # the cleanup, that'd be bad
-            )
+        # Take the move back, which restores the board (and the
+        # pieces that were checking the king) exactly
+        self.board.unmake()
+        self.in_check[self.board.current_player] = (
+            self.board.checkers or set()
+        )
+        self.in_check[self.board.other_player] = set()
         # A little more undo-specific cleanup and window-displaying
         self.undone_moves.append(last_move)
         self.update_board(*last_move)
         self.update_captured(self.board)
         self.parent.ids['moves'].remove_last()
-        # Change the turn explicitly, as bad things can happen if
-        # you're not careful about this kind of stuff
-        self.board.current_player = last_move.player_color
 
     def redo_last_move(self):
         """Redo the last move undone."""
+        if self.thinking:
+            return
         # If there's no undone moves, simply return without doing
         # anything. Otherwise, get the last undone move.
         try:
@@ -268,8 +242,56 @@ class AppCore(Widget):
         else:
             # Otherwise, make the move from and to
             self.make_moves(last_move.start, last_move.end, clear_undone=False)
-        # Again, explicitly set the turn, just in case
-        self.board.current_player = last_move.player_color.other
+
+    def computer_move(self, limits: Optional[engine.Limits] = None):
+        """Let the computer make the next move.
+
+        The search runs on a copy of the board in another thread, so
+        the window keeps responding; the move is made once it is done,
+        and until then no other move can be.
+
+        :param limits: limits of the computer's search
+        """
+        if self.popup_open or self.thinking:
+            return
+        if limits is None:
+            limits = self.engine_limits
+        self.thinking = True
+        threading.Thread(
+            target=self._search, args=(self.board.pack(), limits),
+            daemon=True
+        ).start()
+
+    def _search(self, data: bytes, limits: engine.Limits):
+        """Search for the computer's move, off the main thread.
+
+        :param data: position to search, from Board.pack
+        :param limits: limits of the search
+        """
+        try:
+            move = engine.best_move(shogi.Board.unpack(data), limits)
+        except Exception:
+            # Let the board be used again before passing it on
+            Clock.schedule_once(lambda _: self._play_computer_move(None))
+            raise
+        # Kivy widgets may only be changed from the main thread
+        Clock.schedule_once(lambda _: self._play_computer_move(move))
+
+    def _play_computer_move(self, move: Optional[shogi.MoveRecord]):
+        """Make the move the computer found.
+
+        :param move: move to make (None if there is none)
+        """
+        self.thinking = False
+        # If there's no legal move, the game is already over
+        if move is None:
+            return
+        self.to_promote = move.is_promote
+        if move.is_drop:
+            self.to_add = move.piece
+            self.drop_piece(move.end)
+        else:
+            self.cleanup((move.start, move.end), captured_piece=move.captured)
 
     # Lighting methods
     def light_moves(self, coordinate: shogi.AbsoluteCoord):
@@ -290,11 +312,11 @@ class AppCore(Widget):
         # If the pressed square is not highlighted, and it belongs to
         # the player, do the highlighting
         if do_highlight and players_piece:
-            # Light up every square it's possible to move to
-            for space in pressed_square.valid_moves(
-                self.board,
-                self.in_check[pressed_piece.color]
-            ):
+            # Light up every square it's possible to move to. The
+            # king's safety is only worked out again once the board
+            # has changed
+            self.safety = shogi.king_safety(self.board, safety=self.safety)
+            for space in pressed_square.valid_moves(self.board, self.safety):
                 self.board_spaces[space].light()
             # Light the pressed square
             pressed_square.light()
@@ -330,9 +352,8 @@ class AppCore(Widget):
             # Start with a blank slate
             self.un_light_all()
             # Light every legally-drop-able space
-            for space, x in self.board_spaces.items():
-                if shogi.is_legal_drop(self.board, piece, space):
-                    x.light()
+            for space in shogi.legal_drop_squares(self.board, piece):
+                self.board_spaces[space].light()
             # Set game-state variables to reflect the new developments
             self.make_move = True
 
@@ -394,6 +415,8 @@ class AppCore(Widget):
 
         :param square: square pressed
         """
+        if self.thinking:
+            return
         # If the square is not occupied, ignore it
         if not square.occupant.is_color(self.board.current_player):
             return
@@ -421,6 +444,8 @@ class AppCore(Widget):
 
         :param coordinate: where board was clicked
         """
+        if self.thinking:
+            return
         # If this is the click marking where to move:
         if self.make_move and coordinate != self.move_from:
             # If there is a piece to drop, drop it
@@ -439,12 +464,27 @@ class AppCore(Widget):
         :param text: text entered
         """
         # If text makes a valid coordinate, pretend it was clicked.
-        # Otherwise, do nothing
+        # If it is a whole move in notation, make it. Otherwise, do
+        # nothing
         try:
             coordinate = shogi.AbsoluteCoord(text)
         except ValueError:
+            pass
+        else:
+            self.board_pressed(coordinate)
             return
-        self.board_pressed(coordinate)
+        if self.popup_open or self.thinking:
+            return
+        try:
+            move = shogi.parse_notation(self.board, text)
+        except ValueError:
+            return
+        self.to_promote = move.is_promote
+        if move.is_drop:
+            self.to_add = move.piece
+            self.drop_piece(move.end)
+        else:
+            self.cleanup((move.start, move.end), captured_piece=move.captured)
 
     def _set_id_based(self, _):
         """Set id based variables.
@@ -5,11 +5,17 @@ module.
 """
 
 from .aliases import *
+from .attackmap import *
+from .bitboards import *
 from .boards import *
 from .exceptions import *
 from .information import *
 from .locations import *
+from .mailbox import *
+from .packing import *
 from .pieceattrs import *
 from .pieces import *
 from .rows import *
+from .sfen import *
 from .themove import *
+from .valuation import *
@@ -0,0 +1,126 @@
+"""Attack maps, kept up to date as the board changes.
+
+For each square, the map keeps which squares hold a piece attacking
+it, and how many pieces of each color do, so "is this square
+attacked" is a lookup rather than a search outward from the square.
+
+Only two kinds of piece can attack differently after a square
+changes: the piece on that square, and the pieces already attacking
+it (a slider attacking a square is blocked there if it fills up, and
+reaches past it if it empties). So after each change, just those
+pieces have their attacks worked out again.
+"""
+
+from typing import FrozenSet, List, Set
+
+from . import attacks
+
+__all__ = [
+    "AttackMap",
+    "attacked_from",
+]
+
+
+def attacked_from(squares: bytearray, index: int) -> FrozenSet[int]:
+    """Get every square the piece on a square attacks.
+
+    Squares holding pieces of the same color count as attacked (they
+    are defended), so that they stay attacked once captured.
+
+    :param squares: mailbox of the board
+    :param index: square of the piece
+    :return: indices of the squares it attacks
+    """
+
+    code = squares[index]
+    if not code:
+        return frozenset()
+    targets = [
+        x for x in attacks.STEPS[code][index]
+        if not any(squares[y] for y in attacks.BETWEEN[index][x])
+    ]
+    for ray in attacks.RAYS[code][index]:
+        for x in ray:
+            targets.append(x)
+            if squares[x]:
+                break
+    return frozenset(targets)
+
+
+class AttackMap:
+    """Which pieces attack each square of a board.
+
+    :ivar squares: mailbox of the board (shared, not copied)
+    :ivar counts: [color][square] -> number of that color's attackers
+    :ivar attackers: [square] -> squares of the pieces attacking it
+    :ivar targets: [square] -> squares the piece there attacks
+    """
+
+    def __init__(self, squares: bytearray):
+        """Initialise instance of AttackMap.
+
+        :param squares: mailbox of the board to follow
+        """
+        self.squares: bytearray = squares
+        self.counts: List[List[int]] = [[0] * 81, [0] * 81]
+        self.attackers: List[Set[int]] = [set() for _ in range(81)]
+        self.targets: List[FrozenSet[int]] = [frozenset()] * 81
+        self._colors: List[int] = [0] * 81
+        for index in range(81):
+            self._refresh(index)
+
+    def is_attacked(self, index: int, color: int) -> bool:
+        """Check if a square is attacked by a color.
+
+        :param index: index of the square
+        :param color: int of the attacking color
+        :return: if any piece of that color attacks the square
+        """
+
+        return self.counts[color][index] > 0
+
+    def attackers_of(self, index: int, color: int) -> List[int]:
+        """Get the squares of a color's pieces attacking a square.
+
+        :param index: index of the square
+        :param color: int of the attacking color
+        :return: indices of the attacking pieces
+        """
+
+        squares = self.squares
+        return [
+            x for x in self.attackers[index]
+            if (squares[x] - 1) >> 4 == color
+        ]
+
+    def changed(self, index: int):
+        """Update the map after a square of the board has changed.
+
+        :param index: index of the changed square
+        """
+
+        for x in tuple(self.attackers[index]):
+            self._refresh(x)
+        self._refresh(index)
+
+    def _refresh(self, index: int):
+        """Work out the attacks of the piece on a square again.
+
+        :param index: index of the square
+        """
+
+        old = self.targets[index]
+        new = attacked_from(self.squares, index)
+        color = (self.squares[index] - 1) >> 4 if new else 0
+        if new == old and color == self._colors[index]:
+            return
+        old_counts = self.counts[self._colors[index]]
+        for x in old:
+            old_counts[x] -= 1
+            self.attackers[x].discard(index)
+        new_counts = self.counts[color]
+        for x in new:
+            new_counts[x] += 1
+            self.attackers[x].add(index)
+        self.targets[index] = new
+        self._colors[index] = color
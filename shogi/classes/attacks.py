@@ -0,0 +1,164 @@
+"""Precomputed move tables.
+
+These tables are built once, when the module is imported, from the
+moves of every piece in moves.json. Squares are mailbox indices
+(x + 9*y) and pieces are piece codes, so that move legality becomes a
+matter of looking things up, rather than walking directions and
+building coordinates for every question asked.
+"""
+
+from typing import FrozenSet, List, Tuple
+
+from .locations import Direction
+from .pieces import Piece
+
+__all__ = [
+    "LINES",
+    "BETWEEN",
+    "TARGETS",
+    "STEPS",
+    "RAYS",
+    "JUMPERS",
+]
+
+Line = Tuple[int, ...]
+
+
+def _build_lines() -> List[Tuple[Line, ...]]:
+    """Get the squares in each direction from each square.
+
+    :return: [square][direction] -> squares, nearest first
+    """
+
+    lines = []
+    for square in range(81):
+        square_lines = []
+        for dx, dy in Direction.inverse_directions[:8]:
+            x, y = square % 9 + dx, square // 9 + dy
+            line = []
+            while 0 <= x < 9 and 0 <= y < 9:
+                line.append(x + 9*y)
+                x += dx
+                y += dy
+            square_lines.append(tuple(line))
+        lines.append(tuple(square_lines))
+    return lines
+
+
+LINES: List[Tuple[Line, ...]] = _build_lines()
+"""[square][direction]: squares in that direction, up to the edge."""
+
+
+def _build_between() -> List[List[Line]]:
+    """Get the squares between each pair of squares.
+
+    :return: [from][to] -> squares strictly between the two
+    """
+
+    between = [[() for _ in range(81)] for _ in range(81)]
+    for square in range(81):
+        for line in LINES[square]:
+            for distance, target in enumerate(line):
+                between[square][target] = line[:distance]
+    return between
+
+
+BETWEEN: List[List[Line]] = _build_between()
+"""[from][to]: squares strictly between two squares on a line.
+
+Squares which are not on a line with each other (such as a knight's
+move) have nothing between them.
+"""
+
+
+def _build_moves() -> Tuple[List[List[Line]], List[List[Tuple[Line, ...]]]]:
+    """Get the steps and rays of every piece from every square.
+
+    :return: STEPS and RAYS
+    """
+
+    empty: List[Line] = [() for _ in range(81)]
+    steps: List[List[Line]] = [empty] * 33
+    rays: List[List[Tuple[Line, ...]]] = [[()] * 81] * 33
+    for code in range(1, 33):
+        piece = Piece.from_code(code)
+        if not piece:
+            continue
+        steps[code] = []
+        rays[code] = []
+        for square in range(81):
+            x, y = square % 9, square // 9
+            square_steps = []
+            square_rays = []
+            for direction in range(8):
+                magic_var = piece.moves[direction]
+                line = LINES[square][direction]
+                if not magic_var:
+                    pass
+                elif isinstance(magic_var, bool):
+                    # A range of motion, all the way to the edge
+                    if line:
+                        square_rays.append(line)
+                elif isinstance(magic_var, int):
+                    # Exactly n spaces in the direction
+                    if len(line) >= magic_var:
+                        square_steps.append(line[magic_var - 1])
+                elif isinstance(magic_var, list):
+                    # Different amounts in the x and y directions
+                    dx, dy = Direction(direction).scale(magic_var)
+                    if 0 <= x + dx < 9 and 0 <= y + dy < 9:
+                        square_steps.append(x + dx + 9*(y + dy))
+            steps[code].append(tuple(square_steps))
+            rays[code].append(tuple(square_rays))
+    return steps, rays
+
+
+_STEPS_AND_RAYS = _build_moves()
+STEPS: List[List[Line]] = _STEPS_AND_RAYS[0]
+"""[code][square]: squares a piece reaches without sliding.
+
+Any squares in BETWEEN for these moves must still be empty.
+"""
+RAYS: List[List[Tuple[Line, ...]]] = _STEPS_AND_RAYS[1]
+"""[code][square]: each direction a piece slides in, nearest first."""
+
+
+def _build_targets() -> List[List[FrozenSet[int]]]:
+    """Get every square each piece attacks on an empty board.
+
+    :return: [code][square] -> attacked squares
+    """
+
+    return [
+        [frozenset(STEPS[code][square]).union(*RAYS[code][square])
+         for square in range(81)]
+        for code in range(33)
+    ]
+
+
+TARGETS: List[List[FrozenSet[int]]] = _build_targets()
+"""[code][square]: squares a piece attacks on an empty board."""
+
+
+def _build_jumpers() -> List[Tuple[Tuple[int, int], ...]]:
+    """Get the pieces which attack each square without a line.
+
+    :return: [square] -> (from, code) pairs
+    """
+
+    jumpers = [[] for _ in range(81)]
+    for code in range(1, 33):
+        for square in range(81):
+            for target in TARGETS[code][square]:
+                if target not in _ON_LINES[square]:
+                    jumpers[target].append((square, code))
+    return [tuple(x) for x in jumpers]
+
+
+_ON_LINES: List[FrozenSet[int]] = [frozenset().union(*x) for x in LINES]
+JUMPERS: List[Tuple[Tuple[int, int], ...]] = _build_jumpers()
+"""[square]: (from, code) of each piece attacking it off any line.
+
+These are the attacks (knights') which cannot be blocked, and which
+therefore cannot be found by looking along LINES from the square.
+"""
@@ -0,0 +1,109 @@
+"""Bitboards: sets of squares as the bits of an int.
+
+Square i (x + 9*y, as in the mailbox) is bit i, so a set of squares
+is an int below 2**81, and asking about a whole file, rank or line of
+squares at once is a single & with one of the masks here. The Board
+keeps one bitboard of the squares holding each piece code (that of
+EMPTY being the empty squares), and one of each color's pieces.
+"""
+
+from typing import Generator, List
+
+from . import attacks
+from .pieces import Piece
+
+__all__ = [
+    "FULL",
+    "SQUARE_BITS",
+    "FILE_MASKS",
+    "RANK_MASKS",
+    "PROMOTION_ZONES",
+    "DEAD_SQUARES",
+    "LINE_MASKS",
+    "BETWEEN_MASKS",
+    "squares_of",
+    "to_bitboard",
+]
+
+FULL: int = (1 << 81) - 1
+"""Every square of the board."""
+
+SQUARE_BITS: List[int] = [1 << x for x in range(81)]
+"""[square]: bitboard of just that square."""
+
+
+def to_bitboard(squares) -> int:
+    """Get the bitboard of some squares.
+
+    :param squares: indices of the squares
+    :return: bitboard of the squares
+    """
+
+    bitboard = 0
+    for x in squares:
+        bitboard |= 1 << x
+    return bitboard
+
+
+def squares_of(bitboard: int) -> Generator[int, None, None]:
+    """Yield the squares in a bitboard, lowest first.
+
+    :param bitboard: bitboard to get the squares of
+    :return: indices of the squares
+    """
+
+    while bitboard:
+        lowest = bitboard & -bitboard
+        yield lowest.bit_length() - 1
+        bitboard ^= lowest
+
+
+FILE_MASKS: List[int] = [
+    to_bitboard(x + 9*y for y in range(9)) for x in range(9)
+]
+"""[x]: the squares of a file (what Board.row gives)."""
+
+RANK_MASKS: List[int] = [
+    to_bitboard(x + 9*y for x in range(9)) for y in range(9)
+]
+"""[y]: the squares of a rank (what Board.column gives)."""
+
+PROMOTION_ZONES: List[int] = [
+    RANK_MASKS[0] | RANK_MASKS[1] | RANK_MASKS[2],
+    RANK_MASKS[8] | RANK_MASKS[7] | RANK_MASKS[6],
+]
+"""[color]: the squares where a color's pieces may promote."""
+
+
+def _build_dead_squares() -> List[int]:
+    """Get the squares each piece could never move from again.
+
+    :return: [code] -> squares the piece must promote on
+    """
+
+    dead = [0] * 33
+    ranks = ((0, 1, 2), (8, 7, 6))
+    for code in range(1, 33):
+        piece = Piece.from_code(code)
+        if piece and not piece.is_promoted:
+            zone = ranks[int(piece.color)][:piece.auto_promote]
+            for y in zone:
+                dead[code] |= RANK_MASKS[y]
+    return dead
+
+
+DEAD_SQUARES: List[int] = _build_dead_squares()
+"""[code]: squares an unpromoted piece can't be dropped on.
+
+These are where Board.auto_promote is true for the piece.
+"""
+
+LINE_MASKS: List[List[int]] = [
+    [to_bitboard(line) for line in x] for x in attacks.LINES
+]
+"""[square][direction]: the squares in that direction, to the edge."""
+
+BETWEEN_MASKS: List[List[int]] = [
+    [to_bitboard(line) for line in x] for x in attacks.BETWEEN
+]
+"""[from][to]: the squares strictly between two squares on a line."""
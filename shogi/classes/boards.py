@@ -1,19 +1,53 @@
 import collections
-from itertools import product
-from typing import Dict, Generator, List, Optional, Sequence
+from typing import (
+    Dict, Generator, List, NamedTuple, Optional, Sequence, Tuple,
+)
 
-from .aliases import PieceDict
+from .aliases import CoordSet, PieceDict
+from .attackmap import AttackMap, attacked_from
+from .bitboards import SQUARE_BITS
 from .exceptions import DemotedException
 from .information import info
-from .locations import AbsoluteCoord
+from .locations import AbsoluteCoord, get_absolute
+from .mailbox import EMPTY, code_piece, index_square, piece_code
+from .packing import (
+    BOARD_CODES, BOARD_DECODE, HAND_CODES, HAND_DECODE, KING_CODES, NO_KING,
+    PACKED_SIZE,
+)
 from .pieceattrs import Color, ColorLike
 from .pieces import Piece, NoPiece
+from .sfen import SFEN_CODES, SFEN_HAND_ORDER, SFEN_LETTERS, SFEN_TURNS
+from .valuation import Valuation
+from .zobrist import HAND_KEYS, PIECE_KEYS, SIDE_KEY
 
 __all__ = [
     "Board",
+    "UndoRecord",
 ]
 
 
+class UndoRecord(NamedTuple):
+    """Everything needed to take back a move made with Board.make.
+
+    :ivar start: location moved from (None for a drop)
+    :ivar end: location moved to
+    :ivar piece: piece moved, as it was before moving
+    :ivar captured: piece captured, as it was on the board
+    :ivar is_promote: if the piece promoted (None if it couldn't)
+    :ivar zobrist_key: hash of the position before the move
+    :ivar checkers: checkers before the move
+    :ivar hand_index: where a dropped piece was among the captured
+    """
+    start: Optional[AbsoluteCoord]
+    end: AbsoluteCoord
+    piece: Piece
+    captured: Piece
+    is_promote: Optional[bool]
+    zobrist_key: int
+    checkers: Optional[CoordSet]
+    hand_index: Optional[int]
+
+
 class Board(collections.abc.Sequence):
     """Class for main board object.
 
@@ -28,8 +62,20 @@ class Board(collections.abc.Sequence):
     move made should be stored in the "last_move" attribute.
 
     :ivar pieces: Each coordinate and corresponding piece
+    :ivar squares: code of the piece on each square, indexed x + 9*y
+    :ivar bitboards: [code] -> bitboard of the squares holding that
+        code (bitboards[EMPTY] is the empty squares)
+    :ivar color_bitboards: [color] -> bitboard of the squares of its pieces
     :ivar captured: List of captured pieces for each color
     :ivar current_player: Active player
+    :ivar zobrist_key: 64-bit hash of the position, kept up to date by
+        every change to the board
+    :ivar history: undo records of the moves made with make
+    :ivar first_move_number: move number of the position the board
+        was set up in
+    :ivar checkers: pieces checking the player to move, if known
+    :ivar attack_map: attacks on each square, if being tracked
+    :ivar valuation: running score of the pieces, if being tracked
     """
 
     def __init__(self, pieces: Optional[dict] = None):
@@ -45,12 +91,23 @@ class Board(collections.abc.Sequence):
         self.pieces: PieceDict = {
             AbsoluteCoord(x): Piece(*y) for x, y in pieces.items()
         }
+        # Flat mailbox of piece codes, kept in sync with self.pieces
+        self.squares: bytearray = bytearray(81)
+        for x, y in self.pieces.items():
+            self.squares[x.x + 9*x.y] = piece_code(y)
+        # Bitboards of each code and color, also kept in sync
+        self.bitboards: List[int] = [0] * 33
+        self.color_bitboards: List[int] = [0, 0]
+        for index, code in enumerate(self.squares):
+            self.bitboards[code] |= SQUARE_BITS[index]
+            if code:
+                self.color_bitboards[(code - 1) >> 4] |= SQUARE_BITS[index]
         # Captured pieces for each color
         self.captured: Dict[Color, List[Piece]] = {
             x: [] for x in Color.valid()
         }
         # Color of whomever's turn it is
-        self.current_player: Color = Color(0)
+        self._current_player: Color = Color(0)
         # Dict mapping kings to their locations
         self.kings: Dict[Color, AbsoluteCoord] = {}
         # Number of spaces wide the board is
@@ -61,6 +118,18 @@ class Board(collections.abc.Sequence):
         for x, y in self.pieces.items():
             if y.is_rank('k'):
                 self.kings[y.color] = x
+        # Hash of the position, updated alongside everything above
+        self.zobrist_key: int = self.compute_zobrist()
+        # Undo stack for make and unmake
+        self.history: List[UndoRecord] = []
+        # Move number when set up (only SFEN positions don't start at 1)
+        self.first_move_number: int = 1
+        # Pieces checking the player to move, as given to make
+        self.checkers: Optional[CoordSet] = None
+        # Attacks on each square, only kept if track_attacks is called
+        self.attack_map: Optional[AttackMap] = None
+        # Score of the pieces, only kept if track_valuation is called
+        self.valuation: Optional[Valuation] = None
 
     def __str__(self):
         to_return = ""
@@ -79,24 +148,438 @@ class Board(collections.abc.Sequence):
         return to_return
 
     def __iter__(self) -> Generator:
-        # y and x reversed so that board doesn't come out sideways
-        # Thanks, itertools
-        for y, x in product(range(self.y_size), range(self.x_size)):
-            yield self[x, y]
+        # The mailbox is already in row-major order, so that the
+        # board doesn't come out sideways
+        for code in self.squares:
+            yield code_piece(code)
 
     def __getitem__(self, index: Sequence) -> Piece:
-        coordinates = AbsoluteCoord(index)
-        return self.pieces.get(coordinates, NoPiece())
+        if not isinstance(index, AbsoluteCoord):
+            index = AbsoluteCoord(index)
+        return code_piece(self.squares[index.x + 9*index.y])
 
-    def __len__(self) -> int: return len(tuple(self))
+    def __len__(self) -> int: return len(self.squares)
 
     def __repr__(self): return f"Board(pieces={self.pieces})"
 
     def iterate(self) -> Generator:
         """Yield from all possible board positions."""
 
-        for y, x in product(range(self.y_size), range(self.x_size)):
-            yield AbsoluteCoord((x, y))
+        for index in range(len(self.squares)):
+            yield index_square(index)
+
+    @classmethod
+    def from_sfen(cls, sfen: str) -> 'Board':
+        """Set up a board from an SFEN string.
+
+        The string is read in one pass, straight into the mailbox,
+        with the shared piece instances (see shogi.classes.sfen).
+
+        :param sfen: placement, side to move, pieces in hand and
+            (optionally) move number
+        :raises ValueError: invalid SFEN
+        :return: the board
+        """
+
+        fields = sfen.split()
+        if len(fields) not in (3, 4):
+            raise ValueError(f"Invalid SFEN: {sfen!r}")
+        placement, turn, hand = fields[:3]
+        new_board = cls({})
+        index = 0
+        rank_end = 9
+        promoted = False
+        for char in placement:
+            if char == '+' and not promoted:
+                promoted = True
+                continue
+            if char == '/' and not promoted:
+                if index != rank_end:
+                    raise ValueError(f"Invalid SFEN rank: {sfen!r}")
+                rank_end += 9
+                continue
+            if char.isdigit() and not promoted:
+                index += int(char)
+            else:
+                code = SFEN_CODES.get('+' + char if promoted else char)
+                if code is None or index >= rank_end:
+                    raise ValueError(f"Invalid SFEN piece: {sfen!r}")
+                piece = code_piece(code)
+                location = index_square(index)
+                new_board._set(location, piece)
+                if piece.is_rank('k'):
+                    new_board.kings[piece.color] = location
+                index += 1
+            if index > rank_end:
+                raise ValueError(f"Invalid SFEN rank: {sfen!r}")
+            promoted = False
+        if index != 81 or rank_end != 81:
+            raise ValueError(f"Invalid SFEN placement: {sfen!r}")
+        if turn not in SFEN_TURNS:
+            raise ValueError(f"Invalid SFEN side to move: {sfen!r}")
+        new_board.current_player = Color(SFEN_TURNS.index(turn))
+        count = 0
+        for char in '' if hand == '-' else hand:
+            if char.isdigit():
+                count = 10*count + int(char)
+                continue
+            if char not in SFEN_HAND_ORDER:
+                raise ValueError(f"Invalid SFEN hand: {sfen!r}")
+            piece = code_piece(SFEN_CODES[char])
+            for _ in range(count or 1):
+                new_board.add_captured(piece)
+            count = 0
+        if len(fields) == 4:
+            new_board.first_move_number = int(fields[3])
+        return new_board
+
+    def to_sfen(self) -> str:
+        """Get the position as an SFEN string.
+
+        :return: placement, side to move, pieces in hand and move number
+        """
+
+        placement = []
+        empty = 0
+        for index, code in enumerate(self.squares):
+            if code:
+                if empty:
+                    placement.append(str(empty))
+                    empty = 0
+                placement.append(SFEN_LETTERS[code])
+            else:
+                empty += 1
+            # The end of each rank
+            if index % 9 == 8:
+                if empty:
+                    placement.append(str(empty))
+                    empty = 0
+                if index != 80:
+                    placement.append('/')
+        counts: Dict[int, int] = collections.Counter(
+            piece_code(x) for hand in self.captured.values() for x in hand
+        )
+        hand = []
+        for letter in SFEN_HAND_ORDER:
+            count = counts[SFEN_CODES[letter]]
+            if count:
+                hand.append(f"{count}{letter}" if count > 1 else letter)
+        return (f"{''.join(placement)} "
+                f"{SFEN_TURNS[int(self.current_player)]} "
+                f"{''.join(hand) or '-'} {self.move_number}")
+
+    @property
+    def move_number(self) -> int:
+        """int: Number of the move to be made next."""
+        return self.first_move_number + len(self.history)
+
+    def pack(self) -> bytes:
+        """Get the position as a short string of bytes.
+
+        This is the turn, the code of each square, then the codes of
+        the pieces in hand (whose color is part of the code), in
+        order. It is meant for sending positions to other processes,
+        which rebuild them with unpack.
+
+        :return: the packed position
+        """
+
+        hands = [
+            piece_code(x) for hand in self.captured.values() for x in hand
+        ]
+        return (bytes((int(self.current_player),))
+                + bytes(self.squares) + bytes(hands))
+
+    @classmethod
+    def unpack(cls, data: bytes) -> 'Board':
+        """Rebuild a board from the bytes of pack.
+
+        :param data: the packed position
+        :return: the board
+        """
+
+        pieces = {}
+        for index, code in enumerate(data[1:82]):
+            if code:
+                piece = code_piece(code)
+                pieces[index_square(index)] = (
+                    str(piece.rank).lower(), int(piece.color),
+                    bool(piece.is_promoted)
+                )
+        new_board = cls(pieces)
+        for code in data[82:]:
+            new_board.add_captured(code_piece(code))
+        new_board.current_player = Color(data[0])
+        return new_board
+
+    def to_bytes(self) -> bytes:
+        """Get the position as PACKED_SIZE bytes.
+
+        Unlike pack, the size is fixed, so positions can be stored one
+        after another and sliced back out of a file. The bits are laid
+        out as in shogi.classes.packing; the move number is not kept.
+
+        :raises ValueError: too many pieces (or kings) to fit
+        :return: the packed position
+        """
+
+        value = int(self.current_player)
+        position = 15
+        kings = [NO_KING, NO_KING]
+        for index, code in enumerate(self.squares):
+            bits, length = BOARD_CODES[code]
+            if not length:
+                color = KING_CODES.index(code)
+                if kings[color] != NO_KING:
+                    raise ValueError("Cannot pack more than one king")
+                kings[color] = index
+            value |= bits << position
+            position += length
+        value |= kings[0] << 1 | kings[1] << 8
+        for color in (Color(0), Color(1)):
+            for piece in self.captured[color]:
+                bits, length = HAND_CODES[piece_code(piece)]
+                if not length:
+                    raise ValueError(f"Cannot pack {piece!r} in hand")
+                value |= bits << position
+                position += length
+        if position > 8*PACKED_SIZE:
+            raise ValueError("Too many pieces to pack")
+        # Fill the rest with 1s, which read as the end of the hands
+        value |= (1 << 8*PACKED_SIZE) - (1 << position)
+        return value.to_bytes(PACKED_SIZE, 'little')
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'Board':
+        """Rebuild a board from the bytes of to_bytes.
+
+        :param data: the packed position (bytes, or a memoryview of them)
+        :raises ValueError: invalid packed position
+        :return: the board
+        """
+
+        if len(data) != PACKED_SIZE:
+            raise ValueError(f"Packed positions are {PACKED_SIZE} bytes")
+        value = int.from_bytes(data, 'little')
+        end = 8*PACKED_SIZE
+        new_board = cls({})
+        new_board.current_player = Color(value & 1)
+        kings = (value >> 1 & 127, value >> 8 & 127)
+        position = 15
+        for index in range(81):
+            if index in kings:
+                code = KING_CODES[kings.index(index)]
+            else:
+                code, position = cls._read_code(
+                    value, position, end, BOARD_DECODE
+                )
+                if code is None:
+                    raise ValueError("Invalid packed position")
+            if code:
+                piece = code_piece(code)
+                location = index_square(index)
+                new_board._set(location, piece)
+                if code in KING_CODES:
+                    new_board.kings[piece.color] = location
+        if any(x != NO_KING and x > 80 for x in kings):
+            raise ValueError("Invalid packed king")
+        while True:
+            # Running out of bits mid-code is the padding of 1s
+            code, position = cls._read_code(
+                value, position, end, HAND_DECODE
+            )
+            if not code:
+                return new_board
+            new_board.add_captured(code_piece(code))
+
+    @staticmethod
+    def _read_code(
+            value: int,
+            position: int,
+            end: int,
+            codes: Dict[Tuple[int, int], int]
+    ) -> Tuple[Optional[int], int]:
+        """Read one Huffman code from packed bits.
+
+        :param value: the packed bits
+        :param position: bit to start at
+        :param end: number of bits in all
+        :param codes: (bits, length) -> what they are the code of
+        :return: what was read (None if the bits ran out first), and
+            the bit after it
+        """
+
+        bits = length = 0
+        while (bits, length) not in codes:
+            if position == end or length == 8:
+                return None, position
+            bits |= (value >> position & 1) << length
+            length += 1
+            position += 1
+        return codes[bits, length], position
+
+    def piece_at(self, index: int) -> Piece:
+        """Get the piece at an index of the mailbox.
+
+        :param index: index of the square (x + 9*y)
+        :return: piece at that square
+        """
+
+        return code_piece(self.squares[index])
+
+    def _set(self, space: AbsoluteCoord, piece: Piece):
+        """Put a piece on a square, keeping the mailbox in sync.
+
+        :param space: location to put the piece
+        :param piece: piece to put there
+        """
+
+        index = space.x + 9*space.y
+        old_code = self.squares[index]
+        new_code = piece_code(piece)
+        self.zobrist_key ^= (PIECE_KEYS[old_code][index]
+                             ^ PIECE_KEYS[new_code][index])
+        self.pieces[space] = piece
+        self.squares[index] = new_code
+        bit = SQUARE_BITS[index]
+        self.bitboards[old_code] ^= bit
+        self.bitboards[new_code] |= bit
+        if old_code:
+            self.color_bitboards[(old_code - 1) >> 4] ^= bit
+        if new_code:
+            self.color_bitboards[(new_code - 1) >> 4] |= bit
+        if self.attack_map is not None:
+            self.attack_map.changed(index)
+        if self.valuation is not None:
+            self.valuation.square_changed(index, old_code, new_code)
+
+    def _clear(self, space: AbsoluteCoord) -> Piece:
+        """Remove the piece from a square, and return it.
+
+        :param space: location to clear
+        :raises KeyError: no piece to remove
+        :return: the piece that was there
+        """
+
+        # An empty square raises before anything else is changed
+        piece = self.pieces.pop(space)
+        index = space.x + 9*space.y
+        old_code = self.squares[index]
+        self.zobrist_key ^= PIECE_KEYS[old_code][index]
+        self.squares[index] = EMPTY
+        bit = SQUARE_BITS[index]
+        self.bitboards[old_code] ^= bit
+        self.bitboards[EMPTY] |= bit
+        self.color_bitboards[(old_code - 1) >> 4] ^= bit
+        if self.attack_map is not None:
+            self.attack_map.changed(index)
+        if self.valuation is not None:
+            self.valuation.square_changed(index, old_code, EMPTY)
+        return piece
+
+    def track_attacks(self) -> AttackMap:
+        """Keep a map of the attacks on each square from now on.
+
+        The map is updated with every change to the board, which makes
+        is_attacked a lookup, at the cost of slower moves.
+
+        :return: the attack map
+        """
+
+        if self.attack_map is None:
+            self.attack_map = AttackMap(self.squares)
+        return self.attack_map
+
+    def track_valuation(
+            self,
+            square_values: List[List[int]],
+            hand_values: List[List[int]]
+    ) -> Valuation:
+        """Keep a running score of the pieces from now on.
+
+        If a score with the same tables is already being kept, it is
+        returned as it is; otherwise it replaces the old one.
+
+        :param square_values: [code][square] -> value of the piece there
+        :param hand_values: [code][count] -> value of holding the
+            count-th copy of the piece
+        :return: the valuation
+        """
+
+        valuation = self.valuation
+        if (valuation is None
+                or valuation.square_values is not square_values
+                or valuation.hand_values is not hand_values):
+            self.valuation = Valuation(
+                self.squares, self.captured, square_values, hand_values
+            )
+        return self.valuation
+
+    def is_attacked(self, space: AbsoluteCoord, color: ColorLike) -> bool:
+        """Check if any piece of a color attacks a location.
+
+        :param space: location to check
+        :param color: color of the attacking pieces
+        :return: if the location is attacked
+        """
+
+        index = space.x + 9*space.y
+        color = int(Color(color))
+        if self.attack_map is not None:
+            return self.attack_map.is_attacked(index, color)
+        return any(
+            code and (code - 1) >> 4 == color
+            and index in attacked_from(self.squares, x)
+            for x, code in enumerate(self.squares)
+        )
+
+    def _remove_captured(self, player: Color, piece: Piece):
+        """Take a piece out of a player's captured pieces.
+
+        :param player: player holding the piece
+        :param piece: piece to take out
+        """
+
+        hand = self.captured[player]
+        count = hand.count(piece)
+        self.zobrist_key ^= HAND_KEYS[piece_code(piece)][count]
+        if self.valuation is not None:
+            self.valuation.hand_changed(piece_code(piece), count, False)
+        hand.remove(piece)
+
+    def compute_zobrist(self) -> int:
+        """Work out the hash of the position from scratch.
+
+        This is what zobrist_key is set to initially; after that, the
+        key is updated with each change instead.
+
+        :return: hash of the position
+        """
+
+        key = 0
+        for index, code in enumerate(self.squares):
+            key ^= PIECE_KEYS[code][index]
+        for hand in self.captured.values():
+            counts: Dict[int, int] = collections.Counter()
+            for piece in hand:
+                code = piece_code(piece)
+                counts[code] += 1
+                key ^= HAND_KEYS[code][counts[code]]
+        if int(self.current_player):
+            key ^= SIDE_KEY
+        return key
+
+    @property
+    def current_player(self) -> Color:
+        """Color of whomever's turn it is."""
+
+        return self._current_player
+
+    @current_player.setter
+    def current_player(self, player: Color):
+        if int(player) != int(self._current_player):
+            self.zobrist_key ^= SIDE_KEY
+        self._current_player = player
 
     @property
     def occupied(self) -> Generator:
@@ -116,13 +599,87 @@ class Board(collections.abc.Sequence):
                 and isinstance(new, AbsoluteCoord)):
             raise TypeError
         # If there's a piece in the way, capture it
-        if not isinstance(self[new], NoPiece):
+        if self.squares[new.x + 9*new.y] != EMPTY:
             self.capture(new)
         # Get the piece to be moved
-        self.pieces[AbsoluteCoord(new)] = self.pieces.pop(current)
+        moved = self._clear(current)
+        self._set(new, moved)
         # If the piece is a king, update self.kings accordingly
-        if self.pieces[new].is_rank('k'):
-            self.kings[self.pieces[new].color] = new
+        if moved.is_rank('k'):
+            self.kings[moved.color] = new
+
+    def make(self, move, checkers: Optional[CoordSet] = None):
+        """Make a move, so that it can be taken back with unmake.
+
+        The move is not checked for legality. It may be anything with
+        start, end, piece and is_promote attributes, such as a Move or
+        a MoveRecord; start is None for drops, and piece is only used
+        for drops.
+
+        :param move: move to make
+        :param checkers: pieces checking the next player, if known
+        """
+
+        start, end = move.start, move.end
+        player = self.current_player
+        key = self.zobrist_key
+        if start is None:
+            piece = move.piece
+            captured = NoPiece()
+            hand_index = self.captured[player].index(piece)
+            self.put_in_play(piece, end)
+        else:
+            piece = self[start]
+            captured = self[end]
+            hand_index = None
+            self.move(start, end)
+            if move.is_promote:
+                self.promote(end)
+        self.history.append(UndoRecord(
+            start, end, piece, captured, move.is_promote, key,
+            self.checkers, hand_index
+        ))
+        self.flip_turn()
+        self.checkers = checkers
+
+    def unmake(self) -> UndoRecord:
+        """Take back the last move made with make.
+
+        Everything is put back exactly as it was, including the order
+        of the captured pieces and the hash.
+
+        :raises IndexError: no moves to take back
+        :return: the undo record of the move
+        """
+
+        record = self.history.pop()
+        self.flip_turn()
+        player = self.current_player
+        hand = self.captured[player]
+        if record.start is None:
+            self._clear(record.end)
+            hand.insert(record.hand_index, record.piece)
+            if self.valuation is not None:
+                self.valuation.hand_changed(
+                    record.piece.code, hand.count(record.piece), True
+                )
+        else:
+            self._clear(record.end)
+            self._set(record.start, record.piece)
+            if record.captured:
+                # Captures are always the last piece added
+                if self.valuation is not None:
+                    self.valuation.hand_changed(
+                        hand[-1].code, hand.count(hand[-1]), False
+                    )
+                hand.pop()
+                self._set(record.end, record.captured)
+            if record.piece.is_rank('k'):
+                self.kings[record.piece.color] = record.start
+        # The hand was changed directly, so restore the key wholesale
+        self.zobrist_key = record.zobrist_key
+        self.checkers = record.checkers
+        return record
 
     def get_king(self, king_color: ColorLike) -> AbsoluteCoord:
         """Return the location of a color's king.
@@ -131,10 +688,8 @@ class Board(collections.abc.Sequence):
         :return: location of piece
         """
 
-        # Search through the pieces until the king is found
-        for x, y in self.pieces.items():
-            if y.is_piece('k', king_color):
-                return x
+        # self.kings is kept up to date by every move
+        return self.kings.get(Color(king_color))
 
     def capture(self, new: AbsoluteCoord):
         """Capture a piece at a location.
@@ -152,22 +707,30 @@ class Board(collections.abc.Sequence):
             pass
         # Flip the side of the piece, so it belongs to the captors
         new_piece = piece.flip_sides()
-        # Add it to the captured pieces
-        self.captured[piece.color].append(new_piece)
+        # Add it to the pieces captured by its new owner
+        self.add_captured(new_piece)
         # Remove the piece from where it was
-        del self.pieces[new]
+        self._clear(new)
 
-    def can_promote(self, space: AbsoluteCoord) -> bool:
+    def can_promote(
+            self,
+            space: AbsoluteCoord,
+            piece: Piece = NoPiece()
+    ) -> bool:
         """Check if a piece is in a promotion zone.
 
         :param space: location to be checked
+        :param piece: piece to check (default: the piece at space)
         :return: if piece is promotable
         """
 
+        # If the piece is not supplied, get it from the space
+        if isinstance(piece, NoPiece):
+            piece = self[space]
         # Return whether or not the piece is far enough along the
         # board to promote
         promotion_zones = ((0, 1, 2), (8, 7, 6))
-        return space.y in promotion_zones[int(self[space].color)]
+        return space.y in promotion_zones[int(piece.color)]
 
     def auto_promote(
             self,
@@ -207,7 +770,7 @@ class Board(collections.abc.Sequence):
 
         piece = self[space]
         piece = piece.promote()
-        self.pieces[space] = piece
+        self._set(space, piece)
 
     def demote(self, space: AbsoluteCoord):
         """Demote the piece at a location.
@@ -216,7 +779,7 @@ class Board(collections.abc.Sequence):
         """
         piece = self[space]
         piece = piece.demote()
-        self.pieces[space] = piece
+        self._set(space, piece)
 
     def put_in_play(
             self,
@@ -237,13 +800,13 @@ class Board(collections.abc.Sequence):
         if player is None:
             player = piece.color
         # If there's already a piece at the moved-to spot, error
-        if not isinstance(self[moved_to], NoPiece):
+        if self.squares[moved_to.x + 9*moved_to.y] != EMPTY:
             raise ValueError
         # Move the piece to where it needs to go
-        self.captured[player].remove(piece)
+        self._remove_captured(player, piece)
         if flip_sides:
             piece = piece.flip_sides()
-        self.pieces[moved_to] = piece
+        self._set(moved_to, piece)
 
     def un_drop(self, location: AbsoluteCoord):
         """Un-drop piece.
@@ -254,13 +817,26 @@ class Board(collections.abc.Sequence):
 
         :param location: location of piece to un-drop
         """
-        un_dropped = self.pieces.pop(location)
+        un_dropped = self._clear(location)
         # Demote the piece, if it is not already demoted
         try:
             un_dropped = un_dropped.demote()
         except DemotedException:
             pass
-        self.captured[un_dropped.color].append(un_dropped)
+        self.add_captured(un_dropped)
+
+    def add_captured(self, piece: Piece):
+        """Add a piece to its color's captured pieces.
+
+        :param piece: piece to add, as it will be held
+        """
+
+        hand = self.captured[piece.color]
+        hand.append(piece)
+        count = hand.count(piece)
+        self.zobrist_key ^= HAND_KEYS[piece_code(piece)][count]
+        if self.valuation is not None:
+            self.valuation.hand_changed(piece_code(piece), count, True)
 
     def flip_turn(self):
         """Flip the turn from one player to the other."""
@@ -269,24 +845,24 @@ class Board(collections.abc.Sequence):
     def row(self, row_num: int) -> Generator:
         """The pieces at each space in a row of the board."""
         for y in range(self.y_size):
-            yield self[AbsoluteCoord((row_num, y))]
+            yield self[get_absolute(row_num, y)]
 
     def filled_row(self, row_num: int) -> Generator:
         """The occupied pieces from each space in a row."""
         for y in range(self.y_size):
-            space = AbsoluteCoord((row_num, y))
+            space = get_absolute(row_num, y)
             if self[space]:
                 yield self[space]
 
     def column(self, col_num: int) -> Generator:
         """The pieces at each space in a column of the board."""
         for x in range(self.x_size):
-            yield self[AbsoluteCoord((x, col_num))]
+            yield self[get_absolute(x, col_num)]
 
     def filled_column(self, col_num: int) -> Generator:
         """The occupied pieces from each space in a column."""
         for x in range(self.x_size):
-            space = AbsoluteCoord((x, col_num))
+            space = get_absolute(x, col_num)
             if self[space]:
                 yield self[space]
 
@@ -1,6 +1,6 @@
 import collections
 import itertools
-from typing import Sequence, Tuple, Union, Iterable
+from typing import Iterable, Optional, Sequence, Tuple, Union
 
 from .exceptions import NullCoordError
 
@@ -11,6 +11,10 @@ __all__ = [
     "Direction",
     "NullCoord",
     "CoordLike",
+    "get_absolute",
+    "get_relative",
+    "get_direction",
+    "try_offset",
 ]
 
 
@@ -28,6 +32,8 @@ class BaseCoord(collections.abc.Sequence):
     :ivar tup: the (x, y) tuple
     """
 
+    __slots__ = ("x", "y", "tup")
+
     def __init__(self, xy: Tuple[int, int]):
         """Initialise instance of BaseCoord.
 
@@ -59,7 +65,7 @@ class BaseCoord(collections.abc.Sequence):
                 other = self.__class__(other)
             except TypeError:
                 return NotImplemented
-        return self.__class__((self.x + other.x, self.y + other.y))
+        return self._from_xy(self.x + other.x, self.y + other.y)
 
     def __sub__(self, other):
         if not isinstance(other, BaseCoord):
@@ -67,7 +73,7 @@ class BaseCoord(collections.abc.Sequence):
                 other = self.__class__(other)
             except TypeError:
                 return NotImplemented
-        return self.__class__((self.x - other.x, self.y - other.y))
+        return self._from_xy(self.x - other.x, self.y - other.y)
 
     def __mul__(self, other):
         if not isinstance(other, BaseCoord):
@@ -75,9 +81,9 @@ class BaseCoord(collections.abc.Sequence):
                 other = self.__class__(other)
             except TypeError:
                 return NotImplemented
-        return self.__class__((self.x * other.x, self.y * other.y))
+        return self._from_xy(self.x * other.x, self.y * other.y)
 
-    def __abs__(self): return self.__class__((abs(self.x), abs(self.y)))
+    def __abs__(self): return self._from_xy(abs(self.x), abs(self.y))
 
     def __hash__(self): return hash(self.tup)
 
@@ -90,6 +96,16 @@ class BaseCoord(collections.abc.Sequence):
     def is_linear(self) -> bool:
         return abs(self.x) == abs(self.y) or self.x == 0 or self.y == 0
 
+    @classmethod
+    def _from_xy(cls, x: int, y: int) -> 'BaseCoord':
+        """Get the coordinate (x, y), as the results of arithmetic are.
+
+        :param x: the x coordinate
+        :param y: the y coordinate
+        :return: the coordinate
+        """
+        return cls((x, y))
+
 
 class RelativeCoord(BaseCoord):
     """The class for relative coordinates on the board.
@@ -101,8 +117,13 @@ class RelativeCoord(BaseCoord):
 
     If the addition or subtraction of a RelativeCoord takes the sum
     outside of the (-9, 9) range, a ValueError is raised.
+
+    Every RelativeCoord in range is made once, up front; get_relative
+    returns those, as does arithmetic on them.
     """
 
+    __slots__ = ()
+
     def __init__(self, xy: CoordLike):
         """Initialise instance of RelativeCoord.
 
@@ -125,23 +146,27 @@ class RelativeCoord(BaseCoord):
         else:
             raise TypeError(f"Expected {CoordLike}, got {type(xy)}.")
 
+    @classmethod
+    def _from_xy(cls, x: int, y: int) -> 'RelativeCoord':
+        return get_relative(x, y)
+
     @classmethod
     def same_xy(cls):
         """All pieces with the same x and y coordinate."""
         for x in range(-8, 9):
-            yield cls(x)
+            yield cls._from_xy(x, x)
 
     @classmethod
     def positive_xy(cls):
         """All pieces within same_xy with a positive coordinate."""
         for x in range(1, 9):
-            yield cls(x)
+            yield cls._from_xy(x, x)
 
     @classmethod
     def negative_xy(cls):
         """Same as positive_xy, but negative coordinates."""
         for x in range(-1, -9, -1):
-            yield cls(x)
+            yield cls._from_xy(x, x)
 
     @classmethod
     def one_away(cls):
@@ -159,12 +184,18 @@ class AbsoluteCoord(BaseCoord):
     be used for pointing at locations on the board.
 
     If the addition or subtraction of an AbsoluteCoord takes it out
-    of the (0, 9) range, a RelativeCoord is instead returned.
+    of the (0, 9) range, a ValueError is raised.
+
+    Each of the 81 squares is made once, up front; get_absolute
+    returns those, as does arithmetic on them, so finding the square
+    a move lands on doesn't make a new object.
 
     :ivar x_str: the x part of board notation
     :ivar y_str: the y part of board notation
     """
 
+    __slots__ = ("x_str", "y_str")
+
     def __init__(self, xy: CoordLike):
         """Initialise instance of AbsoluteCoord.
 
@@ -203,10 +234,13 @@ class AbsoluteCoord(BaseCoord):
     def __repr__(self):
         return f"{self.__class__.__name__}({self.y_str + self.x_str !r})"
 
+    @classmethod
+    def _from_xy(cls, x: int, y: int) -> 'AbsoluteCoord':
+        return get_absolute(x, y)
+
     @staticmethod
     def same_xy():
-        for x in range(-8, 9):
-            yield RelativeCoord(x)
+        yield from RelativeCoord.same_xy()
 
     def distance_to(self, other: 'AbsoluteCoord') -> RelativeCoord:
         """Get the distance to the other coordinate.
@@ -221,7 +255,7 @@ class AbsoluteCoord(BaseCoord):
         :param other: The coordinate whose distance we are finding
         :return: The distance to the other coordinate
         """
-        return RelativeCoord((other.x - self.x, other.y - self.y))
+        return get_relative(other.x - self.x, other.y - self.y)
 
 
 def _sign(x): return int(x > 0) - int(x < 0)
@@ -242,11 +276,16 @@ class Direction(RelativeCoord):
     6   2
     5 4 3
 
+    The nine directions are made once, up front, and get_direction
+    returns those.
+
     :ivar direction: which way the direction is facing
     :cvar direction_set: maps coordinate pair to direction number
     :cvar inverse_directions: inverse of direction_set
     """
 
+    __slots__ = ("direction",)
+
     direction_set = {(0, -1): 0, (1, -1): 1, (1, 0): 2, (1, 1): 3,
                      (0, 1): 4, (-1, 1): 5, (-1, 0): 6, (-1, -1): 7,
                      (0, 0): 8}
@@ -270,8 +309,7 @@ class Direction(RelativeCoord):
 
     @staticmethod
     def valid():
-        for x in range(8):
-            yield Direction(x)
+        yield from _DIRECTIONS[:8]
 
     def scale(self, scalar: CoordLike) -> RelativeCoord:
         """Scale a coordinate in a direction.
@@ -289,7 +327,11 @@ class Direction(RelativeCoord):
                 scalar = RelativeCoord(scalar)
             except TypeError:
                 raise TypeError
-        return RelativeCoord((self.x * scalar.x, self.y * scalar.y))
+        return get_relative(self.x * scalar.x, self.y * scalar.y)
+
+    @classmethod
+    def _from_xy(cls, x: int, y: int) -> 'Direction':
+        return get_direction(cls.direction_set[(_sign(x), _sign(y))])
 
     def _make(self, x_var: int, y_var: int) -> int:
         """Turn (x, y) coordinates into a direction.
@@ -319,6 +361,8 @@ class NullCoord(Direction):
     :ivar y_str: the y part of board notation ('-')
     """
 
+    __slots__ = ("x_str", "y_str")
+
     def __init__(self):
         """Initialise instance of NullCoord.
 
@@ -345,3 +389,68 @@ class NullCoord(Direction):
     @classmethod
     def valid(cls):
         yield cls()
+
+
+_ABSOLUTE: Tuple[AbsoluteCoord, ...] = tuple(
+    AbsoluteCoord((i % 9, i // 9)) for i in range(81)
+)
+_RELATIVE: Tuple[RelativeCoord, ...] = tuple(
+    RelativeCoord((x, y)) for x in range(-8, 9) for y in range(-8, 9)
+)
+_DIRECTIONS: Tuple[Direction, ...] = tuple(Direction(x) for x in range(9))
+
+
+def get_absolute(x: int, y: int) -> AbsoluteCoord:
+    """Get the AbsoluteCoord of a square, without making a new one.
+
+    :param x: the x coordinate
+    :param y: the y coordinate
+    :raises ValueError: the square is off the board
+    :return: the coordinate
+    """
+    if 0 <= x < 9 and 0 <= y < 9:
+        return _ABSOLUTE[x + 9*y]
+    raise ValueError(f"{(x, y)} not in correct range")
+
+
+def get_relative(x: int, y: int) -> RelativeCoord:
+    """Get a RelativeCoord, without making a new one.
+
+    :param x: the x coordinate
+    :param y: the y coordinate
+    :raises ValueError: either coordinate is out of range
+    :return: the coordinate
+    """
+    if -8 <= x <= 8 and -8 <= y <= 8:
+        return _RELATIVE[17*(x + 8) + y + 8]
+    raise ValueError(f"{(x, y)} not in correct range")
+
+
+def get_direction(direction: int) -> Direction:
+    """Get a Direction from its number, without making a new one.
+
+    :param direction: number of the direction (8 for not moving)
+    :return: the direction
+    """
+    return _DIRECTIONS[direction]
+
+
+def try_offset(
+        square: AbsoluteCoord,
+        delta: BaseCoord
+) -> Optional[AbsoluteCoord]:
+    """Move a square by an offset, if it stays on the board.
+
+    This is square + delta, but with None for falling off the edge
+    instead of a ValueError, for loops which run off the board as a
+    matter of course.
+
+    :param square: square to start from
+    :param delta: offset to move it by
+    :return: the square moved to (None if off the board)
+    """
+    x = square.x + delta.x
+    y = square.y + delta.y
+    if 0 <= x < 9 and 0 <= y < 9:
+        return _ABSOLUTE[x + 9*y]
+    return None
@@ -0,0 +1,59 @@
+from typing import List, Tuple
+
+from .locations import AbsoluteCoord, get_absolute
+from .pieces import BASE_RANKS, Piece
+
+__all__ = [
+    "EMPTY",
+    "BASE_RANKS",
+    "piece_code",
+    "code_piece",
+    "square_index",
+    "index_square",
+]
+
+EMPTY: int = 0
+"""The code of an empty square."""
+
+_CODE_PIECES: List[Piece] = [Piece.from_code(x) for x in range(33)]
+_SQUARES: Tuple[AbsoluteCoord, ...] = tuple(
+    get_absolute(i % 9, i // 9) for i in range(81)
+)
+
+
+def piece_code(piece: Piece) -> int:
+    """Get the code of a piece.
+
+    :param piece: piece to get the code of
+    :return: code of the piece
+    """
+    return piece.code
+
+
+def code_piece(code: int) -> Piece:
+    """Get the piece with a certain code.
+
+    :param code: code of the piece
+    :return: the piece
+    """
+    return _CODE_PIECES[code]
+
+
+def square_index(coord: AbsoluteCoord) -> int:
+    """Get the index of a square within the flat board.
+
+    Squares are numbered x + 9*y, the same order as Board.iterate.
+
+    :param coord: location of the square
+    :return: index of the square
+    """
+    return coord.x + 9*coord.y
+
+
+def index_square(index: int) -> AbsoluteCoord:
+    """Get the location of a square from its index.
+
+    :param index: index of the square
+    :return: location of the square
+    """
+    return _SQUARES[index]
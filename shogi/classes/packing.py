@@ -0,0 +1,117 @@
+"""Tables for packing a position into PACKED_SIZE bytes.
+
+A packed position is a fixed number of bits, read from the lowest bit
+of the first byte up:
+
+* the color to move (1 bit);
+* the index of each color's king, or NO_KING (7 bits each);
+* every other square, in mailbox order, as its BOARD_CODES;
+* the pieces in hand, color 0's then color 1's, as their HAND_CODES;
+* 1s to the end, which read as HAND_END.
+
+The codes are Huffman codes, shortest for the commonest pieces. A
+position with no more than the 40 pieces of a game always fits, with a
+piece in hand never taking more bits than it does on the board.
+"""
+
+from typing import Dict, List, Tuple
+
+from .mailbox import code_piece
+
+__all__ = [
+    "PACKED_SIZE",
+    "NO_KING",
+    "KING_CODES",
+    "BOARD_CODES",
+    "HAND_CODES",
+    "HAND_END",
+    "BOARD_DECODE",
+    "HAND_DECODE",
+]
+
+PACKED_SIZE: int = 32
+"""Number of bytes in a packed position."""
+
+NO_KING: int = 81
+"""King index of a color with no king on the board."""
+
+KING_CODES: Tuple[int, ...] = tuple(
+    code for code in range(1, 33)
+    if code_piece(code) and code_piece(code).is_rank('k')
+)
+"""[color]: code of the color's king."""
+
+# Bits of each rank, after the bit for a filled square
+_RANK_BITS: Dict[str, str] = {
+    'p': "0",
+    'l': "100",
+    'n': "101",
+    's': "110",
+    'g': "1110",
+    'b': "11110",
+    'r': "11111",
+}
+# The same in hand, where the rook gives way for HAND_END
+_HAND_RANK_BITS: Dict[str, str] = {**_RANK_BITS, 'r': "111110"}
+_HAND_END_BITS: str = "111111"
+
+
+def _code(bits: str) -> Tuple[int, int]:
+    """Turn a string of bits into an int, first bit lowest.
+
+    :param bits: the bits, in the order they are written
+    :return: the bits, number of bits
+    """
+    return int(bits[::-1], 2), len(bits)
+
+
+def _build_codes(hand: bool) -> List[Tuple[int, int]]:
+    """Get the code of each piece, on the board or in hand.
+
+    On the board, that is a filled bit, the rank's bits, a promoted bit
+    (for ranks that can promote) and the color; in hand, the rank's
+    bits and the color.
+
+    :param hand: if the codes are for pieces in hand
+    :return: [code] -> (bits, number of bits); (0, 0) for no code
+    """
+
+    codes = [(0, 0)] * 33
+    if not hand:
+        codes[0] = _code("0")
+    for code in range(1, 33):
+        piece = code_piece(code)
+        if not piece or piece.is_rank('k'):
+            continue
+        if hand and piece.is_promoted:
+            continue
+        rank = str(piece.rank).lower()
+        if hand:
+            bits = _HAND_RANK_BITS[rank]
+        else:
+            bits = "1" + _RANK_BITS[rank]
+            if not piece.is_rank('g'):
+                bits += str(int(bool(piece.is_promoted)))
+        codes[code] = _code(bits + str(int(piece.color)))
+    return codes
+
+
+BOARD_CODES: List[Tuple[int, int]] = _build_codes(False)
+"""[code]: bits and length of a square (length 0 for kings)."""
+
+HAND_CODES: List[Tuple[int, int]] = _build_codes(True)
+"""[code]: bits and length of a piece in hand (0 if never held)."""
+
+HAND_END: Tuple[int, int] = _code(_HAND_END_BITS)
+"""Bits and length of the end of the pieces in hand."""
+
+BOARD_DECODE: Dict[Tuple[int, int], int] = {
+    x: code for code, x in enumerate(BOARD_CODES) if x[1]
+}
+"""(bits, length) -> code of the square."""
+
+HAND_DECODE: Dict[Tuple[int, int], int] = {
+    **{x: code for code, x in enumerate(HAND_CODES) if x[1]},
+    HAND_END: 0,
+}
+"""(bits, length) -> code of the piece in hand (0 for HAND_END)."""
@@ -1,11 +1,14 @@
 import collections
-from typing import Callable, Dict, Generator, Optional, Union
+from typing import (
+    Callable, Dict, FrozenSet, Generator, Optional, Tuple, Union
+)
 
 from .exceptions import (
     PromotedException, NotPromotableException, DemotedException
 )
 from .information import info
 from .locations import Direction, RelativeCoord
+from .privates import _Flyweight, _Frozen
 
 __all__ = [
     "Color",
@@ -22,14 +25,15 @@ RankLike = Union[str, 'Rank']
 MoveFnLike = Callable[[RelativeCoord], bool]
 
 
-class Color:
+class Color(_Frozen, metaclass=_Flyweight):
     """The class for piece/player colors.
 
     This class is used both for the color of a player (e.g. the Board
     object's current_player attribute being an instance of Color),
     and the color of a piece (e.g. the Piece.color attribute being a
     Color). This class is what should be used for comparisons between
-    two piece's colors.
+    two piece's colors. There is only ever one instance of each
+    color, so Color(0) is Color('w').
 
     :ivar int: the integer (white=0, black=1) of the turn
     :ivar name: the character (w, b) of the color
@@ -65,6 +69,22 @@ class Color:
         self.other_color: str = 'bw'[self.int]
         self.full_name: str = ['White', 'Black'][self.int]
 
+    @staticmethod
+    def _key(turn_num: ColorLike) -> str:
+        """Get the key of the shared instance for a color.
+
+        :param turn_num: piece's color (w/b or 0/1)
+        :return: the character of the color
+        """
+
+        if isinstance(turn_num, int):
+            return 'wb'[turn_num]
+        elif isinstance(turn_num, str):
+            return turn_num
+        elif isinstance(turn_num, Color):
+            return turn_num.name
+        raise TypeError(f"Expected {ColorLike}, got {type(turn_num)}")
+
     def __str__(self): return self.name
 
     def __repr__(self):
@@ -82,6 +102,8 @@ class Color:
 
     def __hash__(self): return hash((self.int, self.name))
 
+    def __reduce__(self): return Color, (self.name,)
+
     @staticmethod
     def valid() -> Generator['Color', None, None]:
         yield Color(0)
@@ -94,12 +116,13 @@ class Color:
         return Color(self.other_color)
 
 
-class Rank:
+class Rank(_Frozen, metaclass=_Flyweight):
     """The class for the rank of the piece.
 
     This class is what determines which rank the piece is (e.g. king,
     rook, knight, etc.). It should be used for comparisons between
-    two piece's types.
+    two piece's types. Instances are shared between all pieces of the
+    same rank.
 
     :ivar rank: the short name of the piece -- see "help names"
     :ivar name: the full name of the piece
@@ -124,6 +147,19 @@ class Rank:
             self.rank = rank.lower()
             self.name = info.name_info[self.rank]
 
+    @staticmethod
+    def _key(rank: RankLike, promoted: bool = False) -> tuple:
+        """Get the key of the shared instance for a rank.
+
+        :param rank: rank of piece ('n', 'b', etc.)
+        :param promoted: if piece is promoted
+        :return: (lowercase rank, promoted)
+        """
+
+        if not isinstance(rank, (str, Rank)):
+            raise TypeError(f"Expected {RankLike}, got {type(rank)}")
+        return str(rank).lower(), bool(promoted)
+
     def __str__(self): return self.rank
 
     def __repr__(self):
@@ -138,6 +174,8 @@ class Rank:
 
     def __hash__(self): return hash((self.rank, self.name))
 
+    def __reduce__(self): return Rank, (self.rank, self.rank.isupper())
+
     def prom(self) -> 'Rank':
         """Promote the piece."""
         return Rank(self, promoted=True)
@@ -147,12 +185,21 @@ class Rank:
         return Rank(self, promoted=False)
 
 
-class Moves(collections.abc.Sequence):
+class _SequenceFlyweight(_Flyweight, type(collections.abc.Sequence)):
+    """Flyweight metaclass for abstract sequences."""
+
+
+class Moves(
+        _Frozen,
+        collections.abc.Sequence,
+        metaclass=_SequenceFlyweight
+):
     """The class containing the set of moves the piece can do.
 
     This class contains a dictionary relating directions to the moves
     the piece can make. It also has the ability to test whether or not
-    a certain move can be made.
+    a certain move can be made. Only one instance is created for each
+    piece name, color and promotion, as the move data never changes.
 
     :ivar name: 1-letter name of piece
     :ivar color: color of piece
@@ -161,6 +208,8 @@ class Moves(collections.abc.Sequence):
     :ivar moves: (demoted, promoted)
     :ivar is_promoted: if the piece is promoted
     :ivar current: current set of moves
+    :ivar spaces: every relative move in the current set, in order
+    :ivar offsets: (x, y) of every relative move, for lookups
     """
 
     def __init__(
@@ -208,6 +257,27 @@ class Moves(collections.abc.Sequence):
         self.current: Dict[Direction, str] = self.moves[self.is_promoted]
         if self.current is None:
             raise NotPromotableException
+        # The moves never change, so work them all out up front
+        self.spaces: Tuple[RelativeCoord, ...] = tuple(self._spaces())
+        self.offsets: FrozenSet[Tuple[int, int]] = frozenset(
+            x.tup for x in self.spaces
+        )
+
+    @staticmethod
+    def _key(
+            piece_name: RankLike,
+            color: Color,
+            promoted: bool = False
+    ) -> tuple:
+        """Get the key of the shared instance for a set of moves.
+
+        :param piece_name: 1-letter name of piece
+        :param color: color of piece
+        :param promoted: if piece is promoted
+        :return: (lowercase name, color, promoted)
+        """
+
+        return str(piece_name).lower(), color, bool(promoted)
 
     def __getitem__(self, attr: Union[Direction, int]) -> str:
         if isinstance(attr, Direction):
@@ -226,6 +296,9 @@ class Moves(collections.abc.Sequence):
 
     def __len__(self) -> int: return len(self.current)
 
+    def __reduce__(self):
+        return Moves, (self.name, self.color, self.is_promoted)
+
     def can_move(self, relative_location: RelativeCoord) -> bool:
         """Check if piece can move to location.
 
@@ -233,17 +306,26 @@ class Moves(collections.abc.Sequence):
         :return: if move is legal
         """
 
-        vec = Direction(relative_location)
-        abs_location = abs(relative_location)
-        dist = max(abs_location)
-        magic_var = self[vec]
-        if isinstance(magic_var, int) and not isinstance(magic_var, bool):
-            return dist == magic_var and relative_location.is_linear()
-        elif isinstance(magic_var, list):
-            return list(abs_location) == magic_var
-        elif isinstance(magic_var, bool):
-            return magic_var and relative_location.is_linear()
-        return False
+        return tuple(relative_location) in self.offsets
+
+    def _spaces(self) -> Generator:
+        """Yield every relative move in the current set of moves.
+
+        :return: relative moves, by direction and then distance
+        """
+
+        for direction in Direction.valid():
+            magic_var = self[direction]
+            if not magic_var:
+                pass
+            elif isinstance(magic_var, bool):
+                # A range of motion, as far as the board goes
+                for x in RelativeCoord.positive_xy():
+                    yield direction.scale(x)
+            elif isinstance(magic_var, (int, list)):
+                # Exactly n spaces in the direction, or different
+                # amounts in the x and y directions
+                yield direction.scale(magic_var)
 
     def prom(self) -> 'Moves':
         """Promote self.
@@ -1,4 +1,4 @@
-from typing import Generator, Optional, Tuple
+from typing import Generator, List, Optional, Tuple
 
 from .exceptions import (
     NotPromotableException, PromotedException, DemotedException
@@ -6,16 +6,30 @@ from .exceptions import (
 from .information import info
 from .locations import RelativeCoord, Direction
 from .pieceattrs import Color, ColorLike, Moves, Rank, RankLike
+from .privates import _Flyweight, _Frozen
 
 __all__ = [
     "Piece",
     "NoPiece",
 ]
 
+BASE_RANKS: str = 'plnsgbrk'
+"""The unpromoted ranks, in the order used by piece codes."""
 
-class Piece:
+
+class Piece(_Frozen, metaclass=_Flyweight):
     """The class representing a piece.
 
+    Pieces are flyweights: there is exactly one instance for each
+    rank, color and promotion, all created when this module is
+    imported, and calling Piece returns the shared instance. As such,
+    pieces may be compared with "is", and must never be changed.
+
+    Every piece also has a code, which fits in a byte and is what the
+    board stores for each square. Codes are laid out as
+    1 + rank + 8*promoted + 16*color, with rank the index into
+    BASE_RANKS, and 0 left for the empty NoPiece.
+
     :ivar rank: rank of piece
     :ivar moves: legal moves for piece
     :ivar color: color of piece
@@ -23,6 +37,7 @@ class Piece:
     :ivar is_promoted: if piece is promoted
     :ivar is_promotable: if piece is promotable
     :ivar auto_promote: where the piece must promote
+    :ivar code: small integer code of the piece
     """
 
     def __init__(
@@ -57,6 +72,38 @@ class Piece:
             self.is_promoted = True
         other_attributes: dict = info.piece_info[str(self.rank).lower()]
         self.auto_promote: int = other_attributes['autopromote']
+        self.code: int
+        if self.color.int < 0:
+            self.code = 0
+        else:
+            self.code = (1 + BASE_RANKS.index(str(self.rank).lower())
+                         + 8*bool(promoted) + 16*self.color.int)
+
+    @staticmethod
+    def _key(
+            rank: RankLike,
+            color: ColorLike,
+            promoted: Optional[bool] = False
+    ) -> tuple:
+        """Get the key of the shared instance for a piece.
+
+        :param rank: 1-letter rank of piece
+        :param color: 1-letter color of piece
+        :param promoted: if the piece is promoted
+        :return: (lowercase rank, color, promoted)
+        """
+
+        return str(rank).lower(), Color._key(color), bool(promoted)
+
+    @staticmethod
+    def from_code(code: int) -> 'Piece':
+        """Get the piece with a certain code.
+
+        :param code: code of the piece
+        :return: the shared piece
+        """
+
+        return _BY_CODE[code]
 
     def __str__(self):
         return str(self.rank) + str(self.color)
@@ -74,6 +121,9 @@ class Piece:
     def __repr__(self):
         return f"{self.__class__.__name__}({self.color !r}, {self.rank !r})"
 
+    def __reduce__(self):
+        return Piece, (str(self.rank), str(self.color), self.is_promoted)
+
     def promote(self) -> 'Piece':
         """Promote piece.
 
@@ -125,8 +175,7 @@ class Piece:
 
         :return: valid spaces to move to, relative to piece
         """
-        for direction in Direction.valid():
-            yield from self.direction_valid(direction)
+        yield from self.moves.spaces
 
     def direction_valid(self, direct: Direction) -> Generator:
         """Get spaces piece could move in a direction.
@@ -232,4 +281,31 @@ class NoPiece(Piece):
     def __init__(self):
         super().__init__('-', '-')
 
+    @staticmethod
+    def _key() -> tuple: return ()
+
     def __repr__(self): return 'NoPiece()'
+
+    def __reduce__(self): return NoPiece, ()
+
+
+def _create_pieces() -> List[Piece]:
+    """Create every piece in the game, indexed by code.
+
+    Codes which no piece has (promoted golds and kings) are filled
+    with NoPiece.
+
+    :return: list of pieces
+    """
+
+    by_code: List[Piece] = [NoPiece()] * 33
+    for color in Color.valid():
+        for rank in BASE_RANKS:
+            piece = Piece(rank, color)
+            by_code[piece.code] = piece
+            if piece.is_promotable:
+                by_code[piece.promote().code] = piece.promote()
+    return by_code
+
+
+_BY_CODE: List[Piece] = _create_pieces()
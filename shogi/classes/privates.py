@@ -1,10 +1,12 @@
 import json
 
-from typing import Dict, List, TextIO, Union
+from typing import Any, Dict, Hashable, List, TextIO, Union
 
 __all__ = [
     "_InfoClass",
     "_open_data",
+    "_Flyweight",
+    "_Frozen",
 ]
 
 
@@ -52,3 +54,58 @@ def _open_data(file_name: str) -> TextIO:
     cwd = os.path.dirname(__file__)
     file_path = os.path.join(cwd, f'../datafiles/{file_name}')
     return open(file_path)
+
+
+class _Flyweight(type):
+    """Metaclass for classes whose instances are shared.
+
+    Calling a class with this metaclass returns the existing instance
+    for those arguments, if there is one, and only creates (and
+    stores) a new one otherwise. Each class must define a _key static
+    method, which turns the constructor arguments into the hashable
+    key under which the instance is stored. Once created, instances
+    are frozen, as they are shared by everything that asked for them.
+
+    :ivar _instances: key -> the shared instance
+    """
+
+    def __init__(cls, name, bases, namespace):
+        super().__init__(name, bases, namespace)
+        cls._instances: Dict[Hashable, Any] = {}
+
+    def __call__(cls, *args, **kwargs):
+        key = cls._key(*args, **kwargs)
+        try:
+            return cls._instances[key]
+        except KeyError:
+            instance = super().__call__(*args, **kwargs)
+            object.__setattr__(instance, '_frozen', True)
+            cls._instances[key] = instance
+            return instance
+
+
+class _Frozen:
+    """Mixin for instances which may not change once created.
+
+    This is used together with _Flyweight, which marks instances as
+    frozen once they have been initialised. As the instances are
+    shared, copying them returns the instance itself.
+    """
+
+    def __setattr__(self, name, value):
+        if self.__dict__.get('_frozen', False):
+            raise AttributeError(
+                f"{self.__class__.__name__} instances cannot be changed"
+            )
+        super().__setattr__(name, value)
+
+    def __delattr__(self, name):
+        if self.__dict__.get('_frozen', False):
+            raise AttributeError(
+                f"{self.__class__.__name__} instances cannot be changed"
+            )
+        super().__delattr__(name)
+
+    def __copy__(self): return self
+
+    def __deepcopy__(self, memo): return self
@@ -1,7 +1,9 @@
 import collections
 from typing import Generator, Sequence
 
-from .locations import AbsoluteCoord, CoordLike, Direction, RelativeCoord
+from .locations import (
+    AbsoluteCoord, CoordLike, Direction, RelativeCoord, try_offset
+)
 
 __all__ = [
     "Row",
@@ -31,17 +33,17 @@ class Row(collections.abc.Iterable):
         for x in RelativeCoord.positive_xy():
             # Add to the spaces the values in the direction of the
             # row, for as long as they are still in the board
-            try:
-                self.spaces.add(AbsoluteCoord(location + vector.scale(x)))
-            except ValueError:
+            space = try_offset(location, vector.scale(x))
+            if space is None:
                 break
+            self.spaces.add(space)
         for x in RelativeCoord.negative_xy():
             # Do the same for all the values in the opposite direction
             # as what was entered, while still in the board
-            try:
-                self.spaces.add(AbsoluteCoord(location + vector.scale(x)))
-            except ValueError:
+            space = try_offset(location, vector.scale(x))
+            if space is None:
                 break
+            self.spaces.add(space)
 
     def __iter__(self): yield from self.spaces
 
@@ -0,0 +1,63 @@
+"""Tables for SFEN, the standard one-line text form of a position.
+
+An SFEN string is the placement of the pieces, the side to move, the
+pieces in hand and the move number, separated by spaces, e.g. the
+start position is START_SFEN. The placement lists the ranks from
+color 1's side of the board to color 0's, each rank from file 9 to
+file 1 (as SFEN numbers them), which is exactly the order of the
+mailbox, so square x + 9*y is the (x + 9*y)-th square of the string.
+
+Pieces are their rank letter, upper case for color 0 (who moves
+first, called "b" in SFEN) and lower case for color 1 ("w"), with a +
+before promoted pieces. Digits in the placement count empty squares;
+digits in the hands count pieces.
+"""
+
+from typing import Dict, List
+
+from .mailbox import code_piece
+
+__all__ = [
+    "START_SFEN",
+    "SFEN_LETTERS",
+    "SFEN_CODES",
+    "SFEN_HAND_ORDER",
+    "SFEN_TURNS",
+]
+
+START_SFEN: str = (
+    "lnsgkgsnl/1r5b1/ppppppppp/9/9/9/PPPPPPPPP/1B5R1/LNSGKGSNL b - 1"
+)
+"""The standard start position."""
+
+
+def _build_letters() -> List[str]:
+    """Get the SFEN letters of the piece with each code.
+
+    :return: [code] -> letters ('' for empty)
+    """
+
+    letters = [''] * 33
+    for code in range(1, 33):
+        piece = code_piece(code)
+        if piece:
+            letter = str(piece.rank).lower()
+            if not int(piece.color):
+                letter = letter.upper()
+            letters[code] = '+' + letter if piece.is_promoted else letter
+    return letters
+
+
+SFEN_LETTERS: List[str] = _build_letters()
+"""[code]: SFEN letters of a piece ('' for empty)."""
+
+SFEN_CODES: Dict[str, int] = {
+    letter: code for code, letter in enumerate(SFEN_LETTERS) if letter
+}
+"""Code of the piece for each SFEN letters."""
+
+SFEN_HAND_ORDER: str = "RBGSNLPrbgsnlp"
+"""The order pieces in hand are written in."""
+
+SFEN_TURNS: str = "bw"
+"""[color]: SFEN letter of the side to move."""
@@ -1,11 +1,13 @@
-from typing import Optional
+from typing import NamedTuple, Optional
 
 from .aliases import OptCoordTuple
 from .boards import Board
+from .locations import AbsoluteCoord
 from .pieces import Piece, NoPiece
 
 __all__ = [
     "Move",
+    "MoveRecord",
 ]
 
 
@@ -67,3 +69,33 @@ class Move:
         self.tuple = move
 
     def __iter__(self): yield from self.tuple
+
+
+class MoveRecord(NamedTuple):
+    """A compact record of a move which has not been made yet.
+
+    Unlike Move, which describes a move after it has been made, this
+    holds just enough to make the move, and is what move generation
+    produces.
+
+    :ivar start: the location moved from (None for drops)
+    :ivar end: the location moved to
+    :ivar piece: the piece moved or dropped
+    :ivar captured: the piece captured (NoPiece if not a capture)
+    :ivar is_promote: if the piece promotes (None if it can't)
+    """
+    start: Optional[AbsoluteCoord]
+    end: AbsoluteCoord
+    piece: Piece
+    captured: Piece = NoPiece()
+    is_promote: Optional[bool] = None
+
+    @property
+    def is_drop(self) -> bool:
+        """bool: If the move is a drop."""
+        return self.start is None
+
+    @property
+    def is_capture(self) -> bool:
+        """bool: If the move captures a piece."""
+        return bool(self.captured)
@@ -0,0 +1,79 @@
+"""Additive scores of a position, kept up to date as the board changes.
+
+A valuation is a sum with one term for each piece on each square, and
+one for each piece held, by how many of it are held. Each change to
+the board then changes the sum by a couple of table lookups, the same
+way each change XORs a couple of keys into the Zobrist key, so the
+score never has to be added up again from scratch.
+
+What the terms are worth is up to whoever makes the tables (see
+shogi.engine.evaluate); the board only keeps the sum.
+"""
+
+from typing import Dict, List
+
+from .pieceattrs import Color
+from .pieces import Piece
+
+__all__ = [
+    "Valuation",
+]
+
+
+class Valuation:
+    """A running sum of table values over the pieces of a board.
+
+    :ivar square_values: [code][square] -> value of the piece there
+    :ivar hand_values: [code][count] -> value of holding the count-th
+        copy of the piece
+    :ivar score: the sum
+    """
+
+    def __init__(
+            self,
+            squares: bytearray,
+            captured: Dict[Color, List[Piece]],
+            square_values: List[List[int]],
+            hand_values: List[List[int]],
+    ):
+        """Initialise instance of Valuation.
+
+        :param squares: mailbox of the board
+        :param captured: captured pieces of the board
+        :param square_values: [code][square] -> value of the piece there
+        :param hand_values: [code][count] -> value of holding the
+            count-th copy of the piece
+        """
+        self.square_values: List[List[int]] = square_values
+        self.hand_values: List[List[int]] = hand_values
+        self.score: int = 0
+        for index, code in enumerate(squares):
+            self.score += square_values[code][index]
+        for hand in captured.values():
+            counts: Dict[int, int] = {}
+            for piece in hand:
+                counts[piece.code] = counts.get(piece.code, 0) + 1
+                self.score += hand_values[piece.code][counts[piece.code]]
+
+    def square_changed(self, index: int, old_code: int, new_code: int):
+        """Update the sum after a square of the board has changed.
+
+        :param index: index of the changed square
+        :param old_code: code of the piece that was there
+        :param new_code: code of the piece there now
+        """
+
+        values = self.square_values
+        self.score += values[new_code][index] - values[old_code][index]
+
+    def hand_changed(self, code: int, count: int, added: bool):
+        """Update the sum after a piece is added to or taken from a hand.
+
+        :param code: code of the piece
+        :param count: number held, counting the piece (so after it
+            was added, or before it was taken)
+        :param added: if the piece was added
+        """
+
+        value = self.hand_values[code][count]
+        self.score += value if added else -value
@@ -0,0 +1,43 @@
+"""Zobrist keys for hashing positions.
+
+A position's key is the XOR of one random number for each piece on
+each square, one for each piece in hand (the n-th copy of a piece in
+hand has its own number, so counts are covered), and one more if it is
+the second player's turn. As XOR is its own inverse, every change to
+the board changes the key by XOR-ing the numbers of whatever was
+added or removed, so the key is kept up to date in O(1) per change.
+
+The numbers come from a fixed seed, so keys are the same from run to
+run, and can be stored.
+"""
+
+import random
+from typing import List
+
+__all__ = [
+    "PIECE_KEYS",
+    "HAND_KEYS",
+    "SIDE_KEY",
+    "MAX_IN_HAND",
+]
+
+MAX_IN_HAND: int = 18
+"""The most copies of one piece a player can hold (pawns)."""
+
+_random = random.Random(0x5D0C1)
+
+PIECE_KEYS: List[List[int]] = [[0] * 81] + [
+    [_random.getrandbits(64) for _ in range(81)] for _ in range(32)
+]
+"""[code][square]: key of a piece on a square (0 for empty squares)."""
+
+HAND_KEYS: List[List[int]] = [
+    [0] + [_random.getrandbits(64) for _ in range(MAX_IN_HAND)]
+    for _ in range(33)
+]
+"""[code][n]: key of the n-th copy of a piece in hand (n from 1)."""
+
+SIDE_KEY: int = _random.getrandbits(64)
+"""Key XOR-ed in when it is the second player's turn."""
+
+del _random
@@ -0,0 +1,361 @@
+"""A database of positions and their statistics, kept on disk.
+
+Every position is a fixed-size record in a file, which is only ever
+appended to: its Zobrist key, the position from Board.to_bytes, and
+how often it was seen, how the games it was seen in ended, and the
+best move known from it. Records are found through an open-addressing
+hash table on the Zobrist key, kept in a second file beside the first
+(the same name, plus ".idx"), which is rebuilt from the records if it
+is missing or out of date.
+
+Both files are memory-mapped, so nothing is read until it is looked
+up, files larger than memory work, and the position of a record is a
+memoryview of the file rather than a copy:
+
+    with PositionDatabase("games.db") as db:
+        for board in replay:
+            db.record(board, winner=winner)
+    with PositionDatabase("games.db", readonly=True) as db:
+        stats = db.lookup(board.zobrist_key)
+"""
+
+import mmap
+import os
+import struct
+from typing import BinaryIO, Iterator, NamedTuple, Optional, Tuple
+
+from shogi import classes
+from shogi.engine.table import encode_move
+
+__all__ = [
+    "RECORD_SIZE",
+    "PositionStats",
+    "PositionDatabase",
+]
+
+RECORD_SIZE: int = 64
+"""Bytes per record."""
+
+_MAGIC: bytes = b"SHOGIDB1"
+_INDEX_MAGIC: bytes = b"SHOGIDX1"
+# Magic, then the number of records (or, for the index, of slots)
+_HEADER = struct.Struct("<8sQ")
+# The index also has the number of records it indexes
+_INDEX_HEADER = struct.Struct("<8sQQ")
+# Key, position, then the statistics (and 4 spare bytes)
+_RECORD = struct.Struct("<Q32s20s4x")
+_STATS = struct.Struct("<IIIII")
+_STATS_OFFSET: int = 40
+# Records room is made for at a time, at first
+_FIRST_CAPACITY: int = 1024
+
+
+class PositionStats(NamedTuple):
+    """What is known about a position.
+
+    :ivar key: Zobrist key of the position
+    :ivar position: the position, from Board.to_bytes (a view of the
+        file, valid until the database is closed)
+    :ivar visits: number of times it was recorded
+    :ivar white_wins: number of those games color 0 won
+    :ivar black_wins: number of those games color 1 won
+    :ivar draws: number of those games drawn
+    :ivar best_move: best move known, from encode_move (0 if none)
+    """
+    key: int
+    position: memoryview
+    visits: int
+    white_wins: int
+    black_wins: int
+    draws: int
+    best_move: int
+
+    def board(self) -> classes.Board:
+        """Get the position as a board.
+
+        :return: the board
+        """
+        return classes.Board.from_bytes(self.position)
+
+
+class PositionDatabase:
+    """Positions and their statistics, in memory-mapped files.
+
+    :ivar file_name: path of the records (the index adds ".idx")
+    :ivar readonly: if the database was opened only for reading
+    """
+
+    def __init__(
+            self,
+            file_name: str,
+            readonly: bool = False,
+            index_slots: int = 2048
+    ):
+        """Open a database, making it if it does not exist.
+
+        :param file_name: path of the records
+        :param readonly: if the database will only be read
+        :param index_slots: slots of a new index (rounded up to a power
+            of two; the index doubles when half full)
+        :raises FileNotFoundError: no database to open read-only
+        :raises ValueError: file not a position database
+        """
+
+        self.file_name: str = file_name
+        self.readonly: bool = readonly
+        self._index_name: str = file_name + ".idx"
+        if not os.path.exists(file_name):
+            if readonly:
+                raise FileNotFoundError(file_name)
+            with open(file_name, "wb") as f:
+                f.write(_HEADER.pack(_MAGIC, 0))
+                f.truncate(_HEADER.size + _FIRST_CAPACITY*RECORD_SIZE)
+        self._file, self._records = self._map(file_name)
+        magic, self._count = _HEADER.unpack_from(self._records)
+        if magic != _MAGIC:
+            self._records.close()
+            self._file.close()
+            raise ValueError(f"{file_name} is not a position database")
+        self._index_file: Optional[BinaryIO] = None
+        self._index: Optional[mmap.mmap] = None
+        self._slots: memoryview = memoryview(b"").cast('Q')
+        self._mask: int = 0
+        self._open_index(max(index_slots, 2*self._count))
+
+    def __enter__(self) -> 'PositionDatabase':
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, key: int) -> bool:
+        return self._find(key) is not None
+
+    def __iter__(self) -> Iterator[PositionStats]:
+        for number in range(self._count):
+            yield self._read(number)
+
+    def lookup(self, key: int) -> Optional[PositionStats]:
+        """Look up a position.
+
+        :param key: Zobrist key of the position
+        :return: what is known (None if the position isn't stored)
+        """
+
+        number = self._find(key)
+        return None if number is None else self._read(number)
+
+    def record(
+            self,
+            board: classes.Board,
+            winner: Optional[classes.ColorLike] = None,
+            draw: bool = False,
+            best_move: Optional[classes.MoveRecord] = None
+    ) -> PositionStats:
+        """Count a visit to a position, adding it if it is new.
+
+        :param board: board with the position
+        :param winner: color which won the game (None if unknown)
+        :param draw: if the game was drawn
+        :param best_move: best move from the position (None to keep the
+            one stored)
+        :raises ValueError: database opened read-only
+        :return: what is now known about the position
+        """
+
+        if self.readonly:
+            raise ValueError("Database opened read-only")
+        key = board.zobrist_key
+        number = self._find(key)
+        if number is None:
+            number = self._append(key, board.to_bytes())
+        offset = _HEADER.size + number*RECORD_SIZE + _STATS_OFFSET
+        stats = list(_STATS.unpack_from(self._records, offset))
+        stats[0] += 1
+        if winner is not None:
+            stats[1 + int(classes.Color(winner))] += 1
+        if draw:
+            stats[3] += 1
+        if best_move is not None:
+            stats[4] = encode_move(best_move)
+        _STATS.pack_into(self._records, offset, *stats)
+        return self._read(number)
+
+    def flush(self):
+        """Write any changes out to the files."""
+
+        if not self.readonly:
+            self._records.flush()
+            self._index.flush()
+
+    def close(self):
+        """Close the files.
+
+        Views of the positions must not be used afterwards; any still
+        held stop the files being unmapped until they are released.
+        """
+
+        self.flush()
+        self._slots.release()
+        for mapped, file in ((self._records, self._file),
+                             (self._index, self._index_file)):
+            try:
+                mapped.close()
+            except BufferError:
+                pass
+            file.close()
+
+    def _map(self, file_name: str) -> Tuple[BinaryIO, mmap.mmap]:
+        """Open and map a file.
+
+        :param file_name: path of the file
+        :return: the open file, the map of it
+        """
+
+        file = open(file_name, "rb" if self.readonly else "r+b")
+        access = mmap.ACCESS_READ if self.readonly else mmap.ACCESS_WRITE
+        return file, mmap.mmap(file.fileno(), 0, access=access)
+
+    def _open_index(self, slots: int):
+        """Open the index, rebuilding it if it is missing or stale.
+
+        :param slots: fewest slots of a rebuilt index
+        """
+
+        if os.path.exists(self._index_name):
+            index_file, index = self._map(self._index_name)
+            magic, _, indexed = _INDEX_HEADER.unpack_from(index)
+            if magic == _INDEX_MAGIC and indexed == self._count:
+                self._set_index(index_file, index)
+                return
+            index.close()
+            index_file.close()
+        if self.readonly:
+            raise ValueError(f"{self._index_name} is missing or stale")
+        self._rebuild_index(slots)
+
+    def _set_index(self, index_file: BinaryIO, index: mmap.mmap):
+        """Start using a mapped index, closing the old one.
+
+        :param index_file: the open index file
+        :param index: the map of it
+        """
+
+        self._slots.release()
+        if self._index is not None:
+            self._index.close()
+            self._index_file.close()
+        self._index_file = index_file
+        self._index = index
+        # Each slot is the key, then the record number plus one (0 for
+        # an empty slot)
+        self._slots = memoryview(index)[_INDEX_HEADER.size:].cast('Q')
+        self._mask = len(self._slots) // 2 - 1
+
+    def _rebuild_index(self, slots: int):
+        """Make a new index of every record.
+
+        :param slots: fewest slots of the index
+        """
+
+        size = 1
+        while size < slots:
+            size *= 2
+        new_name = self._index_name + ".new"
+        with open(new_name, "wb") as f:
+            f.write(_INDEX_HEADER.pack(_INDEX_MAGIC, size, 0))
+            f.truncate(_INDEX_HEADER.size + 16*size)
+        self._set_index(*self._map(new_name))
+        for number in range(self._count):
+            self._insert(self._key(number), number)
+        _INDEX_HEADER.pack_into(
+            self._index, 0, _INDEX_MAGIC, size, self._count
+        )
+        self._index.flush()
+        os.replace(new_name, self._index_name)
+
+    def _key(self, number: int) -> int:
+        """Get the key of a record.
+
+        :param number: number of the record
+        :return: Zobrist key of its position
+        """
+        return _RECORD.unpack_from(
+            self._records, _HEADER.size + number*RECORD_SIZE
+        )[0]
+
+    def _read(self, number: int) -> PositionStats:
+        """Read a record.
+
+        :param number: number of the record
+        :return: the record
+        """
+
+        offset = _HEADER.size + number*RECORD_SIZE
+        return PositionStats(
+            self._key(number),
+            memoryview(self._records)[offset + 8:offset + _STATS_OFFSET],
+            *_STATS.unpack_from(self._records, offset + _STATS_OFFSET)
+        )
+
+    def _find(self, key: int) -> Optional[int]:
+        """Find the record of a position.
+
+        :param key: Zobrist key of the position
+        :return: number of the record (None if there is none)
+        """
+
+        slots = self._slots
+        slot = key & self._mask
+        while slots[2*slot + 1]:
+            if slots[2*slot] == key:
+                return slots[2*slot + 1] - 1
+            slot = (slot + 1) & self._mask
+        return None
+
+    def _insert(self, key: int, number: int):
+        """Put a record in the index (which must have room for it).
+
+        :param key: Zobrist key of the record's position
+        :param number: number of the record
+        """
+
+        slots = self._slots
+        slot = key & self._mask
+        while slots[2*slot + 1]:
+            slot = (slot + 1) & self._mask
+        slots[2*slot] = key
+        slots[2*slot + 1] = number + 1
+
+    def _append(self, key: int, position: bytes) -> int:
+        """Add a record for a new position, with no statistics.
+
+        :param key: Zobrist key of the position
+        :param position: the position, from Board.to_bytes
+        :return: number of the record
+        """
+
+        number = self._count
+        end = _HEADER.size + (number + 1)*RECORD_SIZE
+        if end > len(self._records):
+            # Double the room; views of the old map keep it alive, so
+            # it is left to be closed when they are released
+            self._records.flush()
+            self._file.truncate(2*len(self._records) - _HEADER.size)
+            self._records = mmap.mmap(self._file.fileno(), 0)
+        _RECORD.pack_into(
+            self._records, end - RECORD_SIZE, key, position, bytes(20)
+        )
+        self._count += 1
+        _HEADER.pack_into(self._records, 0, _MAGIC, self._count)
+        if 2*self._count > self._mask + 1:
+            self._rebuild_index(2*(self._mask + 1))
+        else:
+            self._insert(key, number)
+            _INDEX_HEADER.pack_into(
+                self._index, 0, _INDEX_MAGIC, self._mask + 1, self._count
+            )
+        return number
@@ -0,0 +1,8 @@
+"""Shogi's engine.
+
+Everything needed for the computer to choose its own moves is located
+within this submodule.
+"""
+
+from .search import *
+from .table import *
@@ -0,0 +1,138 @@
+"""Search a position from the command line.
+
+    python -m shogi.engine --depth 4
+    python -m shogi.engine position.json --time 10 --workers 8
+    python -m shogi.engine --time 10 --workers 8 --smp
+    python -m shogi.engine --check
+
+The position file is as for shogi.perft; without one, the start
+position is searched.
+"""
+
+import argparse
+import sys
+from typing import Iterable, Optional
+
+from shogi import classes
+from shogi.perft import load_position, move_name
+from .search import Limits, SearchResult, parallel_search
+from .smp import lazy_smp_search
+from .table import (
+    EXACT, SharedTranspositionTable, TableLike, TranspositionTable
+)
+
+
+def main(args: Optional[Iterable[str]] = None) -> int:
+    """Search a position from the command line.
+
+    :param args: command-line arguments (sys.argv if None)
+    :return: exit status (1 if there are no legal moves, or a check
+        failed)
+    """
+
+    parser = argparse.ArgumentParser(
+        prog="python -m shogi.engine",
+        description="Search for the best move of a position."
+    )
+    parser.add_argument(
+        "position", nargs="?",
+        help="JSON position file (default: start position)"
+    )
+    parser.add_argument(
+        "--depth", type=int, default=4, help="most plies to search"
+    )
+    parser.add_argument(
+        "--nodes", type=int, help="most positions to visit"
+    )
+    parser.add_argument(
+        "--time", type=float, help="most seconds to spend"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1,
+        help="number of processes to search with"
+    )
+    parser.add_argument(
+        "--smp", action="store_true",
+        help="have every process search the whole position, sharing "
+             "one table (lazy SMP), rather than sharing out the moves"
+    )
+    parser.add_argument(
+        "--check", action="store_true",
+        help="check the transposition tables can fill every slot, "
+             "rather than searching"
+    )
+    options = parser.parse_args(args)
+    if options.check:
+        return _check()
+    if options.position is None:
+        board = classes.Board()
+    else:
+        board = load_position(options.position)
+    limits = Limits(options.depth, options.nodes, options.time)
+    if options.smp:
+        result = lazy_smp_search(board, limits, options.workers)
+    else:
+        result = parallel_search(board, limits, options.workers)
+    _report(result)
+    return 0 if result.move is not None else 1
+
+
+def _check() -> int:
+    """Check both slots of each table's last bucket store and probe.
+
+    :return: exit status (1 if any table failed)
+    """
+
+    failed = False
+    shared = SharedTranspositionTable(0.001)
+    try:
+        for table in (TranspositionTable(0.001), shared):
+            if not _check_table(table):
+                failed = True
+    finally:
+        shared.close()
+    return int(failed)
+
+
+def _check_table(table: TableLike) -> bool:
+    """Fill both slots of a table's last bucket, and look them up.
+
+    :param table: empty table to check
+    :return: if both entries were found again
+    """
+
+    # Keys one size apart share a bucket, the shallower entry going in
+    # the always-replace slot
+    keys = (table.size - 1, 2*table.size - 1)
+    try:
+        for depth, key in zip((10, 1), keys):
+            table.store(key, depth, EXACT, depth, 0)
+        found = [table.probe(x) for x in keys]
+    except IndexError as e:
+        print(f"{type(table).__name__}: FAIL ({e})")
+        return False
+    ok = [x is not None and x.depth for x in found] == [10, 1]
+    print(f"{type(table).__name__}: {'ok' if ok else 'FAIL'}")
+    return ok
+
+
+def _report(result: SearchResult):
+    """Print the result of a search.
+
+    :param result: result to print
+    """
+
+    if result.move is None:
+        print("No legal moves")
+    else:
+        print(f"Best move: {move_name(result.move)}")
+        print(f"Score: {result.score}")
+        print(f"PV: {' '.join(move_name(x) for x in result.pv)}")
+    print(f"Depth: {result.depth}")
+    print(f"Nodes: {result.nodes}")
+    print(f"Time: {result.elapsed:.3f}s")
+    print(f"Nodes/s: {result.nodes_per_second}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
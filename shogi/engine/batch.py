@@ -0,0 +1,204 @@
+"""Evaluation of many positions at once, with NumPy.
+
+Boards are encoded into arrays (the piece code on each square, the
+number of each piece in each hand, and whose turn it is), and every
+term of the evaluation is then worked out for the whole batch with
+array operations instead of a Python loop per position. The scores
+are the same as those of shogi.engine.evaluate.evaluate, position for
+position.
+
+NumPy is only needed by this module; the rest of the engine does not
+use it.
+"""
+
+from typing import Iterable, List, NamedTuple
+
+import numpy as np
+
+from shogi import classes
+from shogi.classes import attacks
+from .evaluate import (
+    GUARD_BONUS, GUARD_CODES, HAND_VALUES, INTRUDER_PENALTY, KING_ZONES,
+    PIECE_VALUES, SQUARE_VALUES,
+)
+
+__all__ = [
+    "HAND_SLOTS",
+    "EncodedBoards",
+    "BatchTerms",
+    "encode_boards",
+    "batch_terms",
+    "evaluate_batch",
+]
+
+HAND_SLOTS: int = 14
+"""Number of hand counts per position: 7 droppable ranks, per color."""
+
+
+def _hand_slot(code: int) -> int:
+    """Get the hand count a piece in hand is kept in.
+
+    :param code: code of the (unpromoted) piece
+    :return: 7*color + index of the rank in BASE_RANKS
+    """
+    return 7*((code - 1) >> 4) + ((code - 1) & 7)
+
+
+def _signs() -> np.ndarray:
+    """Get +1 for color 0's codes, -1 for color 1's, 0 for empty.
+
+    :return: [code] -> sign
+    """
+
+    signs = np.zeros(33, dtype=np.int64)
+    signs[1:17] = 1
+    signs[17:] = -1
+    return signs
+
+
+def _build_hand_totals() -> np.ndarray:
+    """Get the value of holding each number of each piece.
+
+    :return: [slot][n] -> sum of the values of the first n copies
+    """
+
+    values = np.zeros((HAND_SLOTS, len(HAND_VALUES[0])), dtype=np.int64)
+    for code in range(1, 33):
+        piece = classes.Piece.from_code(code)
+        if piece and not piece.is_promoted and not piece.is_rank('k'):
+            values[_hand_slot(code)] = HAND_VALUES[code]
+    return np.cumsum(values, axis=1)
+
+
+def _build_guards() -> np.ndarray:
+    """Get which codes count toward the shelter of each color's king.
+
+    :return: [color][code] -> if the piece is one of GUARD_CODES
+    """
+
+    guards = np.zeros((2, 33), dtype=bool)
+    for color, codes in enumerate(GUARD_CODES):
+        guards[color, list(codes)] = True
+    return guards
+
+
+_SIGNS: np.ndarray = _signs()
+_MATERIAL: np.ndarray = _SIGNS * np.array(PIECE_VALUES, dtype=np.int64)
+# Piece-square bonuses on their own, without the material
+_POSITION: np.ndarray = (
+    np.array(SQUARE_VALUES, dtype=np.int64) - _MATERIAL[:, None]
+)
+# Moves each piece has from each square, on an empty board
+_MOBILITY: np.ndarray = np.array(
+    [[len(x) for x in attacks.TARGETS[code]] for code in range(33)],
+    dtype=np.int64
+) * _SIGNS[:, None]
+_HAND_TOTALS: np.ndarray = _build_hand_totals()
+_ZONES: np.ndarray = np.array(
+    [[bool(zone >> x & 1) for x in range(81)] for zone in KING_ZONES]
+)
+_IS_GUARD: np.ndarray = _build_guards()
+# [color][code]: if the code is a piece of the other color
+_IS_ENEMY: np.ndarray = np.stack([_SIGNS < 0, _SIGNS > 0])
+_KING_CODES: List[int] = [classes.Piece('k', x).code for x in range(2)]
+
+
+class EncodedBoards(NamedTuple):
+    """A batch of positions, as arrays.
+
+    :ivar codes: N x 81 piece codes, indexed x + 9*y
+    :ivar hands: N x 14 numbers of each piece held (see HAND_SLOTS)
+    :ivar turns: N ints of the color to move
+    """
+    codes: np.ndarray
+    hands: np.ndarray
+    turns: np.ndarray
+
+
+class BatchTerms(NamedTuple):
+    """The terms of the evaluation of a batch, each for color 0.
+
+    :ivar material: value of the pieces on the board
+    :ivar position: piece-square bonuses of the pieces on the board
+    :ivar hand: value of the pieces in hand
+    :ivar king_safety: shelter of color 0's king, less color 1's
+    :ivar mobility: moves the pieces would have on an empty board (a
+        rough measure of mobility, not part of the score)
+    """
+    material: np.ndarray
+    position: np.ndarray
+    hand: np.ndarray
+    king_safety: np.ndarray
+    mobility: np.ndarray
+
+    @property
+    def score(self) -> np.ndarray:
+        """numpy.ndarray: Total score for color 0."""
+        return self.material + self.position + self.hand + self.king_safety
+
+
+def encode_boards(boards: Iterable[classes.Board]) -> EncodedBoards:
+    """Encode boards as arrays.
+
+    :param boards: boards to encode
+    :return: the encoded batch
+    """
+
+    boards = list(boards)
+    codes = np.zeros((len(boards), 81), dtype=np.uint8)
+    hands = np.zeros((len(boards), HAND_SLOTS), dtype=np.uint8)
+    turns = np.zeros(len(boards), dtype=np.uint8)
+    for row, board in enumerate(boards):
+        for location, piece in board.pieces.items():
+            codes[row, location.x + 9*location.y] = piece.code
+        for hand in board.captured.values():
+            for piece in hand:
+                hands[row, _hand_slot(piece.code)] += 1
+        turns[row] = int(board.current_player)
+    return EncodedBoards(codes, hands, turns)
+
+
+def _king_safety(codes: np.ndarray, color: int) -> np.ndarray:
+    """Score how well a color's king is sheltered, for a batch.
+
+    :param codes: N x 81 piece codes
+    :param color: int of the king's color
+    :return: score of each position, for the king's color
+    """
+
+    is_king = codes == _KING_CODES[color]
+    zones = _ZONES[is_king.argmax(axis=1)]
+    guards = (zones & _IS_GUARD[color][codes]).sum(axis=1)
+    intruders = (zones & _IS_ENEMY[color][codes]).sum(axis=1)
+    score = GUARD_BONUS * guards - INTRUDER_PENALTY * intruders
+    return np.where(is_king.any(axis=1), score, 0)
+
+
+def batch_terms(encoded: EncodedBoards) -> BatchTerms:
+    """Work out each term of the evaluation for a batch.
+
+    :param encoded: the encoded batch
+    :return: the terms, for color 0
+    """
+
+    codes = encoded.codes.astype(np.intp)
+    squares = np.arange(81)
+    hands = encoded.hands.astype(np.intp)
+    return BatchTerms(
+        material=_MATERIAL[codes].sum(axis=1),
+        position=_POSITION[codes, squares].sum(axis=1),
+        hand=_HAND_TOTALS[np.arange(HAND_SLOTS), hands].sum(axis=1),
+        king_safety=_king_safety(codes, 0) - _king_safety(codes, 1),
+        mobility=_MOBILITY[codes, squares].sum(axis=1),
+    )
+
+
+def evaluate_batch(encoded: EncodedBoards) -> np.ndarray:
+    """Score a batch of positions, each for its player to move.
+
+    :param encoded: the encoded batch
+    :return: the same scores as evaluate gives
+    """
+
+    score = batch_terms(encoded).score
+    return np.where(encoded.turns == 1, -score, score)
@@ -0,0 +1,270 @@
+"""Static evaluation of positions.
+
+A position is scored from material (what each piece is worth, on the
+board or in hand), where each piece stands (piece-square tables) and
+how well each king is sheltered. The first two are sums of one table
+value per piece, so the board keeps their total up to date itself
+(see Board.track_valuation) and evaluating a position is a lookup,
+plus the king terms, which are a few bitboard operations.
+
+Scores are in centipawns (a pawn on its starting rank is 100), for
+the player to move.
+"""
+
+from typing import Dict, List, Tuple
+
+from shogi import classes
+from shogi.classes import attacks
+from shogi.classes.zobrist import MAX_IN_HAND
+
+__all__ = [
+    "PIECE_VALUES",
+    "HAND_VALUES",
+    "SQUARE_VALUES",
+    "GUARD_BONUS",
+    "INTRUDER_PENALTY",
+    "KING_ZONES",
+    "GUARD_CODES",
+    "evaluate",
+    "static_score",
+    "king_safety_score",
+    "track_evaluation",
+]
+
+_BASE_VALUES: Dict[str, Tuple[int, int]] = {
+    'p': (100, 550),
+    'l': (300, 550),
+    'n': (350, 550),
+    's': (500, 550),
+    'g': (550, 550),
+    'b': (800, 1050),
+    'r': (1000, 1250),
+    'k': (0, 0),
+}
+
+# Pieces in hand can go anywhere, so are worth a little more than on
+# the board; each further copy is worth less than the last
+_HAND_BONUS: int = 10
+_HAND_DECAY: int = 5
+
+GUARD_BONUS: int = 15
+"""Score of each gold or silver (or the like) next to its own king."""
+INTRUDER_PENALTY: int = 25
+"""Score lost for each enemy piece next to the king."""
+
+
+def _build_values() -> List[int]:
+    """Get the value of the piece with each code.
+
+    :return: [code] -> value
+    """
+
+    values = [0] * 33
+    for code in range(1, 33):
+        piece = classes.Piece.from_code(code)
+        if piece:
+            rank = str(piece.rank).lower()
+            values[code] = _BASE_VALUES[rank][bool(piece.is_promoted)]
+    return values
+
+
+PIECE_VALUES: List[int] = _build_values()
+"""[code]: material value of each piece, on the board or in hand."""
+
+
+def _is_guard(piece: classes.Piece) -> bool:
+    """Check if a piece moves like a gold or silver.
+
+    :param piece: piece to check
+    :return: if it is a gold, silver, or promoted minor piece
+    """
+
+    rank = str(piece.rank).lower()
+    if piece.is_promoted:
+        return rank in 'plns'
+    return rank in 'gs'
+
+
+def _square_bonus(piece: classes.Piece, x: int, advance: int) -> int:
+    """Get how much better a piece is on a square than its material.
+
+    :param piece: piece on the square
+    :param x: file (x coordinate) of the square
+    :param advance: ranks from the piece's own back rank (0 to 8)
+    :return: bonus for the piece being there
+    """
+
+    rank = str(piece.rank).lower()
+    centre = 4 - abs(x - 4)
+    if rank == 'k':
+        # The king is safest at the back, away from the middle
+        return -15*advance + 5*(4 - centre)
+    if rank == 'p' and not piece.is_promoted:
+        # Pawns gain by pushing forward, from their starting rank
+        return 5*max(advance - 2, 0)
+    if _is_guard(piece):
+        # Golds and the pieces moving like them belong in the middle,
+        # not too far forward, where they can defend and attack
+        return 3*centre + 4*min(advance, 4)
+    if rank == 'n':
+        return 4*min(advance, 4)
+    if rank == 'b':
+        return 2*centre
+    if rank == 'r':
+        # Rooks are strongest in the enemy camp
+        return 20 if advance >= 6 else 0
+    return 0
+
+
+def _build_square_values() -> List[List[int]]:
+    """Get the value of each piece on each square, for color 0.
+
+    Values are positive for color 0's pieces and negative for color 1's.
+
+    :return: [code][square] -> value
+    """
+
+    values = [[0] * 81 for _ in range(33)]
+    for code in range(1, 33):
+        piece = classes.Piece.from_code(code)
+        if not piece:
+            continue
+        color = int(piece.color)
+        sign = -1 if color else 1
+        for index in range(81):
+            x, y = index % 9, index // 9
+            # Color 0 moves toward y == 0, color 1 toward y == 8
+            advance = y if color else 8 - y
+            values[code][index] = sign * (
+                PIECE_VALUES[code] + _square_bonus(piece, x, advance)
+            )
+    return values
+
+
+def _build_hand_values() -> List[List[int]]:
+    """Get the value of each copy of each piece in hand, for color 0.
+
+    Values are positive for color 0's pieces and negative for color 1's.
+
+    :return: [code][n] -> value of the n-th copy (n from 1)
+    """
+
+    values = [[0] * (MAX_IN_HAND + 1) for _ in range(33)]
+    for code in range(1, 33):
+        piece = classes.Piece.from_code(code)
+        if not piece or piece.is_promoted or piece.is_rank('k'):
+            continue
+        sign = -1 if int(piece.color) else 1
+        value = PIECE_VALUES[code] * (100 + _HAND_BONUS) // 100
+        for count in range(1, MAX_IN_HAND + 1):
+            decay = min(_HAND_DECAY * (count - 1), 50)
+            values[code][count] = sign * (value * (100 - decay) // 100)
+    return values
+
+
+SQUARE_VALUES: List[List[int]] = _build_square_values()
+"""[code][square]: material and position value of a piece on a square,
+positive for color 0's pieces and negative for color 1's."""
+
+HAND_VALUES: List[List[int]] = _build_hand_values()
+"""[code][n]: value of the n-th copy of a piece in hand, positive for
+color 0's pieces and negative for color 1's."""
+
+
+def _build_king_zones() -> List[int]:
+    """Get the squares around the king on each square.
+
+    :return: [square] -> bitboard of the square and its neighbours
+    """
+
+    king_code = classes.Piece('k', 0).code
+    return [
+        classes.to_bitboard(attacks.TARGETS[king_code][index])
+        | classes.SQUARE_BITS[index]
+        for index in range(81)
+    ]
+
+
+KING_ZONES: List[int] = _build_king_zones()
+"""[square]: bitboard of the square and those next to it."""
+
+GUARD_CODES: List[Tuple[int, ...]] = [
+    tuple(
+        code for code in range(1 + 16*color, 17 + 16*color)
+        if _is_guard(classes.Piece.from_code(code))
+    )
+    for color in range(2)
+]
+"""[color]: codes of the pieces which count toward shelter."""
+
+
+def track_evaluation(board: classes.Board) -> classes.Valuation:
+    """Have a board keep the material and position score up to date.
+
+    After this, evaluate no longer adds up the pieces of the board.
+
+    :param board: board to track
+    :return: the board's valuation
+    """
+
+    return board.track_valuation(SQUARE_VALUES, HAND_VALUES)
+
+
+def static_score(board: classes.Board) -> int:
+    """Add up the material and position score from scratch.
+
+    :param board: board to score
+    :return: score for color 0
+    """
+
+    score = 0
+    for index, code in enumerate(board.squares):
+        score += SQUARE_VALUES[code][index]
+    for hand in board.captured.values():
+        counts: Dict[int, int] = {}
+        for piece in hand:
+            counts[piece.code] = counts.get(piece.code, 0) + 1
+            score += HAND_VALUES[piece.code][counts[piece.code]]
+    return score
+
+
+def king_safety_score(board: classes.Board, color: int) -> int:
+    """Score how well a king is sheltered.
+
+    :param board: board to score
+    :param color: int of the king's color
+    :return: score for the king's color
+    """
+
+    king = board.get_king(color)
+    if king is None:
+        return 0
+    zone = KING_ZONES[classes.square_index(king)]
+    bitboards = board.bitboards
+    guards = 0
+    for code in GUARD_CODES[color]:
+        guards |= bitboards[code]
+    intruders = board.color_bitboards[1 - color]
+    return (GUARD_BONUS * bin(zone & guards).count('1')
+            - INTRUDER_PENALTY * bin(zone & intruders).count('1'))
+
+
+def evaluate(board: classes.Board) -> int:
+    """Score a position for the player to move.
+
+    If the board is being tracked (see track_evaluation), this takes
+    constant time; otherwise the pieces are added up first.
+
+    :param board: board to score
+    :return: score for the player to move
+    """
+
+    valuation = board.valuation
+    if (valuation is not None
+            and valuation.square_values is SQUARE_VALUES
+            and valuation.hand_values is HAND_VALUES):
+        score = valuation.score
+    else:
+        score = static_score(board)
+    score += king_safety_score(board, 0) - king_safety_score(board, 1)
+    return -score if int(board.current_player) else score
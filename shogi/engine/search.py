@@ -0,0 +1,555 @@
+"""Alpha-beta search, deepened one ply at a time.
+
+The search is a negamax alpha-beta over the moves of generate_moves,
+so it follows exactly the rules check_move and is_legal_drop enforce.
+Moves are made and taken back in place with Board.make and
+Board.unmake. Each iteration searches one ply deeper than the last,
+trying the best moves found so far first, until the depth, node or
+time limit runs out; the result of the deepest finished iteration is
+the one used.
+"""
+
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, List, NamedTuple, Optional, Tuple
+
+from shogi import classes
+from shogi.classes import attacks
+from shogi.functions import generate_moves
+from .evaluate import PIECE_VALUES, evaluate, track_evaluation
+from .table import (
+    EXACT, LOWER, UPPER, TableLike, TranspositionTable, decode_move,
+    encode_move
+)
+
+__all__ = [
+    "MATE_SCORE",
+    "Limits",
+    "SearchResult",
+    "Searcher",
+    "search",
+    "best_move",
+    "parallel_search",
+    "order_moves",
+]
+
+MATE_SCORE: int = 1000000
+"""Score of being checkmated now (less the plies until it happens)."""
+
+
+class Limits(NamedTuple):
+    """How long a search may go on for.
+
+    :ivar depth: deepest number of plies to search
+    :ivar nodes: most positions to visit (None for no limit)
+    :ivar time: most seconds to spend (None for no limit)
+    """
+    depth: int = 3
+    nodes: Optional[int] = None
+    time: Optional[float] = None
+
+
+class SearchResult(NamedTuple):
+    """The result of a search.
+
+    :ivar move: best move found (None if there are no legal moves)
+    :ivar score: score of the move for the player to move
+    :ivar depth: depth of the deepest finished iteration
+    :ivar nodes: number of positions visited
+    :ivar elapsed: seconds taken
+    :ivar pv: the moves expected to be played, best move first
+    """
+    move: Optional[classes.MoveRecord]
+    score: int
+    depth: int
+    nodes: int
+    elapsed: float
+    pv: Tuple[classes.MoveRecord, ...] = ()
+
+    @property
+    def nodes_per_second(self) -> int:
+        """int: Positions visited per second."""
+        return int(self.nodes / self.elapsed) if self.elapsed else 0
+
+
+class _OutOfTime(Exception):
+    """Raised inside the search when a limit is reached."""
+
+
+class Searcher:
+    """An iterative-deepening alpha-beta search of one position.
+
+    :ivar board: board being searched (put back after every move)
+    :ivar limits: limits of the search
+    :ivar nodes: number of positions visited so far
+    :ivar table: transposition table of positions searched
+    :ivar root_moves: the moves to search from the position (every
+        legal move if None)
+    :ivar stop: called every so often, to ask if the search should
+        stop early (never, if None)
+    """
+
+    def __init__(
+            self,
+            board: classes.Board,
+            limits: Limits = Limits(),
+            table: Optional[TableLike] = None,
+            root_moves: Optional[List[classes.MoveRecord]] = None,
+            stop: Optional[Callable[[], bool]] = None
+    ):
+        """Initialise instance of Searcher.
+
+        :param board: board to search
+        :param limits: limits of the search
+        :param table: transposition table to use (a new one if None)
+        :param root_moves: the moves to search from the position (every
+            legal move if None)
+        :param stop: called every so often, to ask if the search should
+            stop early (never, if None)
+        """
+        self.board: classes.Board = board
+        self.limits: Limits = limits
+        self.root_moves: Optional[List[classes.MoveRecord]] = root_moves
+        self.stop: Optional[Callable[[], bool]] = stop
+        self.nodes: int = 0
+        if table is None:
+            table = TranspositionTable()
+        self.table: TableLike = table
+        self._deadline: Optional[float] = None
+
+    def run(
+            self,
+            callback: Callable[[SearchResult], None] = None
+    ) -> SearchResult:
+        """Search the position.
+
+        :param callback: called with the result of each iteration
+        :return: result of the deepest finished iteration
+        """
+
+        start = time.perf_counter()
+        if self.limits.time is not None:
+            self._deadline = start + self.limits.time
+        # Keep the board's score up to date, so leaves are a lookup,
+        # but only while searching: the board is handed back as it was
+        valuation = self.board.valuation
+        track_evaluation(self.board)
+        try:
+            return self._iterate(start, callback)
+        finally:
+            self.board.valuation = valuation
+
+    def _iterate(
+            self,
+            start: float,
+            callback: Optional[Callable[[SearchResult], None]]
+    ) -> SearchResult:
+        """Search deeper and deeper, until out of depth or time.
+
+        :param start: time the search started
+        :param callback: called with the result of each iteration
+        :return: result of the deepest finished iteration
+        """
+
+        if self.root_moves is None:
+            moves = list(generate_moves(self.board))
+        else:
+            moves = list(self.root_moves)
+        moves = order_moves(self.board, moves)
+        result = SearchResult(None, -MATE_SCORE, 0, 0, 0.0)
+        if not moves:
+            return result
+        for depth in range(1, self.limits.depth + 1):
+            try:
+                score, move = self._root(moves, depth)
+            except _OutOfTime:
+                break
+            result = SearchResult(
+                move, score, depth, self.nodes,
+                time.perf_counter() - start, self._pv(depth)
+            )
+            if callback is not None:
+                callback(result)
+            # Try the best move first next time
+            moves.remove(move)
+            moves.insert(0, move)
+            # No deeper search can change a forced mate
+            if abs(score) >= MATE_SCORE - depth:
+                break
+        if result.move is None:
+            # Not even one ply finished, so take the first move
+            result = SearchResult(
+                moves[0], evaluate(self.board), 0, self.nodes,
+                time.perf_counter() - start
+            )
+        return result._replace(elapsed=time.perf_counter() - start)
+
+    def _root(
+            self,
+            moves: List[classes.MoveRecord],
+            depth: int
+    ) -> Tuple[int, classes.MoveRecord]:
+        """Search the moves of the position being searched.
+
+        :param moves: legal moves, in the order to try them
+        :param depth: number of plies to search
+        :return: best score and move
+        """
+
+        alpha, beta = -MATE_SCORE - 1, MATE_SCORE + 1
+        best_move = moves[0]
+        for move in moves:
+            score = -self._child(move, depth, -beta, -alpha, 1)
+            if score > alpha:
+                alpha, best_move = score, move
+        self.table.store(
+            self.board.zobrist_key, depth, EXACT,
+            alpha, encode_move(best_move)
+        )
+        return alpha, best_move
+
+    def _child(
+            self,
+            move: classes.MoveRecord,
+            depth: int,
+            alpha: int,
+            beta: int,
+            ply: int
+    ) -> int:
+        """Make a move, search the position after it, and take it back.
+
+        :param move: move to make
+        :param depth: depth left before the move
+        :param alpha: lower bound, for the player after the move
+        :param beta: upper bound, for the player after the move
+        :param ply: number of plies from the root after the move
+        :return: score for the player after the move
+        """
+
+        self.board.make(move)
+        try:
+            return self._negamax(depth - 1, alpha, beta, ply)
+        finally:
+            self.board.unmake()
+
+    def _negamax(
+            self,
+            depth: int,
+            alpha: int,
+            beta: int,
+            ply: int
+    ) -> int:
+        """Search the current position.
+
+        :param depth: number of plies left to search
+        :param alpha: score the player to move is already sure of
+        :param beta: score the other player is already sure of
+        :param ply: number of plies from the root
+        :raises _OutOfTime: a limit was reached
+        :return: score for the player to move
+        """
+
+        self.nodes += 1
+        self._check_limits()
+        if depth <= 0:
+            return evaluate(self.board)
+        key = self.board.zobrist_key
+        entry = self.table.probe(key)
+        hint = None
+        if entry is not None:
+            # A deep enough result can be used as it is, if its bound
+            # settles the question being asked
+            if entry.depth >= depth:
+                score = _from_table(entry.score, ply)
+                if (entry.bound == EXACT
+                        or (entry.bound == LOWER and score >= beta)
+                        or (entry.bound == UPPER and score <= alpha)):
+                    return score
+            if entry.move:
+                hint = decode_move(self.board, entry.move)
+        moves = list(generate_moves(self.board))
+        # No legal moves is checkmate (there is no stalemate in shogi)
+        if not moves:
+            return -MATE_SCORE + ply
+        original_alpha = alpha
+        best_score = -MATE_SCORE - 1
+        best_move = None
+        for move in order_moves(self.board, moves, hint):
+            score = -self._child(move, depth, -beta, -alpha, ply + 1)
+            if score > best_score:
+                best_score, best_move = score, move
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        break
+        if best_score >= beta:
+            bound = LOWER
+        elif best_score <= original_alpha:
+            bound = UPPER
+        else:
+            bound = EXACT
+        self.table.store(
+            key, depth, bound, _to_table(best_score, ply),
+            encode_move(best_move)
+        )
+        return best_score
+
+    def _check_limits(self):
+        """Stop the search if a limit is reached.
+
+        :raises _OutOfTime: a limit was reached
+        """
+
+        nodes = self.limits.nodes
+        if nodes is not None and self.nodes >= nodes:
+            raise _OutOfTime
+        # Checking the clock is slow, so only do so every so often
+        if self.nodes & 1023:
+            return
+        if (self._deadline is not None
+                and time.perf_counter() >= self._deadline):
+            raise _OutOfTime
+        if self.stop is not None and self.stop():
+            raise _OutOfTime
+
+    def _pv(self, depth: int) -> Tuple[classes.MoveRecord, ...]:
+        """Get the moves expected to be played from the position.
+
+        :param depth: most moves to follow
+        :return: the principal variation
+        """
+
+        pv = []
+        try:
+            for _ in range(depth):
+                entry = self.table.probe(self.board.zobrist_key)
+                if entry is None or not entry.move:
+                    break
+                move = decode_move(self.board, entry.move)
+                if move not in generate_moves(self.board):
+                    break
+                pv.append(move)
+                self.board.make(move)
+        finally:
+            for _ in pv:
+                self.board.unmake()
+        return tuple(pv)
+
+
+def search(
+        board: classes.Board,
+        limits: Limits = Limits(),
+        callback: Callable[[SearchResult], None] = None,
+        table: Optional[TableLike] = None
+) -> SearchResult:
+    """Search for the best move of the player to move.
+
+    The board is put back as it was once the search is done.
+
+    :param board: board to search
+    :param limits: limits of the search
+    :param callback: called with the result of each iteration
+    :param table: transposition table to use (a new one if None)
+    :return: result of the search
+    """
+
+    return Searcher(board, limits, table).run(callback)
+
+
+def best_move(
+        board: classes.Board,
+        limits: Limits = Limits(),
+        table: Optional[TableLike] = None
+) -> Optional[classes.MoveRecord]:
+    """Get the best move of the player to move.
+
+    :param board: board to search
+    :param limits: limits of the search
+    :param table: transposition table to use (a new one if None)
+    :return: best move found (None if there are no legal moves)
+    """
+
+    return search(board, limits, table=table).move
+
+
+def parallel_search(
+        board: classes.Board,
+        limits: Limits = Limits(),
+        workers: int = 1
+) -> SearchResult:
+    """Search for the best move, sharing the moves among processes.
+
+    The moves of the position are dealt out to a pool of processes,
+    which each search theirs, with their own table, to the same
+    limits (a node limit is split between them). Of the depths every
+    process finished, the best move at the deepest is the result.
+
+    :param board: board to search
+    :param limits: limits of the search, for each process
+    :param workers: number of processes to search with
+    :return: result of the search
+    """
+
+    if workers <= 1:
+        return search(board, limits)
+    start = time.perf_counter()
+    moves = order_moves(board, list(generate_moves(board)))
+    if not moves:
+        return SearchResult(None, -MATE_SCORE, 0, 0, 0.0)
+    # Deal the moves out in turn, so each share has some of the moves
+    # that look best
+    shares = [moves[x::workers] for x in range(min(workers, len(moves)))]
+    if limits.nodes is not None:
+        limits = limits._replace(nodes=max(limits.nodes // len(shares), 1))
+    data = board.pack()
+    with ProcessPoolExecutor(max_workers=len(shares)) as pool:
+        futures = [
+            pool.submit(
+                _search_share, data, [encode_move(x) for x in share], limits
+            )
+            for share in shares
+        ]
+        results = [x.result() for x in futures]
+    nodes = sum(x for x, _ in results)
+    depth = min(len(x) for _, x in results)
+    elapsed = time.perf_counter() - start
+    if not depth:
+        # Some share didn't finish even one ply, so take the first move
+        return SearchResult(moves[0], evaluate(board), 0, nodes, elapsed)
+    score, move, pv = max(
+        (x[depth - 1] for _, x in results), key=lambda x: x[0]
+    )
+    return SearchResult(
+        decode_move(board, move), score, depth, nodes, elapsed,
+        _decode_line(board, pv)
+    )
+
+
+def _search_share(
+        data: bytes,
+        moves: List[int],
+        limits: Limits
+) -> Tuple[int, List[Tuple[int, int, Tuple[int, ...]]]]:
+    """Search some of the moves of a packed position.
+
+    This is what each process of parallel_search runs.
+
+    :param data: position, from Board.pack
+    :param moves: moves to search, from encode_move
+    :param limits: limits of the search
+    :return: nodes visited, and the score, move and principal
+        variation (from encode_move) of each depth finished
+    """
+
+    board = classes.Board.unpack(data)
+    iterations = []
+
+    def finished(result: SearchResult):
+        iterations.append((
+            result.score, encode_move(result.move),
+            tuple(encode_move(x) for x in result.pv)
+        ))
+
+    root_moves = [decode_move(board, x) for x in moves]
+    result = Searcher(board, limits, root_moves=root_moves).run(finished)
+    return result.nodes, iterations
+
+
+def _decode_line(
+        board: classes.Board,
+        line: Tuple[int, ...]
+) -> Tuple[classes.MoveRecord, ...]:
+    """Turn a line of moves from encode_move back into moves.
+
+    :param board: board the line is played from (put back afterwards)
+    :param line: the moves, from encode_move
+    :return: the moves
+    """
+
+    moves = []
+    try:
+        for packed in line:
+            move = decode_move(board, packed)
+            moves.append(move)
+            board.make(move)
+    finally:
+        for _ in moves:
+            board.unmake()
+    return tuple(moves)
+
+
+def _to_table(score: int, ply: int) -> int:
+    """Make a mate score relative to the position, to be stored.
+
+    Mate scores count plies from the root, but the same position can
+    be reached at different plies, so they are stored counting from
+    the position itself instead.
+
+    :param score: score, counting from the root
+    :param ply: number of plies from the root
+    :return: score, counting from the position
+    """
+
+    if score >= MATE_SCORE - 1000:
+        return score + ply
+    if score <= -MATE_SCORE + 1000:
+        return score - ply
+    return score
+
+
+def _from_table(score: int, ply: int) -> int:
+    """Undo _to_table on a stored score.
+
+    :param score: score, counting from the position
+    :param ply: number of plies from the root
+    :return: score, counting from the root
+    """
+
+    if score >= MATE_SCORE - 1000:
+        return score - ply
+    if score <= -MATE_SCORE + 1000:
+        return score + ply
+    return score
+
+
+def order_moves(
+        board: classes.Board,
+        moves: List[classes.MoveRecord],
+        first: Optional[classes.MoveRecord] = None
+) -> List[classes.MoveRecord]:
+    """Sort moves so the most promising are searched first.
+
+    The best move found before comes first, then captures (most
+    valuable victim, then least valuable attacker), promotions and
+    checks, then everything else.
+
+    :param board: board the moves are made on
+    :param moves: moves to sort
+    :param first: move to put first, if any
+    :return: sorted moves
+    """
+
+    king = board.get_king(board.current_player.other)
+    king_index = -1 if king is None else classes.square_index(king)
+    squares = board.squares
+
+    def priority(move: classes.MoveRecord) -> int:
+        if move == first:
+            return 1 << 30
+        score = 0
+        if move.is_capture:
+            score += 100000 + 10*PIECE_VALUES[move.captured.code]
+            score -= PIECE_VALUES[move.piece.code] // 10
+        if move.is_promote:
+            score += 50000
+        code = move.piece.code + 8 if move.is_promote else move.piece.code
+        end = classes.square_index(move.end)
+        # Only checks by the moved piece itself are looked for
+        if king_index in attacks.TARGETS[code][end]:
+            start = -1 if move.is_drop else classes.square_index(move.start)
+            if not any(squares[x] and x != start
+                       for x in attacks.BETWEEN[end][king_index]):
+                score += 20000
+        return score
+
+    return sorted(moves, key=priority, reverse=True)
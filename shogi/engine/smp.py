@@ -0,0 +1,106 @@
+"""Lazy SMP: several processes searching the same position at once.
+
+Rather than sharing the moves out (as parallel_search does), every
+process searches the whole position, and they share one
+transposition table in shared memory. The helper processes try the
+moves in a different order, and every other one searches a ply
+deeper, so they go different ways through the tree, and fill the
+table with results the main search then finds instead of searching.
+The main search runs in the calling process, and its result is the
+answer; once it finishes, the helpers are told to stop.
+"""
+
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from shogi import classes
+from shogi.functions import generate_moves
+from .search import Limits, SearchResult, Searcher, search
+from .table import SharedTranspositionTable
+
+__all__ = [
+    "lazy_smp_search",
+]
+
+
+def lazy_smp_search(
+        board: classes.Board,
+        limits: Limits = Limits(),
+        workers: int = 1,
+        size_mb: float = 16
+) -> SearchResult:
+    """Search for the best move, with helpers sharing the table.
+
+    :param board: board to search (put back as it was afterwards)
+    :param limits: limits of the search, for each process
+    :param workers: number of processes to search with, counting
+        this one
+    :param size_mb: size of the shared table, in megabytes
+    :return: result of the main search, counting the helpers' nodes
+    """
+
+    if workers <= 1:
+        return search(board, limits)
+    start = time.perf_counter()
+    table = SharedTranspositionTable(size_mb)
+    data = board.pack()
+    try:
+        with ProcessPoolExecutor(max_workers=workers - 1) as pool:
+            helpers = [
+                pool.submit(
+                    _helper, data, table.name, size_mb, limits, number
+                )
+                for number in range(1, workers)
+            ]
+            try:
+                result = Searcher(board, limits, table).run()
+            finally:
+                # Before the pool waits for the helpers, even if the
+                # main search failed
+                table.request_stop()
+            nodes = result.nodes + sum(x.result() for x in helpers)
+    finally:
+        table.close()
+    return result._replace(
+        nodes=nodes, elapsed=time.perf_counter() - start
+    )
+
+
+def _helper(
+        data: bytes,
+        name: str,
+        size_mb: float,
+        limits: Limits,
+        number: int
+) -> int:
+    """Search a packed position, until told to stop.
+
+    This is what each helper process of lazy_smp_search runs.
+
+    :param data: position, from Board.pack
+    :param name: name of the shared table
+    :param size_mb: size of the shared table, in megabytes
+    :param limits: limits of the main search
+    :param number: number of the helper, from 1
+    :return: nodes visited
+    """
+
+    board = classes.Board.unpack(data)
+    table = SharedTranspositionTable(size_mb, name)
+    try:
+        # Moves the ordering rates the same are tried in a different
+        # order by each helper
+        moves = list(generate_moves(board))
+        random.Random(number).shuffle(moves)
+        searcher = Searcher(
+            board,
+            limits._replace(depth=limits.depth + number % 2),
+            table,
+            root_moves=moves,
+            stop=lambda: table.stop_requested
+        )
+        searcher.run()
+        return searcher.nodes
+    finally:
+        table.close()
@@ -0,0 +1,381 @@
+"""A fixed-size transposition table.
+
+The same position is often reached by different orders of the same
+moves (especially with drops), so the search stores what it learned
+about each position it finishes, keyed by the position's Zobrist key,
+and looks it up before searching a position again.
+
+The table is allocated up front, in flat arrays, to a memory cap.
+Entries are in buckets of two: the first keeps whichever entry was
+searched deepest, the second always takes the newest entry, so deep
+results survive while recent ones are still kept.
+
+SharedTranspositionTable keeps the same table in shared memory, so
+several processes can search with it at once. Its entries are written
+without locks: each is a data word and the data XOR-ed with the key,
+so an entry half-written by one process while another writes the same
+slot no longer matches its key, and is ignored.
+"""
+
+import array
+from multiprocessing import shared_memory
+from typing import NamedTuple, Optional, Union
+
+from shogi import classes
+
+__all__ = [
+    "EXACT",
+    "LOWER",
+    "UPPER",
+    "TableEntry",
+    "TranspositionTable",
+    "SharedTranspositionTable",
+    "TableLike",
+    "encode_move",
+    "decode_move",
+]
+
+EXACT: int = 0
+"""Bound of a score which is exact."""
+LOWER: int = 1
+"""Bound of a score which is at least the stored one (a cutoff)."""
+UPPER: int = 2
+"""Bound of a score which is at most the stored one (no move raised
+alpha)."""
+
+_EMPTY: int = -1
+# Bytes per entry: key (8), score (4), move (4), depth (1), bound (1)
+_ENTRY_SIZE: int = 18
+
+
+class TableEntry(NamedTuple):
+    """What is known about a position.
+
+    :ivar depth: depth the position was searched to
+    :ivar bound: EXACT, LOWER or UPPER
+    :ivar score: score of the position for the player to move
+    :ivar move: best move found, from encode_move (0 if none)
+    """
+    depth: int
+    bound: int
+    score: int
+    move: int
+
+
+class TranspositionTable:
+    """A fixed-size table of search results, keyed by Zobrist key.
+
+    :ivar size: number of buckets (each of two entries)
+    :ivar probes: number of lookups
+    :ivar hits: number of lookups which found their position
+    :ivar stores: number of entries stored
+    :ivar overwrites: number of stores which replaced another position
+    """
+
+    def __init__(self, size_mb: float = 16):
+        """Initialise instance of TranspositionTable.
+
+        :param size_mb: most memory to use for entries, in megabytes
+        :raises ValueError: size too small for one bucket
+        """
+        self.size: int = int(size_mb * 2**20) // (2 * _ENTRY_SIZE)
+        if self.size < 1:
+            raise ValueError("Transposition table too small")
+        entries = 2 * self.size
+        self._keys = array.array('Q', bytes(8 * entries))
+        self._scores = array.array('i', bytes(4 * entries))
+        self._moves = array.array('I', bytes(4 * entries))
+        self._depths = array.array('b', [_EMPTY]) * entries
+        self._bounds = array.array('B', bytes(entries))
+        self.probes: int = 0
+        self.hits: int = 0
+        self.stores: int = 0
+        self.overwrites: int = 0
+
+    def __len__(self) -> int:
+        return sum(1 for x in self._depths if x != _EMPTY)
+
+    @property
+    def hit_rate(self) -> float:
+        """float: Fraction of lookups which found their position."""
+        return self.hits / self.probes if self.probes else 0.0
+
+    def probe(self, key: int) -> Optional[TableEntry]:
+        """Look up a position.
+
+        :param key: Zobrist key of the position
+        :return: the entry (None if the position isn't stored)
+        """
+
+        self.probes += 1
+        index = 2 * (key % self.size)
+        for slot in (index, index + 1):
+            if self._keys[slot] == key and self._depths[slot] != _EMPTY:
+                self.hits += 1
+                return TableEntry(
+                    self._depths[slot],
+                    self._bounds[slot],
+                    self._scores[slot],
+                    self._moves[slot],
+                )
+        return None
+
+    def store(
+            self,
+            key: int,
+            depth: int,
+            bound: int,
+            score: int,
+            move: int
+    ):
+        """Store a search result.
+
+        :param key: Zobrist key of the position
+        :param depth: depth the position was searched to
+        :param bound: EXACT, LOWER or UPPER
+        :param score: score of the position for the player to move
+        :param move: best move found, from encode_move (0 if none)
+        """
+
+        index = 2 * (key % self.size)
+        # The depth-preferred slot takes the entry if it's searched at
+        # least as deep, or is the same position; otherwise the
+        # always-replace slot does
+        stored_depth = self._depths[index]
+        if not (self._keys[index] == key or depth >= stored_depth):
+            index += 1
+        if self._depths[index] != _EMPTY and self._keys[index] != key:
+            self.overwrites += 1
+        self.stores += 1
+        self._keys[index] = key
+        self._depths[index] = min(depth, 127)
+        self._bounds[index] = bound
+        self._scores[index] = score
+        self._moves[index] = move
+
+    def clear(self):
+        """Remove every entry, and reset the statistics."""
+
+        for index in range(len(self._depths)):
+            self._depths[index] = _EMPTY
+        self.probes = self.hits = self.stores = self.overwrites = 0
+
+
+class SharedTranspositionTable:
+    """A transposition table in shared memory, for several processes.
+
+    It is used as a TranspositionTable is, but one process makes the
+    table, and the others open it by name. Each entry is two 64-bit
+    words: the data (score, depth, bound and move) and the data XOR-ed
+    with the key. An entry is only used if the two give back its key,
+    so torn writes are caught without a lock.
+
+    The memory starts with a two-word header, the first word of which
+    is a flag any process may set to ask all of them to stop searching.
+
+    :ivar name: name of the shared memory, for other processes to open
+    :ivar size: number of buckets (each of two entries)
+    :ivar probes: number of lookups by this process
+    :ivar hits: number of those lookups which found their position
+    :ivar stores: number of entries stored by this process
+    :ivar overwrites: number of those which replaced another position
+    """
+
+    def __init__(self, size_mb: float = 16, name: Optional[str] = None):
+        """Make a shared table, or open one another process made.
+
+        :param size_mb: most memory to use for entries, in megabytes
+        :param name: name of the table to open (None to make a new one)
+        :raises ValueError: size too small for one bucket
+        """
+        self.size: int = int(size_mb * 2**20) // (2 * _SHARED_ENTRY_SIZE)
+        if self.size < 1:
+            raise ValueError("Transposition table too small")
+        length = _SHARED_HEADER_SIZE + 2 * self.size * _SHARED_ENTRY_SIZE
+        if name is None:
+            self._memory = shared_memory.SharedMemory(
+                create=True, size=length
+            )
+        else:
+            self._memory = shared_memory.SharedMemory(name)
+        self.name: str = self._memory.name
+        self._owner: bool = name is None
+        self._words = self._memory.buf.cast('Q')
+        self.probes: int = 0
+        self.hits: int = 0
+        self.stores: int = 0
+        self.overwrites: int = 0
+
+    def __len__(self) -> int:
+        words = self._words
+        return sum(1 for x in range(2, len(words), 2) if words[x])
+
+    @property
+    def hit_rate(self) -> float:
+        """float: Fraction of lookups which found their position."""
+        return self.hits / self.probes if self.probes else 0.0
+
+    def probe(self, key: int) -> Optional[TableEntry]:
+        """Look up a position.
+
+        :param key: Zobrist key of the position
+        :return: the entry (None if the position isn't stored)
+        """
+
+        self.probes += 1
+        words = self._words
+        index = 2 + 4 * (key % self.size)
+        for slot in (index, index + 2):
+            data = words[slot]
+            if data and words[slot + 1] ^ data == key:
+                self.hits += 1
+                return _unpack_entry(data)
+        return None
+
+    def store(
+            self,
+            key: int,
+            depth: int,
+            bound: int,
+            score: int,
+            move: int
+    ):
+        """Store a search result.
+
+        :param key: Zobrist key of the position
+        :param depth: depth the position was searched to
+        :param bound: EXACT, LOWER or UPPER
+        :param score: score of the position for the player to move
+        :param move: best move found, from encode_move (0 if none)
+        """
+
+        words = self._words
+        index = 2 + 4 * (key % self.size)
+        # As for TranspositionTable: the depth-preferred slot keeps a
+        # deeper entry of another position, unless it is torn
+        data = words[index]
+        if (data and words[index + 1] ^ data != key
+                and depth < ((data >> 25) & 127) - 1):
+            index += 2
+        data = words[index]
+        if data and words[index + 1] ^ data != key:
+            self.overwrites += 1
+        self.stores += 1
+        data = _pack_entry(min(depth, 126), bound, score, move)
+        words[index] = data
+        words[index + 1] = data ^ key
+
+    def clear(self):
+        """Remove every entry, and reset the statistics.
+
+        This also clears the stop flag.
+        """
+
+        self._memory.buf[:] = bytes(len(self._memory.buf))
+        self.probes = self.hits = self.stores = self.overwrites = 0
+
+    @property
+    def stop_requested(self) -> bool:
+        """bool: If some process has asked for searching to stop."""
+        return bool(self._words[0])
+
+    def request_stop(self):
+        """Ask every process using the table to stop searching."""
+        self._words[0] = 1
+
+    def close(self):
+        """Stop using the table, and free it if this process made it."""
+
+        self._words.release()
+        self._memory.close()
+        if self._owner:
+            self._memory.unlink()
+
+
+TableLike = Union[TranspositionTable, SharedTranspositionTable]
+
+
+# Bytes per shared entry: the data, then the data XOR-ed with the key
+_SHARED_ENTRY_SIZE: int = 16
+# Bytes before the first shared entry: the stop flag, and a spare word
+_SHARED_HEADER_SIZE: int = 16
+
+
+def _pack_entry(depth: int, bound: int, score: int, move: int) -> int:
+    """Pack an entry into one 64-bit word, which is never 0.
+
+    The move takes the low 23 bits, then the bound (2 bits), the depth
+    plus one (7 bits), and the score, offset to be unsigned (32 bits).
+
+    :param depth: depth the position was searched to (at most 126)
+    :param bound: EXACT, LOWER or UPPER
+    :param score: score of the position for the player to move
+    :param move: best move found, from encode_move (0 if none)
+    :return: the packed entry
+    """
+
+    return (move | bound << 23 | (depth + 1) << 25
+            | (score + 2**31) << 32)
+
+
+def _unpack_entry(data: int) -> TableEntry:
+    """Unpack an entry packed by _pack_entry.
+
+    :param data: the packed entry
+    :return: the entry
+    """
+
+    return TableEntry(
+        ((data >> 25) & 127) - 1,
+        (data >> 23) & 3,
+        (data >> 32) - 2**31,
+        data & 0x7FFFFF,
+    )
+
+
+def encode_move(move: classes.MoveRecord) -> int:
+    """Pack a move into an int, to be stored in the table.
+
+    The packing is: the start square plus one (0 for drops), the end
+    square, the promotion choice (0 for none, 1 for not promoting, 2
+    for promoting), and the code of the dropped piece.
+
+    :param move: move to pack
+    :return: packed move (never 0)
+    """
+
+    start = 0 if move.is_drop else classes.square_index(move.start) + 1
+    end = classes.square_index(move.end)
+    promote = 0 if move.is_promote is None else 1 + move.is_promote
+    dropped = move.piece.code if move.is_drop else 0
+    return 1 | start << 1 | end << 8 | promote << 15 | dropped << 17
+
+
+def decode_move(board: classes.Board, packed: int) -> classes.MoveRecord:
+    """Unpack a move made by encode_move, for the position on a board.
+
+    The move is not checked for legality: as different positions can
+    share an entry, a decoded move should be checked against the
+    moves of the position before being used.
+
+    :param board: board the move is for
+    :param packed: packed move
+    :return: the move
+    """
+
+    start = (packed >> 1) & 127
+    end = (packed >> 8) & 127
+    promote = (None, False, True)[(packed >> 15) & 3]
+    if start:
+        piece = board.piece_at(start - 1)
+        start_location = classes.index_square(start - 1)
+    else:
+        piece = classes.code_piece((packed >> 17) & 63)
+        start_location = None
+    return classes.MoveRecord(
+        start_location,
+        classes.index_square(end),
+        piece,
+        board.piece_at(end),
+        promote,
+    )
@@ -0,0 +1,436 @@
+"""Checkmate detection and a tsume (mate-in-N) solver.
+
+is_mate tells whether the player to move is checkmated, and
+mate_in_one finds a move which checkmates at once. solve_tsume solves
+mate-in-N problems, where every move of the attacker must be check,
+with df-pn (depth-first proof-number search).
+
+Proof-number search keeps, for each position, the proof number (how
+many more positions must be shown to be mate to prove the position is
+mate) and the disproof number (likewise, to show it isn't), and always
+expands the position that is cheapest to settle. df-pn does this
+depth-first, with thresholds, so that only the table of proof and
+disproof numbers needs to be kept. Run it on a position file as
+
+    python -m shogi.engine.tsume position.json --moves 3
+"""
+
+import argparse
+import sys
+import time
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from shogi import classes
+from shogi.classes import attacks
+from shogi.functions import generate_moves, places_attacking
+from shogi.perft import load_position, move_name
+
+__all__ = [
+    "INFINITE",
+    "TsumeResult",
+    "TsumeSolver",
+    "is_mate",
+    "gives_check",
+    "check_moves",
+    "mate_in_one",
+    "solve_tsume",
+]
+
+INFINITE: int = 10**9
+"""Proof or disproof number of a position that is settled."""
+
+
+def is_mate(board: classes.Board) -> bool:
+    """Check if the player to move is checkmated.
+
+    :param board: board to check
+    :return: if the player to move is in check, with no legal moves
+    """
+
+    king = board.get_king(board.current_player)
+    if king is None or not places_attacking(
+            board, king, board.current_player.other
+    ):
+        return False
+    return next(generate_moves(board), None) is None
+
+
+def gives_check(board: classes.Board, move: classes.MoveRecord) -> bool:
+    """Check if a move puts the other king in check.
+
+    The move isn't made: the attack tables give whether the moved piece
+    attacks the king from where it ends up, and whether a slider behind
+    the square it leaves now does (a discovered check).
+
+    :param board: board the move is for
+    :param move: legal move of the player to move
+    :return: if the move checks
+    """
+
+    player = board.current_player
+    king_location = board.get_king(player.other)
+    if king_location is None:
+        return False
+    squares = board.squares
+    king = classes.square_index(king_location)
+    end = classes.square_index(move.end)
+    start = None if move.is_drop else classes.square_index(move.start)
+    code = move.piece.code
+    if move.is_promote:
+        # Promoted pieces are 8 codes on from unpromoted ones
+        code += 8
+    if king in attacks.TARGETS[code][end] and not any(
+            squares[x] for x in attacks.BETWEEN[end][king] if x != start
+    ):
+        return True
+    if start is None:
+        return False
+    for line in attacks.LINES[king]:
+        if start not in line:
+            continue
+        # The first piece out from the king, now that the start is
+        # empty, is the only one that could attack it along the line
+        for index in line:
+            if index == end:
+                # The piece moved stays in the way
+                return False
+            other = squares[index]
+            if other and index != start:
+                return ((other - 1) >> 4 == int(player)
+                        and king in attacks.TARGETS[other][index])
+        return False
+    return False
+
+
+def check_moves(board: classes.Board) -> List[classes.MoveRecord]:
+    """Get every legal move of the player to move which gives check.
+
+    :param board: board to get the moves of
+    :return: checking moves
+    """
+
+    return [x for x in generate_moves(board) if gives_check(board, x)]
+
+
+def mate_in_one(board: classes.Board) -> Optional[classes.MoveRecord]:
+    """Find a move which checkmates immediately.
+
+    Pawn drops which would mate are never found, as they are illegal.
+
+    :param board: board to search
+    :return: a mating move (None if there isn't one)
+    """
+
+    for move in check_moves(board):
+        board.make(move)
+        try:
+            if next(generate_moves(board), None) is None:
+                return move
+        finally:
+            board.unmake()
+    return None
+
+
+class TsumeResult(NamedTuple):
+    """The result of solving a tsume problem.
+
+    :ivar solved: True if mate was proved, False if it was disproved,
+        None if the node limit ran out first
+    :ivar moves: the mating sequence, if solved
+    :ivar nodes: number of positions expanded
+    :ivar elapsed: seconds taken
+    """
+    solved: Optional[bool]
+    moves: Tuple[classes.MoveRecord, ...]
+    nodes: int
+    elapsed: float
+
+    @property
+    def nodes_per_second(self) -> int:
+        """int: Positions expanded per second."""
+        return int(self.nodes / self.elapsed) if self.elapsed else 0
+
+
+class _OutOfNodes(Exception):
+    """Raised inside the solver when the node limit is reached."""
+
+
+class TsumeSolver:
+    """A df-pn solver for mate-in-N problems.
+
+    Positions are keyed by their Zobrist key and the number of
+    attacking moves left, as the same position may be mate with more
+    moves left, but not with fewer.
+
+    :ivar board: board being solved (put back after every move)
+    :ivar max_moves: most attacking moves allowed
+    :ivar max_nodes: most positions to expand (None for no limit)
+    :ivar max_table: most entries to keep in the table
+    :ivar nodes: number of positions expanded so far
+    :ivar table: (key, moves left) -> (proof, disproof) numbers
+    """
+
+    def __init__(
+            self,
+            board: classes.Board,
+            max_moves: int,
+            max_nodes: Optional[int] = None,
+            max_table: int = 1000000
+    ):
+        """Initialise instance of TsumeSolver.
+
+        :param board: board with the attacker to move
+        :param max_moves: most attacking moves allowed
+        :param max_nodes: most positions to expand (None for no limit)
+        :param max_table: most entries to keep in the table
+        """
+        self.board: classes.Board = board
+        self.max_moves: int = max_moves
+        self.max_nodes: Optional[int] = max_nodes
+        self.max_table: int = max_table
+        self.nodes: int = 0
+        self.table: Dict[Tuple[int, int], Tuple[int, int]] = {}
+
+    def solve(self) -> TsumeResult:
+        """Try to prove the position is mate in max_moves moves.
+
+        :return: result of the search
+        """
+
+        start = time.perf_counter()
+        try:
+            self._mid(True, self.max_moves, INFINITE - 1, INFINITE - 1)
+        except _OutOfNodes:
+            return TsumeResult(
+                None, (), self.nodes, time.perf_counter() - start
+            )
+        proof, _ = self._lookup(True, self.max_moves)
+        solved = proof == 0
+        moves = self._mating_line() if solved else ()
+        return TsumeResult(
+            solved, moves, self.nodes, time.perf_counter() - start
+        )
+
+    def _lookup(self, attacking: bool, moves_left: int) -> Tuple[int, int]:
+        """Get the proof and disproof numbers of the current position.
+
+        :param attacking: if the attacker is to move
+        :param moves_left: attacking moves left
+        :return: proof and disproof numbers (1, 1 if unknown)
+        """
+
+        return self._numbers(self.board.zobrist_key, attacking, moves_left)
+
+    def _numbers(
+            self,
+            key: int,
+            attacking: bool,
+            moves_left: int
+    ) -> Tuple[int, int]:
+        """Get the proof and disproof numbers of a position.
+
+        :param key: Zobrist key of the position
+        :param attacking: if the attacker is to move
+        :param moves_left: attacking moves left
+        :return: proof and disproof numbers (1, 1 if unknown)
+        """
+
+        if attacking and moves_left <= 0:
+            return INFINITE, 0
+        return self.table.get((key, moves_left), (1, 1))
+
+    def _children(self, attacking: bool) -> List[classes.MoveRecord]:
+        """Get the moves to search from the current position.
+
+        :param attacking: if the attacker is to move
+        :return: checks for the attacker, every move for the defender
+        """
+
+        if attacking:
+            return check_moves(self.board)
+        return list(generate_moves(self.board))
+
+    def _mid(
+            self,
+            attacking: bool,
+            moves_left: int,
+            proof_limit: int,
+            disproof_limit: int
+    ):
+        """Search the current position until it passes a threshold.
+
+        :param attacking: if the attacker is to move
+        :param moves_left: attacking moves left
+        :param proof_limit: stop once the proof number reaches this
+        :param disproof_limit: stop once the disproof number reaches it
+        :raises _OutOfNodes: the node limit was reached
+        """
+
+        self.nodes += 1
+        if self.max_nodes is not None and self.nodes > self.max_nodes:
+            raise _OutOfNodes
+        key = (self.board.zobrist_key, moves_left)
+        moves = self._children(attacking)
+        if not moves:
+            # No checks left is a failure, no evasions is mate
+            self._store(key, (INFINITE, 0) if attacking else (0, INFINITE))
+            return
+        # After each attacking move, one fewer is left
+        child_moves_left = moves_left - 1 if attacking else moves_left
+        # The children's keys are worked out once, not on every pass
+        keys = []
+        for move in moves:
+            self.board.make(move)
+            keys.append(self.board.zobrist_key)
+            self.board.unmake()
+        while True:
+            numbers = [
+                self._numbers(x, not attacking, child_moves_left)
+                for x in keys
+            ]
+            # At the attacker's move, proving any child proves the
+            # position, and all must be disproved to disprove it; at
+            # the defender's, the other way around. Working in terms
+            # of "this side's" numbers makes both the same.
+            if attacking:
+                mine = [x for x, _ in numbers]
+                theirs = [y for _, y in numbers]
+                limit, other_limit = proof_limit, disproof_limit
+            else:
+                mine = [y for _, y in numbers]
+                theirs = [x for x, _ in numbers]
+                limit, other_limit = disproof_limit, proof_limit
+            best_mine = min(mine)
+            sum_theirs = min(sum(theirs), INFINITE)
+            if attacking:
+                self._store(key, (best_mine, sum_theirs))
+            else:
+                self._store(key, (sum_theirs, best_mine))
+            if best_mine >= limit or sum_theirs >= other_limit:
+                return
+            best = mine.index(best_mine)
+            second = min(mine[:best] + mine[best + 1:], default=INFINITE)
+            child_limit = min(limit, second + 1)
+            child_other_limit = other_limit - sum_theirs + theirs[best]
+            self.board.make(moves[best])
+            try:
+                if attacking:
+                    self._mid(
+                        False, child_moves_left,
+                        child_limit, child_other_limit
+                    )
+                else:
+                    self._mid(
+                        True, child_moves_left,
+                        child_other_limit, child_limit
+                    )
+            finally:
+                self.board.unmake()
+
+    def _store(self, key: Tuple[int, int], numbers: Tuple[int, int]):
+        """Store the proof and disproof numbers of a position.
+
+        :param key: key of the position
+        :param numbers: proof and disproof numbers
+        """
+
+        # Unsettled positions are the cheapest to lose, so when the
+        # table is full, only settled ones are kept
+        if len(self.table) >= self.max_table:
+            self.table = {
+                x: y for x, y in self.table.items() if 0 in y
+            }
+        self.table[key] = numbers
+
+    def _mating_line(self) -> Tuple[classes.MoveRecord, ...]:
+        """Follow the proof from the current position.
+
+        :return: the moves of the mate, attacker's first
+        """
+
+        line = []
+        attacking = True
+        moves_left = self.max_moves
+        try:
+            while True:
+                moves = self._children(attacking)
+                if not moves:
+                    break
+                child_moves_left = (
+                    moves_left - 1 if attacking else moves_left
+                )
+                chosen = None
+                for move in moves:
+                    self.board.make(move)
+                    proof, _ = self._lookup(not attacking, child_moves_left)
+                    self.board.unmake()
+                    # The attacker plays any proved move; the defender
+                    # plays them all out, so any will do
+                    if proof == 0:
+                        chosen = move
+                        break
+                if chosen is None:
+                    break
+                line.append(chosen)
+                self.board.make(chosen)
+                attacking = not attacking
+                moves_left = child_moves_left
+        finally:
+            for _ in line:
+                self.board.unmake()
+        return tuple(line)
+
+
+def solve_tsume(
+        board: classes.Board,
+        max_moves: int,
+        max_nodes: Optional[int] = None
+) -> TsumeResult:
+    """Solve a mate-in-N problem for the player to move.
+
+    :param board: board with the attacker to move
+    :param max_moves: most attacking moves allowed (N)
+    :param max_nodes: most positions to expand (None for no limit)
+    :return: result of the search
+    """
+
+    return TsumeSolver(board, max_moves, max_nodes).solve()
+
+
+def main(args: Optional[Iterable[str]] = None) -> int:
+    """Solve a tsume problem from the command line.
+
+    :param args: command-line arguments (sys.argv if None)
+    :return: exit status (0 if mate was found)
+    """
+
+    parser = argparse.ArgumentParser(
+        prog="python -m shogi.engine.tsume",
+        description="Solve a mate-in-N problem."
+    )
+    parser.add_argument("position", help="JSON position file")
+    parser.add_argument(
+        "--moves", type=int, default=3,
+        help="most attacking moves allowed"
+    )
+    parser.add_argument(
+        "--nodes", type=int, help="most positions to expand"
+    )
+    options = parser.parse_args(args)
+    board = load_position(options.position)
+    result = solve_tsume(board, options.moves, options.nodes)
+    if result.solved:
+        print(f"Mate in {(len(result.moves) + 1) // 2}: "
+              f"{' '.join(move_name(x) for x in result.moves)}")
+    elif result.solved is None:
+        print("Unknown: node limit reached")
+    else:
+        print(f"No mate in {options.moves}")
+    print(f"Nodes: {result.nodes}")
+    print(f"Time: {result.elapsed:.3f}s")
+    print(f"Nodes/s: {result.nodes_per_second}")
+    return 0 if result.solved else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
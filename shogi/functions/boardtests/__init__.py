@@ -2,7 +2,9 @@ from .check import *
 from .drop import *
 from .findmoves import *
 from .fullmove import *
+from .generate import *
 from .mate import *
 from .move import *
 from .notation import *
+from .safety import *
 from .undo import *
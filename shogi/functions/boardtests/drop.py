@@ -1,11 +1,13 @@
 from shogi import classes
+from shogi.classes import attacks
 
-from .mate import mate_check
-from .move import is_movable
+from .move import is_movable, king_can_move, pinned_pieces, places_attacking
 
 __all__ = [
     "is_legal_drop",
     "dropping_to_check",
+    "legal_drop_mask",
+    "legal_drop_squares",
 ]
 
 
@@ -20,20 +22,21 @@ def is_legal_drop(
     :param piece: piece to drop
     :param move_location: location to drop piece
     """
+    bit = classes.SQUARE_BITS[classes.square_index(move_location)]
     # If there's a piece at the drop location, it's not valid
-    if current_board[move_location]:
+    if not current_board.bitboards[classes.EMPTY] & bit:
         return False
-    player_int = int(current_board.current_player)
     must_promote = current_board.auto_promote(move_location, piece)
     # If the piece is dropped in a must-promote zone, it's not valid
     if must_promote:
         return False
     # Special pawn rules:
     if piece.is_rank('p'):
-        # No two pawns in the same column for the same player
-        for x in current_board.column(move_location.y):
-            if x.is_piece('p', player_int):
-                return False
+        # No two pawns in the same file (x coordinate) for the same
+        # player
+        pawns = current_board.bitboards[piece.code]
+        if pawns & classes.FILE_MASKS[move_location.x]:
+            return False
 
         is_in_check = dropping_to_check(
             current_board,
@@ -43,12 +46,76 @@ def is_legal_drop(
         )
         # If the pawn is dropping to cause checkmate, not legal
         if is_in_check:
-            if mate_check(current_board, is_in_check):
+            if _drop_mates(current_board, move_location):
                 return False
     # Otherwise, yeah, it's fine
     return True
 
 
+def legal_drop_mask(
+        current_board: classes.Board,
+        piece: classes.Piece,
+        uchifuzume: bool = True
+) -> int:
+    """Get every square a piece can be dropped on, as a bitboard.
+
+    This is the same as is_legal_drop for every square at once: the
+    empty squares, less those the piece could never move from, and,
+    for a pawn, less the files already holding one of the player's
+    pawns. Only one square can be a pawn drop giving mate (the one in
+    front of the other king), so only that one is tested for it.
+
+    :param current_board: current board state
+    :param piece: piece to drop
+    :param uchifuzume: if pawn drops giving mate are left out
+    :return: bitboard of the squares
+    """
+
+    mask = (current_board.bitboards[classes.EMPTY]
+            & ~classes.DEAD_SQUARES[piece.code])
+    if not piece.is_rank('p') or not mask:
+        return mask
+    # No two pawns in the same file (x coordinate) for the same player
+    pawns = current_board.bitboards[piece.code]
+    for file_mask in classes.FILE_MASKS:
+        if pawns & file_mask:
+            mask &= ~file_mask
+    if not uchifuzume:
+        return mask
+    king_location = current_board.get_king(
+        current_board.current_player.other
+    )
+    if king_location is None:
+        return mask
+    # The square the pawn would check from is the one an enemy pawn on
+    # the king's square would attack
+    king_index = classes.square_index(king_location)
+    for index in attacks.TARGETS[piece.code ^ 16][king_index]:
+        bit = classes.SQUARE_BITS[index]
+        if mask & bit and _drop_mates(
+                current_board, classes.index_square(index)
+        ):
+            mask ^= bit
+    return mask
+
+
+def legal_drop_squares(
+        current_board: classes.Board,
+        piece: classes.Piece
+) -> classes.CoordSet:
+    """Get every square a piece can be dropped on.
+
+    :param current_board: current board state
+    :param piece: piece to drop
+    :return: locations the piece can be legally dropped
+    """
+
+    return {
+        classes.index_square(x)
+        for x in classes.squares_of(legal_drop_mask(current_board, piece))
+    }
+
+
 def dropping_to_check(
         current_board: classes.Board,
         piece_to_drop: classes.Piece,
@@ -75,3 +142,49 @@ def dropping_to_check(
     ):
         places_attacking.add(new_location)
     return places_attacking
+
+
+def _drop_mates(
+        current_board: classes.Board,
+        pawn_location: classes.AbsoluteCoord,
+) -> bool:
+    """Test if a pawn dropped to give check would give checkmate.
+
+    The pawn is only ever checking a king directly in front of it, so
+    nothing can get in the way: the king must either move out of check
+    or the pawn must be captured.
+
+    :param current_board: current board state (before the drop)
+    :param pawn_location: location the pawn is dropped to
+    :return: if the drop would be checkmate
+    """
+
+    king_color = current_board.current_player.other
+    king_location = current_board.get_king(king_color)
+    king_index = classes.square_index(king_location)
+    squares = current_board.squares
+    # The king escapes (or takes the pawn) if any of its moves is to a
+    # square without one of its own pieces, which isn't attacked once
+    # the pawn is there
+    king_code = squares[king_index]
+    for target in attacks.TARGETS[king_code][king_index]:
+        code = squares[target]
+        if code and classes.code_piece(code).is_color(king_color):
+            continue
+        if king_can_move(
+                current_board,
+                (king_location, classes.index_square(target)),
+                act_full={pawn_location}
+        ):
+            return False
+    # Anything else can take the pawn, unless it's pinned. A pin along
+    # the line through the pawn is blocked by the pawn itself.
+    pinned = pinned_pieces(current_board, king_color)
+    for location in places_attacking(
+            current_board, pawn_location, king_color
+    ):
+        if location == king_location:
+            continue
+        if pawn_location in pinned.get(location, {pawn_location}):
+            return False
+    return True
@@ -1,7 +1,9 @@
-from typing import Generator, Iterable
+from typing import Generator, Iterable, Optional
 
 from shogi import classes
+from shogi.classes import attacks
 from .fullmove import check_move
+from .safety import KingSafety, king_safety
 
 __all__ = [
     "test_spaces",
@@ -11,33 +13,58 @@ __all__ = [
 def test_spaces(
         current_board: classes.Board,
         piece_location: classes.AbsoluteCoord,
-        to_test: Iterable[classes.RelativeCoord],
-        checking_spaces: Iterable[classes.AbsoluteCoord] = None
+        to_test: Optional[Iterable[classes.RelativeCoord]] = None,
+        safety: Optional[KingSafety] = None
 ) -> Generator:
     """Test which spaces in a list are valid moves.
 
+    If no list is given, every space the piece attacks on an empty
+    board is tested, straight from the precomputed move tables.
+
     :param current_board: current state of the board
     :param piece_location: location of piece to be moved
     :param to_test: list of coordinates to check
-    :param checking_spaces: additional spaces attacking king to check
+    :param safety: safety of the current player's king, if already
+        worked out for the board
     :return: list of valid spaces
     """
 
-    # Set defaults from None to their proper defaults
-    if checking_spaces is None:
-        checking_spaces = ()
+    # The king's safety is the same for every space tested
+    safety = king_safety(current_board, safety=safety)
+    if to_test is None:
+        start = classes.square_index(piece_location)
+        code = current_board.squares[start]
+        to_test = (
+            classes.index_square(x)
+            for x in sorted(attacks.TARGETS[code][start])
+        )
+    else:
+        to_test = _absolute(piece_location, to_test)
     # Test each location in the given list
-    for relative_location in to_test:
-        # If the new location isn't in the board, it isn't valid,
-        # so continue on
-        try:
-            absolute_location = piece_location + relative_location
-        except ValueError:
-            continue
+    for absolute_location in to_test:
         # If the move is valid, add it to the valid-moves list
         if check_move(
             current_board,
             (piece_location, absolute_location),
-            checking_spaces,
+            safety,
         ):
             yield absolute_location
+
+
+def _absolute(
+        piece_location: classes.AbsoluteCoord,
+        to_test: Iterable[classes.RelativeCoord]
+) -> Generator:
+    """Turn relative locations into the absolute ones on the board.
+
+    :param piece_location: location the moves are relative to
+    :param to_test: relative locations
+    :return: absolute locations, skipping any off the board
+    """
+
+    for relative_location in to_test:
+        # If the new location isn't in the board, it isn't valid,
+        # so continue on
+        location = classes.try_offset(piece_location, relative_location)
+        if location is not None:
+            yield location
@@ -1,8 +1,8 @@
-from typing import Iterable
+from typing import Optional
 
 from shogi import classes
-from .check import is_check
 from .move import is_movable
+from .safety import KingSafety, king_safety
 
 __all__ = [
     "check_move",
@@ -12,41 +12,22 @@ __all__ = [
 def check_move(
         current_board: classes.Board,
         coordinates: classes.CoordTuple,
-        checking_spaces: Iterable[classes.AbsoluteCoord] = None
+        safety: Optional[KingSafety] = None
 ) -> bool:
     """A more complete check for if the move is legal.
 
     :param current_board: current game board
     :param coordinates: move's location: from and to
-    :param checking_spaces: spaces checking the current king
+    :param safety: safety of the current player's king, if already
+        worked out for the board
     :return: error code
     """
     current, to = coordinates
-    if checking_spaces is None:
-        checking_spaces = ()
     # If the piece can't move according to the basic check, it can't
     # according to the more complete one, either
     if not is_movable(current_board, coordinates):
         return False
-    # If the piece's move puts the king itself into check, then it's
-    # not valid, either
-    if is_check(
-            current_board,
-            coordinates,
-            current_board.current_player,
-            break_early=True,
-            before_move=True
-    ):
-        return False
-    # If any of the already-checking spaces can still attack the king,
-    # then the move isn't valid
-    king_location = current_board.get_king(current_board.current_player)
-    for space in checking_spaces:
-        if is_movable(
-            current_board,
-            (space, king_location),
-            ignore_locations=current,
-            act_full=to
-        ):
-            return False
-    return True
+    # If the move leaves the king in check (or doesn't get it out of
+    # check), it's not valid, either
+    safety = king_safety(current_board, safety=safety)
+    return safety.allows(current, to)
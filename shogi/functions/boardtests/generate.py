@@ -0,0 +1,167 @@
+from typing import Generator, Optional
+
+from shogi import classes
+from shogi.classes import attacks
+from .drop import legal_drop_mask
+from .safety import KingSafety, king_safety
+
+__all__ = [
+    "generate_moves",
+]
+
+_PROMOTION_ZONES = ((0, 1, 2), (8, 7, 6))
+
+
+def generate_moves(
+        current_board: classes.Board,
+        mode: str = "legal",
+) -> Generator[classes.MoveRecord, None, None]:
+    """Yield every move the current player can make.
+
+    This covers moves on the board, with a separate move for each
+    promotion choice, and drops of captured pieces. In "legal" mode,
+    the king's safety (see king_safety) is worked out once, up front,
+    and only moves which don't leave the king in check are yielded. In
+    "pseudo" mode, moves are only checked against how the pieces move,
+    so moves that leave the king in check (and pawn drops that mate)
+    are included as well.
+
+    :param current_board: current board state
+    :param mode: "legal" or "pseudo"
+    :raises ValueError: unknown mode
+    :return: every move of the current player
+    """
+
+    if mode not in ("legal", "pseudo"):
+        raise ValueError(f"Unknown mode {mode!r}")
+    legal = mode == "legal"
+    player = current_board.current_player
+    # Work out what the king's safety needs, once for every move
+    safety: Optional[KingSafety] = None
+    blocks: Optional[classes.CoordSet] = None
+    if legal:
+        safety = king_safety(current_board, player)
+        blocks = safety.blocks
+    yield from _board_moves(current_board, player, safety)
+    yield from _drops(current_board, player, blocks, legal)
+
+
+def _board_moves(
+        current_board: classes.Board,
+        player: classes.Color,
+        safety: Optional[KingSafety],
+) -> Generator[classes.MoveRecord, None, None]:
+    """Yield the moves of the player's pieces on the board.
+
+    :param current_board: current board state
+    :param player: player to move
+    :param safety: the king's safety (None to allow any move)
+    :return: moves on the board
+    """
+
+    squares = current_board.squares
+    for start, code in enumerate(squares):
+        if not code:
+            continue
+        piece = classes.code_piece(code)
+        if not piece.is_color(player):
+            continue
+        start_location = classes.index_square(start)
+        for end in _piece_targets(squares, code, start):
+            end_location = classes.index_square(end)
+            # The king mustn't move into check, everything else must
+            # stop any check, and pinned pieces must stay between the
+            # king and whatever is pinning them
+            if (safety is not None
+                    and not safety.allows(start_location, end_location)):
+                continue
+            captured = classes.code_piece(squares[end])
+            yield from _promotions(
+                current_board, start_location, end_location, piece, captured
+            )
+
+
+def _piece_targets(
+        squares: bytearray,
+        code: int,
+        start: int,
+) -> Generator[int, None, None]:
+    """Yield where a piece may move, ignoring the king's safety.
+
+    :param squares: mailbox of the board
+    :param code: code of the piece
+    :param start: index the piece is at
+    :return: indices the piece may move to
+    """
+
+    color = (code - 1) >> 4
+    for end in attacks.STEPS[code][start]:
+        target = squares[end]
+        if target and (target - 1) >> 4 == color:
+            continue
+        if any(squares[x] for x in attacks.BETWEEN[start][end]):
+            continue
+        yield end
+    for ray in attacks.RAYS[code][start]:
+        for end in ray:
+            target = squares[end]
+            if target:
+                if (target - 1) >> 4 != color:
+                    yield end
+                break
+            yield end
+
+
+def _promotions(
+        current_board: classes.Board,
+        start: classes.AbsoluteCoord,
+        end: classes.AbsoluteCoord,
+        piece: classes.Piece,
+        captured: classes.Piece,
+) -> Generator[classes.MoveRecord, None, None]:
+    """Yield a move once for each promotion choice it has.
+
+    :param current_board: current board state
+    :param start: location moved from
+    :param end: location moved to
+    :param piece: piece moved
+    :param captured: piece captured
+    :return: the move, with and without promotion where possible
+    """
+
+    zone = _PROMOTION_ZONES[int(piece.color)]
+    if (piece.is_promotable and not piece.is_promoted
+            and (start.y in zone or end.y in zone)):
+        yield classes.MoveRecord(start, end, piece, captured, True)
+        # Pieces which could never move again must promote
+        if not current_board.auto_promote(end, piece):
+            yield classes.MoveRecord(start, end, piece, captured, False)
+    else:
+        yield classes.MoveRecord(start, end, piece, captured)
+
+
+def _drops(
+        current_board: classes.Board,
+        player: classes.Color,
+        blocks: Optional[classes.CoordSet],
+        legal: bool,
+) -> Generator[classes.MoveRecord, None, None]:
+    """Yield the drops of the player's captured pieces.
+
+    :param current_board: current board state
+    :param player: player to move
+    :param blocks: spaces which stop check (None if not in check)
+    :param legal: if drops must not leave the king in check
+    :return: drops
+    """
+
+    block_mask = classes.FULL
+    if blocks is not None:
+        block_mask = classes.to_bitboard(
+            classes.square_index(x) for x in blocks
+        )
+    # Every copy of a captured piece drops the same way
+    for piece in dict.fromkeys(current_board.captured[player]):
+        mask = legal_drop_mask(current_board, piece, legal) & block_mask
+        for index in classes.squares_of(mask):
+            yield classes.MoveRecord(None, classes.index_square(index), piece)
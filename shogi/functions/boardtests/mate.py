@@ -1,7 +1,8 @@
-from itertools import product
+from typing import Optional
 
 from shogi import classes
-from .move import is_movable
+from .generate import generate_moves
+from .safety import KingSafety, king_safety
 
 __all__ = [
     "mate_check",
@@ -12,20 +13,23 @@ def mate_check(
         current_board: classes.Board,
         places_attacking: classes.CoordSet,
         king_color: classes.Color = None,
+        safety: Optional[KingSafety] = None,
 ) -> bool:
     """Test if king is in checkmate.
 
-    :param current_board:
-    :param king_color:
-    :param places_attacking:
+    :param current_board: current board state
+    :param places_attacking: locations of the pieces checking the king
+    :param king_color: color of the king (default: the color not of
+        the first piece in places_attacking)
+    :param safety: safety of the king, if already worked out
     :return: if king is in checkmate
     """
 
     # How this works:
-    # There are four ways to get out of check: move, drop, capture,
-    # and block.
-    # This function tests if any is possible, in that order, as that
-    # is the order of increasing difficulty,
+    # There are four ways to get out of check: move, capture, block
+    # and drop. Moving is tested first, as it's the cheapest, and
+    # the only way out of double check; the rest are found by
+    # generating every legal move.
 
     # If the king isn't in check, it isn't in checkmate
     if not places_attacking:
@@ -37,63 +41,22 @@ def mate_check(
         # get an item from a set non-destructively, so this has to be
         # used instead. Sigh.
         king_color = current_board[next(iter(places_attacking))].color.other
-    king_location = current_board.get_king(king_color)
+    safety = king_safety(current_board, king_color, safety)
+    if not safety.checkers:
+        return False
     # Test if the king can move out of check
-    for king_move_tested in current_board[king_location].valid_spaces():
-        # For each space in the king's valid moves, test if the king
-        # is able to move there or not
-        try:
-            new_location = king_location + king_move_tested
-        # If the coordinate isn't legal, the piece can't move there,
-        # so move on
-        except ValueError:
-            continue
-        # If the king can move to the new location, congrats! It's not
-        # in check
-        if is_movable(current_board, (king_location, new_location)):
-            return False
+    if safety.escapes:
+        return False
     # If there's more than one piece attacking, you can't block
     # or capture, so resistance is futile
-    if len(places_attacking) > 1:
-        return True
-    # Since there's only one location in pieces_attacking, we can
-    # just get it and use it directly
-    check_location = places_attacking.pop()
-    relative_position = check_location.distance_to(king_location)
-    # Test whether a drop is legal first
-    # If the player has no pieces to drop, they can't drop to block
-    has_pieces = current_board.captured[current_board.current_player]
-    # If the piece is a knight, it can't be blocked
-    not_a_knight = not current_board[check_location].is_rank('n')
-    # If the piece is right next to the king, you can't put a piece
-    # between it and the king to block it
-    has_space = not all(x in {-1, 0, 1} for x in relative_position)
-    # If all of these drop-tests are true, it can be blocked
-    if has_pieces and not_a_knight and has_space:
-        return False
-    # Test whether or not the attacking piece can be captured
-    for loc in current_board.enemy_spaces:
-        # See if any piece can be moved to the attacking location,
-        # to capture the piece
-        if is_movable(current_board, (loc, check_location)):
-            return False
-    move = king_location - check_location
-    move_direction = classes.Direction(move)
-    # Test whether or not the piece can be blocked
-    # If those tests we saw earlier are false, you can't block the
-    # check, and thus, checkmate is true
-    if not (not_a_knight and has_space):
+    if len(safety.checkers) > 1:
         return True
-    # Test if any of the player's pieces can move to any of the
-    # spaces between the attacking piece and the king
-    for pos, z in product(current_board.enemy_spaces, range(max(abs(move)))):
-        # The location the piece is moving to:
-        # The location the piece is moving from, plus
-        # z times the move direction, e.g. z spaces away from
-        # the check location in the direction of the move
-        new_location = (check_location + move_direction.scale(z))
-        # If you can move there and block, no checkmate
-        if is_movable(current_board, (pos, new_location)):
-            return False
-    # If nothing says there isn't checkmate, then there is
-    return True
+    # Otherwise, it's mate if the king's side has no legal move at
+    # all, which covers capturing, blocking and dropping exactly
+    if king_color == current_board.current_player:
+        return next(generate_moves(current_board), None) is None
+    current_board.flip_turn()
+    try:
+        return next(generate_moves(current_board), None) is None
+    finally:
+        current_board.flip_turn()
@@ -1,12 +1,14 @@
-from itertools import product
-from typing import Iterable
+from typing import Dict, Iterable, Set
 
 from shogi import classes
+from shogi.classes import attacks
 
 __all__ = [
     "is_movable",
     "path_clear",
     "king_can_move",
+    "places_attacking",
+    "pinned_pieces",
 ]
 
 
@@ -58,50 +60,41 @@ def is_movable(
     # Otherwise, it's what the piece at the new space actually is
     else:
         new_loc_piece = current_board[new]
-    move = current.distance_to(new)
-    move_direction = classes.Direction(move)
-    # If the move is a null move, it's not valid
-    if move_direction == classes.Direction(8):
-        return False
-    # If the move isn't in a legal direction for the piece, it's not
-    # valid
-    elif not piece.can_move(move):
+    start = current.x + 9*current.y
+    end = new.x + 9*new.y
+    # If the move isn't one the piece can make from where it is, it's
+    # not valid. The tables have no null moves, nor any off the board
+    if end not in attacks.TARGETS[piece.code][start]:
         return False
     # If the piece in the new location is the same color as the piece,
     # then you can't move there (no capturing your own piece), as long
     # as the space isn't one of the ones we're ignoring
-    elif new_loc_piece.same_color(piece):
-        if new not in ignore_locations:
-            return False
-    # If the piece is moving different different amounts in the x and
-    # y directions, then it's un-block-able, and we shouldn't test to
-    # see if a piece is in the way (for example, knights)
-    elif not move.is_linear():
-        pass
+    if new_loc_piece.same_color(piece) and new not in ignore_locations:
+        return False
     # If the piece is a king, and we are running king_check, check
     # whether or not the king can move
-    elif piece.is_rank('k') and with_king_check:
+    if piece.is_rank('k') and with_king_check:
         return king_can_move(
             current_board, (current, new),
             ignore_locations=ignore_locations,
             act_full=act_full
         )
-    # Otherwise, return whether or not the path is clear
-    else:
-        return path_clear(
-            current_board,
-            current,
-            move,
-            ignore_locations=ignore_locations,
-            act_full=act_full
-        )
-    return True
+    # Otherwise, return whether or not the path is clear. Moves which
+    # are un-block-able (for example, knights) have nothing between
+    # their start and end
+    return _between_clear(
+        current_board,
+        start,
+        end,
+        ignore_locations=ignore_locations,
+        act_full=act_full
+    )
 
 
 def path_clear(
         current_board: classes.Board,
         current_position: classes.AbsoluteCoord,
-        move_position: classes.AbsoluteCoord,
+        move_position: classes.RelativeCoord,
         ignore_locations: Iterable[classes.AbsoluteCoord] = (),
         act_full: Iterable[classes.AbsoluteCoord] = (),
 ) -> bool:
@@ -109,34 +102,21 @@ def path_clear(
 
     :param current_board: current board state
     :param current_position: current piece location
-    :param move_position: location to move piece to
+    :param move_position: relative move to check the path of
     :param ignore_locations: locations to ignore in check
     :param act_full: locations to pretend are full
     :return: whether or not hte path is clear
     """
 
-    move_direction = classes.Direction(move_position)
-    # For each square upto the move_position's maximum value:
-    # Max is needed to get the actual amount of spaces the move
-    # traverses, to test each space in between.
-    for x in range(1, max(abs(move_position))):
-        # The relative move amount is the direction of the move
-        # times the number of squares from the start that is being
-        # tested this time
-        relative_position = move_direction.scale(x)
-        test_position = current_position + relative_position
-        # If there's a piece at the test position, and we're not
-        # ignoring it, then there's a piece in the way and the path
-        # is therefore not clear
-        if (current_board[test_position]
-                and test_position not in ignore_locations):
-            return False
-        # If we're pretending the test position is full, then there's
-        # a piece in the way
-        if test_position in act_full:
-            return False
-    # If there's no pieces in the way, the path is clear
-    return True
+    start = classes.square_index(current_position)
+    end = start + move_position.x + 9*move_position.y
+    return _between_clear(
+        current_board,
+        start,
+        end,
+        ignore_locations=ignore_locations,
+        act_full=act_full
+    )
 
 
 def king_can_move(
@@ -149,67 +129,213 @@ def king_can_move(
 
     :param current_board: current board state
     :param coordinates: current and new piece location
-    :param ignore_locations:
-    :param act_full:
+    :param ignore_locations: locations to pretend are empty
+    :param act_full: locations to pretend are full
     """
 
     old_location, new_location = coordinates
-    old_occupant = current_board[old_location]
-    # Test in each direction radiating out from the king, testing
-    # each distance from the king starting at 1.
-    for direction in classes.Direction.valid():
-        # Test for each distance away from the king
-        for distance in classes.RelativeCoord.positive_xy():
-            # If we've moved off the board, stop testing in this
-            # direction
-            try:
-                current_test = new_location + direction.scale(distance)
-            except (ValueError, IndexError):
-                break
-            # If there's a piece on the path, and it has the same
-            # color as the king, then stop testing in this direction
-            if current_board[current_test].same_color(old_occupant):
-                break
-            if current_board[current_test]:
-                # If the piece at this location can attack the king,
-                # then the king is moving into check, and thus cannot
-                # move to where it is
-                if is_movable(
-                        current_board,
-                        (current_test, new_location),
-                        ignore_locations={*ignore_locations, old_location},
-                        act_full={*act_full, new_location}
-                ):
-                    return False
-                # Otherwise, there's a piece in the direction we're
-                # testing, and thus we shouldn't continue, because all
-                # the pieces we test from here on out will fail the
-                # obstruction check
-                else:
+    king_color = current_board[old_location].color
+    target = classes.square_index(new_location)
+    attack_map = current_board.attack_map
+    if attack_map is not None and not ignore_locations and not act_full:
+        return _king_can_move_mapped(
+            attack_map, classes.square_index(old_location), target
+        )
+    # The king's old square is empty once it has moved
+    ignored = _indexes(ignore_locations)
+    ignored.add(classes.square_index(old_location))
+    full = _indexes(act_full)
+    squares = current_board.squares
+    # Look along each line radiating out from the new square, for the
+    # first piece in the way. Only that piece could attack the king
+    # along the line, as everything behind it is blocked.
+    for line in attacks.LINES[target]:
+        for index in line:
+            # Squares that are being vacated don't block anything
+            if index in ignored:
+                continue
+            code = squares[index]
+            # Neither do empty ones, unless we're pretending that they
+            # are full, with a piece which can't attack anything
+            if not code:
+                if index in full:
                     break
-    # Test the knight's moves
-    for move_x, move_y in product((-1, 1), (-1, 1)):
-        # For each space two y-coords away and 1 x-coord (knight's
-        # move):
-        relative_position = classes.RelativeCoord((move_x, 2 * move_y))
-        # If the tested location isn't on the board, don't test it
-        try:
-            absolute_position = classes.AbsoluteCoord(
-                new_location + relative_position
+                continue
+            # If the piece isn't the king's, and it can reach the new
+            # square, then the king would be moving into check
+            attacker = classes.code_piece(code)
+            if (not attacker.is_color(king_color)
+                    and target in attacks.TARGETS[code][index]):
+                return False
+            break
+    # Test the moves which don't follow a line (knights), which can
+    # attack the king whatever is in between
+    for index, code in attacks.JUMPERS[target]:
+        if squares[index] == code and index not in ignored:
+            if not classes.code_piece(code).is_color(king_color):
+                return False
+    return True
+
+
+def places_attacking(
+        current_board: classes.Board,
+        location: classes.AbsoluteCoord,
+        attacking_color: classes.Color,
+) -> classes.CoordSet:
+    """Find every piece of a color which attacks a location.
+
+    :param current_board: current board state
+    :param location: location being attacked
+    :param attacking_color: color of the attacking pieces
+    :return: set of coordinates attacking the location
+    """
+
+    target = classes.square_index(location)
+    if current_board.attack_map is not None:
+        return {
+            classes.index_square(x)
+            for x in current_board.attack_map.attackers_of(
+                target, int(attacking_color)
             )
-        except (ValueError, IndexError):
-            continue
-        # If the piece at the tested location is the same color as the
-        # king, then it can't move there
-        if current_board[absolute_position].same_color(old_occupant):
-            continue
-        # If any piece can move to where the king is, then it's check
-        # and the king can't move there
-        if is_movable(
-                current_board,
-                (absolute_position, new_location),
-                ignore_locations=set(old_location),
-                act_full=set(new_location)
-        ):
+        }
+    squares = current_board.squares
+    attacking: classes.CoordSet = set()
+    # Along each line, only the first piece can possibly attack
+    for line in attacks.LINES[target]:
+        for index in line:
+            code = squares[index]
+            if not code:
+                continue
+            if (classes.code_piece(code).is_color(attacking_color)
+                    and target in attacks.TARGETS[code][index]):
+                attacking.add(classes.index_square(index))
+            break
+    # Knights jump over everything in the way
+    for index, code in attacks.JUMPERS[target]:
+        if squares[index] == code:
+            if classes.code_piece(code).is_color(attacking_color):
+                attacking.add(classes.index_square(index))
+    return attacking
+
+
+def pinned_pieces(
+        current_board: classes.Board,
+        king_color: classes.Color,
+) -> Dict[classes.AbsoluteCoord, classes.CoordSet]:
+    """Find the pieces which are pinned to their king.
+
+    This is the same logic as unmoved_can_check, run once for the
+    whole board instead of once per moved piece: a piece is pinned if
+    it is the only thing between its king and an enemy piece that
+    would otherwise attack the king along that line.
+
+    :param current_board: current board state
+    :param king_color: color of the king (and the pinned pieces)
+    :return: pinned location -> spaces it may still move to
+    """
+
+    pinned: Dict[classes.AbsoluteCoord, classes.CoordSet] = {}
+    king_location = current_board.get_king(king_color)
+    if king_location is None:
+        return pinned
+    king_index = classes.square_index(king_location)
+    squares = current_board.squares
+    for line in attacks.LINES[king_index]:
+        blocker = None
+        for index in line:
+            code = squares[index]
+            if not code:
+                continue
+            piece = classes.code_piece(code)
+            # The first of the king's own pieces might be pinned
+            if blocker is None and piece.is_color(king_color):
+                blocker = index
+                continue
+            # The first piece after it pins it, if it could attack the
+            # king with the blocker gone
+            if (blocker is not None
+                    and not piece.is_color(king_color)
+                    and king_index in attacks.TARGETS[code][index]):
+                pinned[classes.index_square(blocker)] = {
+                    classes.index_square(x)
+                    for x in (*attacks.BETWEEN[king_index][index], index)
+                }
+            break
+    return pinned
+
+
+def _king_can_move_mapped(
+        attack_map: classes.AttackMap,
+        start: int,
+        end: int,
+) -> bool:
+    """Check if king is moving into check, using an attack map.
+
+    :param attack_map: attack map of the board
+    :param start: index the king moves from
+    :param end: index the king moves to
+    :return: if the king can move there
+    """
+
+    squares = attack_map.squares
+    enemy = 1 - ((squares[start] - 1) >> 4)
+    if attack_map.is_attacked(end, enemy):
+        return False
+    # The king can't step away from a slider along its line, as the
+    # king no longer blocks the square behind it
+    return not any(
+        start in attacks.BETWEEN[x][end]
+        and end in attacks.TARGETS[squares[x]][x]
+        for x in attack_map.attackers_of(start, enemy)
+    )
+
+
+def _between_clear(
+        current_board: classes.Board,
+        start: int,
+        end: int,
+        ignore_locations: classes.CoordOrIter = (),
+        act_full: classes.CoordOrIter = (),
+) -> bool:
+    """Check if the squares between two others are empty.
+
+    :param current_board: current board state
+    :param start: index of the first square
+    :param end: index of the second square
+    :param ignore_locations: locations to pretend are empty
+    :param act_full: locations to pretend are full
+    :return: whether or not the path is clear
+    """
+
+    squares = current_board.squares
+    for index in attacks.BETWEEN[start][end]:
+        test_position = classes.index_square(index)
+        # If there's a piece at the test position, and we're not
+        # ignoring it, then there's a piece in the way and the path
+        # is therefore not clear
+        if squares[index] and test_position not in ignore_locations:
+            return False
+        # If we're pretending the test position is full, then there's
+        # a piece in the way
+        if test_position in act_full:
             return False
+    # If there's no pieces in the way, the path is clear
     return True
+
+
+def _indexes(locations: classes.CoordOrIter) -> Set[int]:
+    """Turn locations into the set of their mailbox indices.
+
+    :param locations: location or locations to convert
+    :raises TypeError: something other than a location
+    :return: set of indices
+    """
+
+    if isinstance(locations, classes.AbsoluteCoord):
+        return {classes.square_index(locations)}
+    indexes = set()
+    for x in locations:
+        if not isinstance(x, classes.AbsoluteCoord):
+            raise TypeError(f"Expected AbsoluteCoord, got {type(x)}")
+        indexes.add(classes.square_index(x))
+    return indexes
@@ -1,14 +1,23 @@
-from typing import Iterable, Optional, Set
+import re
+from typing import Optional, Set
 
 from shogi import classes
-from .move import is_movable
+from .generate import generate_moves
+from .move import is_movable, places_attacking
 
 __all__ = [
     "to_notation",
+    "parse_notation",
     "piece_can_move",
     "notation_str",
 ]
 
+# Piece (upper case if promoted), partial start (row, then column),
+# dash, end, promotion and check
+_NOTATION = re.compile(
+    r"([plnsgbrkPLNSBR])([a-i]?)([1-9]?)([-x*])([a-i][1-9])([\^=]?)([+#]?)"
+)
+
 
 def to_notation(
         current_board: classes.Board,
@@ -46,8 +55,10 @@ def to_notation(
     else:
         other_pieces = piece_can_move(
             current_board, piece, new_location,
-            ignore_locations=new_location
+            ignore_locations={new_location}
         )
+        # Before the move, the piece itself is one of them
+        other_pieces -= {old_location}
     # First bit of notation is the notation for the piece
     notation = piece_notation
     # After comes notation differentiating it from all the other
@@ -89,12 +100,65 @@ def notation_str(
     )
 
 
+def parse_notation(
+        current_board: classes.Board,
+        text: str,
+        trusted: bool = False,
+) -> classes.MoveRecord:
+    """Turn a move in notation (see to_notation) back into a move.
+
+    The piece moved is found from the pieces attacking the end square
+    (see places_attacking), narrowed down by the partial start if
+    there is one. Check and mate markers are allowed, but not checked.
+
+    :param current_board: board the move is to be made on
+    :param text: the move, such as px-c4^+
+    :param trusted: if the move is assumed legal, rather than checked
+    :raises ValueError: invalid, ambiguous or illegal move
+    :return: the move
+    """
+
+    match = _NOTATION.fullmatch(text.strip())
+    if match is None:
+        raise ValueError(f"Invalid notation: {text!r}")
+    rank, row, column, dash, end, promote, _ = match.groups()
+    player = current_board.current_player
+    end = classes.AbsoluteCoord(end)
+    code = (1 + classes.BASE_RANKS.index(rank.lower())
+            + 8*rank.isupper() + 16*int(player))
+    is_promote = {'': None, '^': True, '=': False}[promote]
+    if dash == '*':
+        if row or column or rank.isupper():
+            raise ValueError(f"Invalid drop: {text!r}")
+        move = classes.MoveRecord(None, end, classes.code_piece(code))
+    else:
+        squares = current_board.squares
+        starts = [
+            x for x in places_attacking(current_board, end, player)
+            if squares[classes.square_index(x)] == code
+            and row in ('', x.y_str) and column in ('', x.x_str)
+        ]
+        if len(starts) != 1:
+            raise ValueError(
+                f"{'Ambiguous' if starts else 'Impossible'} move: {text!r}"
+            )
+        captured = current_board[end]
+        if not trusted and (dash == 'x') != bool(captured):
+            raise ValueError(f"Wrong capture marker: {text!r}")
+        move = classes.MoveRecord(
+            starts[0], end, current_board[starts[0]], captured, is_promote
+        )
+    if not trusted and move not in generate_moves(current_board):
+        raise ValueError(f"Illegal move: {text!r}")
+    return move
+
+
 def piece_can_move(
         current_board: classes.Board,
         piece: classes.Piece,
         to: classes.AbsoluteCoord,
-        ignore_locations: Iterable[classes.AbsoluteCoord] = (),
-        act_full: Iterable[classes.AbsoluteCoord] = (),
+        ignore_locations: classes.CoordOrIter = (),
+        act_full: classes.CoordOrIter = (),
 ) -> Set[classes.AbsoluteCoord]:
     """Get list of pieces of the same rank which can move
     to a certain location.
@@ -106,7 +170,11 @@ def piece_can_move(
     :param act_full: locations to pretend are full
     :return: list of possible spaces
     """
-    if piece in current_board.pieces.items():
+    if isinstance(ignore_locations, classes.AbsoluteCoord):
+        ignore_locations = {ignore_locations}
+    if isinstance(act_full, classes.AbsoluteCoord):
+        act_full = {act_full}
+    if piece in current_board.pieces.values():
         return {x for x, y in current_board.pieces.items()
                 if y == piece
                 and is_movable(
@@ -0,0 +1,124 @@
+from typing import Dict, NamedTuple, Optional
+
+from shogi import classes
+from shogi.classes import attacks
+from .move import king_can_move, pinned_pieces, places_attacking
+
+__all__ = [
+    "KingSafety",
+    "king_safety",
+]
+
+
+class KingSafety(NamedTuple):
+    """Everything about a king's safety, worked out once per position.
+
+    Rather than asking, for every move, whether it would leave the
+    king in check, this is worked out once for the position, and each
+    move is then checked against it.
+
+    :ivar key: Zobrist key of the position it was worked out for
+    :ivar king_color: color of the king
+    :ivar king: location of the king (None if there isn't one)
+    :ivar checkers: locations of the pieces checking the king
+    :ivar pinned: pinned location -> spaces it may still move to
+    :ivar escapes: spaces the king may move to
+    :ivar blocks: spaces any other move must end on to stop check
+        (None if the king is not in check)
+    """
+    key: int
+    king_color: classes.Color
+    king: Optional[classes.AbsoluteCoord]
+    checkers: classes.CoordSet
+    pinned: Dict[classes.AbsoluteCoord, classes.CoordSet]
+    escapes: classes.CoordSet
+    blocks: Optional[classes.CoordSet]
+
+    def is_current(self, current_board: classes.Board) -> bool:
+        """Check if this is still right for a board.
+
+        Any change to the board changes its Zobrist key, so this is
+        out of date as soon as the board changes.
+
+        :param current_board: board to check against
+        :return: if this was worked out for the board as it is
+        """
+        return self.key == current_board.zobrist_key
+
+    def allows(
+            self,
+            start: classes.AbsoluteCoord,
+            end: classes.AbsoluteCoord
+    ) -> bool:
+        """Check if a move keeps the king out of check.
+
+        The move itself is assumed to be one the piece can make.
+
+        :param start: location moved from
+        :param end: location moved to
+        :return: if the king is safe after the move
+        """
+        if start == self.king:
+            return end in self.escapes
+        if self.blocks is not None and end not in self.blocks:
+            return False
+        return start not in self.pinned or end in self.pinned[start]
+
+
+def king_safety(
+        current_board: classes.Board,
+        king_color: classes.Color = None,
+        safety: Optional[KingSafety] = None
+) -> KingSafety:
+    """Work out the safety of a king.
+
+    If a KingSafety is given, and it is still current for the board,
+    it is returned as it is, so callers can pass along what they have
+    without worrying about whether the board has since changed.
+
+    :param current_board: current board state
+    :param king_color: color of the king (default: current player)
+    :param safety: safety already worked out, if any
+    :return: safety of the king
+    """
+
+    if king_color is None:
+        king_color = current_board.current_player
+    if (safety is not None and safety.is_current(current_board)
+            and safety.king_color == king_color):
+        return safety
+    king = current_board.get_king(king_color)
+    key = current_board.zobrist_key
+    if king is None:
+        return KingSafety(key, king_color, None, set(), {}, set(), None)
+    checkers = places_attacking(current_board, king, king_color.other)
+    pinned = pinned_pieces(current_board, king_color)
+    # Squares the king can move to without moving into check
+    escapes: classes.CoordSet = set()
+    king_index = classes.square_index(king)
+    squares = current_board.squares
+    for target in attacks.TARGETS[squares[king_index]][king_index]:
+        code = squares[target]
+        if code and (code - 1) >> 4 == int(king_color):
+            continue
+        location = classes.index_square(target)
+        if king_can_move(current_board, (king, location)):
+            escapes.add(location)
+    blocks: Optional[classes.CoordSet] = None
+    if len(checkers) == 1:
+        # The only moves out of a single check (except the king's)
+        # capture the checking piece, or get in the way of it
+        check_location = next(iter(checkers))
+        blocks = {
+            classes.index_square(x)
+            for x in attacks.BETWEEN[king_index][
+                classes.square_index(check_location)
+            ]
+        }
+        blocks.add(check_location)
+    elif checkers:
+        # Double check: only the king may move
+        blocks = set()
+    return KingSafety(
+        key, king_color, king, checkers, pinned, escapes, blocks
+    )
@@ -1,6 +1,6 @@
+from typing import Optional
+
 from shogi import classes
-from .drop import is_legal_drop
-from .fullmove import check_move
 
 __all__ = [
     "undo_move",
@@ -9,38 +9,24 @@ __all__ = [
 
 def undo_move(
         current_board: classes.Board,
-        move: classes.Move
-):
-    """Undo given move.
+        move: Optional[classes.Move] = None
+) -> classes.UndoRecord:
+    """Undo the last move made on the board.
+
+    The move must have been made with Board.make, which keeps the
+    record needed to put everything back exactly as it was, so nothing
+    has to be re-checked.
 
     :param current_board: current board state
-    :param move: move to undo
+    :param move: move to undo (if given, must be the last one made)
+    :raises ValueError: no move to undo, or move isn't the last one
+    :return: undo record of the move
     """
-    if move.is_drop:
-        # If the move is a drop, un-drop it, and then test if it is a
-        # legal drop to be made. If it isn't, put it back and raise an
-        # error
-        current_board.un_drop(move.end)
-        if not is_legal_drop(
-            current_board,
-            move.piece,
-            move.end
-        ):
-            current_board.put_in_play(move.piece, move.end)
-            raise ValueError("Undone drop must be legal")
-    else:
-        # If the move is not a drop, but a move, move it back to
-        # whence it came, and then test to see if the reverse was a
-        # legal move. If it wasn't, put it back and raise an error
-        if current_board[move.start]:
-            raise ValueError("Undone move must be legal")
-        current_board.move(move.end, move.start)
-        # If the move ended in promotion, un-promote the piece
-        # If the move was a capture, put the captured piece back on
-        # the board
-        if move.is_capture:
-            current_board.put_in_play(move.captured_piece, move.end)
-        can_move = check_move(current_board, (move.start, move.end))
-        if not can_move:
-            current_board.move(move.start, move.end)
-            raise ValueError("Undone move must be legal")
+    if not current_board.history:
+        raise ValueError("There is no move to undo")
+    last_move = current_board.history[-1]
+    if move is not None and (move.start, move.end) != (
+            last_move.start, last_move.end
+    ):
+        raise ValueError("Undone move must be the last move made")
+    return current_board.unmake()
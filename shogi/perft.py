@@ -0,0 +1,311 @@
+"""Perft: count the positions reachable in a number of moves.
+
+Counting every leaf of the move tree to a fixed depth, and comparing
+the counts with known-good ones, is the standard way of checking a
+move generator; timing the count measures how fast it is. Run it as
+
+    python -m shogi.perft --depth 3
+    python -m shogi.perft --depth 2 --position position.json --divide
+    python -m shogi.perft --check 4
+    python -m shogi.perft --depth 5 --workers 8
+
+A position file is either a dict in the layout of board.json, or a
+dict with that under "pieces", plus optional "captured" (color -> list
+of ranks in hand) and "turn" (color to move) entries.
+"""
+
+import argparse
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from shogi import classes
+from shogi.functions import generate_moves
+
+__all__ = [
+    "START_COUNTS",
+    "perft",
+    "divide",
+    "parallel_perft",
+    "parallel_divide",
+    "load_position",
+    "move_name",
+    "main",
+]
+
+START_COUNTS: Dict[int, int] = {
+    1: 30,
+    2: 900,
+    3: 25470,
+    4: 719731,
+    5: 19861490,
+}
+"""Known perft counts from the standard start position, by depth."""
+
+
+def perft(current_board: classes.Board, depth: int) -> int:
+    """Count the leaf nodes of the legal move tree.
+
+    The board is restored to its original state afterwards.
+
+    :param current_board: board to count from
+    :param depth: number of moves (plies) to look ahead
+    :return: number of positions at that depth
+    """
+
+    if depth <= 0:
+        return 1
+    # At the last ply, the moves themselves are the leaves
+    if depth == 1:
+        return sum(1 for _ in generate_moves(current_board))
+    nodes = 0
+    for move in list(generate_moves(current_board)):
+        current_board.make(move)
+        nodes += perft(current_board, depth - 1)
+        current_board.unmake()
+    return nodes
+
+
+def divide(
+        current_board: classes.Board,
+        depth: int
+) -> List[Tuple[classes.MoveRecord, int]]:
+    """Count the leaf nodes under each move of the position.
+
+    :param current_board: board to count from
+    :param depth: number of moves to look ahead, including the first
+    :return: each first move and the count below it
+    """
+
+    counts = []
+    for move in list(generate_moves(current_board)):
+        current_board.make(move)
+        counts.append((move, perft(current_board, depth - 1)))
+        current_board.unmake()
+    return counts
+
+
+def parallel_perft(
+        current_board: classes.Board,
+        depth: int,
+        workers: int
+) -> int:
+    """Count the leaf nodes of the legal move tree, in parallel.
+
+    :param current_board: board to count from
+    :param depth: number of moves (plies) to look ahead
+    :param workers: number of processes to count with
+    :return: number of positions at that depth
+    """
+
+    if depth <= 1 or workers <= 1:
+        return perft(current_board, depth)
+    return sum(x for _, x in parallel_divide(current_board, depth, workers))
+
+
+def parallel_divide(
+        current_board: classes.Board,
+        depth: int,
+        workers: int
+) -> List[Tuple[classes.MoveRecord, int]]:
+    """Count the leaf nodes under each move, in parallel.
+
+    The positions after the first moves (or after the first two, if
+    there are too few first moves to keep every process busy) are
+    packed with Board.pack, and counted by a pool of processes.
+
+    :param current_board: board to count from
+    :param depth: number of moves to look ahead, including the first
+    :param workers: number of processes to count with
+    :return: each first move and the count below it
+    """
+
+    moves = list(generate_moves(current_board))
+    if depth <= 1 or workers <= 1:
+        return divide(current_board, depth)
+    # Each task is the first move it is under, a position, and the
+    # depth left to count from it
+    tasks = []
+    for number, move in enumerate(moves):
+        current_board.make(move)
+        if depth > 2 and len(moves) < 4 * workers:
+            for reply in list(generate_moves(current_board)):
+                current_board.make(reply)
+                tasks.append((number, current_board.pack(), depth - 2))
+                current_board.unmake()
+        else:
+            tasks.append((number, current_board.pack(), depth - 1))
+        current_board.unmake()
+    counts = [0] * len(moves)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(
+            _perft_packed,
+            [x for _, x, _ in tasks],
+            [x for _, _, x in tasks],
+            chunksize=max(len(tasks) // (8 * workers), 1)
+        )
+        for (number, _, _), count in zip(tasks, results):
+            counts[number] += count
+    return list(zip(moves, counts))
+
+
+def load_position(file_name: str) -> classes.Board:
+    """Load a board from a position file.
+
+    :param file_name: path of the JSON position file
+    :raises ValueError: invalid position
+    :return: the board
+    """
+
+    with open(file_name) as f:
+        position = json.load(f)
+    if "pieces" not in position:
+        position = {"pieces": position}
+    new_board = classes.Board(position["pieces"])
+    for color, ranks in position.get("captured", {}).items():
+        color = classes.Color(color)
+        for rank in ranks:
+            new_board.add_captured(classes.Piece(rank, color))
+    if "turn" in position:
+        new_board.current_player = classes.Color(position["turn"])
+    if new_board.get_king(new_board.current_player.other) is None:
+        raise ValueError("The player not to move has no king")
+    return new_board
+
+
+def move_name(move: classes.MoveRecord) -> str:
+    """Get the name of a move, for divide output.
+
+    Board moves are the start and end squares, followed by ^ if the
+    piece promotes and = if it could have but didn't. Drops are the
+    piece, *, then the square.
+
+    :param move: move to name
+    :return: name of the move
+    """
+
+    if move.is_drop:
+        return f"{move.piece.rank}*{move.end}"
+    suffix = {None: "", True: "^", False: "="}[move.is_promote]
+    return f"{move.start}{move.end}{suffix}"
+
+
+def main(args: Optional[Iterable[str]] = None) -> int:
+    """Run perft from the command line.
+
+    :param args: command-line arguments (sys.argv if None)
+    :return: exit status
+    """
+
+    parser = argparse.ArgumentParser(
+        prog="python -m shogi.perft",
+        description="Count the leaf nodes of the legal move tree."
+    )
+    parser.add_argument(
+        "--depth", type=int, default=3, help="number of plies to count"
+    )
+    parser.add_argument(
+        "--position", help="JSON position file (default: start position)"
+    )
+    parser.add_argument(
+        "--divide", action="store_true",
+        help="print the count under each first move"
+    )
+    parser.add_argument(
+        "--check", type=int, metavar="DEPTH",
+        help="compare the start position with the known counts, "
+             "up to DEPTH"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=1,
+        help="number of processes to count with"
+    )
+    options = parser.parse_args(args)
+    if options.check is not None:
+        return _check(options.check, options.workers)
+    if options.position is None:
+        current_board = classes.Board()
+    else:
+        current_board = load_position(options.position)
+    start = time.perf_counter()
+    if options.divide:
+        counts = parallel_divide(
+            current_board, options.depth, options.workers
+        )
+        for move, count in sorted(counts, key=lambda x: move_name(x[0])):
+            print(f"{move_name(move)}: {count}")
+        nodes = sum(x for _, x in counts)
+        print(f"\nMoves: {len(counts)}")
+    else:
+        nodes = parallel_perft(
+            current_board, options.depth, options.workers
+        )
+    _report(options.depth, nodes, time.perf_counter() - start)
+    return 0
+
+
+def _check(max_depth: int, workers: int = 1) -> int:
+    """Compare the start position's counts with START_COUNTS.
+
+    :param max_depth: deepest depth to check
+    :param workers: number of processes to count with
+    :return: exit status (1 if any count is wrong)
+    """
+
+    failed = False
+    for depth in range(1, max_depth + 1):
+        if depth not in START_COUNTS:
+            break
+        start = time.perf_counter()
+        nodes = parallel_perft(classes.Board(), depth, workers)
+        elapsed = time.perf_counter() - start
+        expected = START_COUNTS[depth]
+        status = "ok" if nodes == expected else f"FAIL (expected {expected})"
+        print(f"depth {depth}: {nodes} {status} "
+              f"[{_rate(nodes, elapsed)} nodes/s]")
+        failed = failed or nodes != expected
+    return int(failed)
+
+
+def _perft_packed(data: bytes, depth: int) -> int:
+    """Count the leaf nodes below a packed position.
+
+    This is what each process of parallel_divide runs.
+
+    :param data: position, from Board.pack
+    :param depth: number of moves to look ahead
+    :return: number of positions at that depth
+    """
+
+    return perft(classes.Board.unpack(data), depth)
+
+
+def _report(depth: int, nodes: int, elapsed: float):
+    """Print the result of a perft run.
+
+    :param depth: depth counted to
+    :param nodes: number of leaf nodes
+    :param elapsed: time taken, in seconds
+    """
+
+    print(f"Depth: {depth}")
+    print(f"Nodes: {nodes}")
+    print(f"Time: {elapsed:.3f}s")
+    print(f"Nodes/s: {_rate(nodes, elapsed)}")
+
+
+def _rate(nodes: int, elapsed: float) -> int:
+    """Get the number of nodes per second.
+
+    :param nodes: number of nodes
+    :param elapsed: time taken, in seconds
+    :return: nodes per second
+    """
+
+    return int(nodes / elapsed) if elapsed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,652 @@
+"""Reading and writing game records, in the KIF and CSA formats.
+
+KIF is the Japanese text format most shogi programs save games in,
+and CSA the format of the Computer Shogi Association, used by engines
+and game servers. A reader works through the lines of a record one at
+a time, making each move on its board and then yielding it, so large
+archives are replayed in constant memory:
+
+    with open("game.kif", encoding="cp932") as f:
+        reader = KifReader(f, trusted=True)
+        for move in reader:
+            stats = db.lookup(reader.board.zobrist_key)
+
+Readers check every move is legal, unless made with trusted=True, in
+which case moves are made just as they are written (which is much
+faster, but an illegal move leaves the board in a nonsense state).
+Writers take the moves as MoveRecords, as the readers yield them.
+
+Both formats name squares by file then rank: square x + 9*y of the
+mailbox is file 9 - x, rank y + 1. Color 0, who moves first, is sente
+("+" in CSA, 先手 in KIF).
+"""
+
+import re
+from abc import ABC, abstractmethod
+from typing import (
+    Dict, Generator, Iterable, Iterator, List, Optional, TextIO, Tuple,
+)
+
+from shogi import classes
+from shogi.functions import generate_moves
+
+__all__ = [
+    "CsaReader",
+    "KifReader",
+    "write_csa",
+    "write_kif",
+]
+
+# CSA piece names, and the SFEN letters (of color 0) of each
+_CSA_PIECES: Dict[str, str] = {
+    "FU": "P", "KY": "L", "KE": "N", "GI": "S", "KI": "G", "KA": "B",
+    "HI": "R", "OU": "K", "TO": "+P", "NY": "+L", "NK": "+N", "NG": "+S",
+    "UM": "+B", "RY": "+R",
+}
+_CSA_NAMES: Dict[str, str] = {y: x for x, y in _CSA_PIECES.items()}
+
+# KIF piece names; BOD diagrams use the one-character names
+_KIF_PIECES: Dict[str, str] = {
+    "歩": "P", "香": "L", "桂": "N", "銀": "S", "金": "G", "角": "B",
+    "飛": "R", "玉": "K", "王": "K", "と": "+P", "成香": "+L", "杏": "+L",
+    "成桂": "+N", "圭": "+N", "成銀": "+S", "全": "+S", "馬": "+B",
+    "龍": "+R", "竜": "+R",
+}
+_KIF_NAMES: Dict[str, str] = {
+    "P": "歩", "L": "香", "N": "桂", "S": "銀", "G": "金", "B": "角",
+    "R": "飛", "K": "玉", "+P": "と", "+L": "成香", "+N": "成桂",
+    "+S": "成銀", "+B": "馬", "+R": "龍",
+}
+_BOD_NAMES: Dict[str, str] = {
+    **_KIF_NAMES, "+L": "杏", "+N": "圭", "+S": "全",
+}
+_FILES: str = "１２３４５６７８９"
+_RANKS: str = "一二三四五六七八九"
+_KIF_MOVE = re.compile(
+    r"\s*\d+\s+(同|[１-９][一二三四五六七八九])\s*"
+    r"(成香|成桂|成銀|[歩香桂銀金角飛玉王と杏圭全馬龍竜])"
+    r"(不成|成|打)?(?:\((\d)(\d)\))?"
+)
+_KIF_MOVES_HEADER: str = "手数----指手---------消費時間--"
+# The order pieces in hand are listed in, and how many of each a game
+# has (for CSA's "AL": all the rest)
+_HAND_ORDER: str = "RBGSNLP"
+_PIECE_COUNTS: Dict[str, int] = {
+    "R": 2, "B": 2, "G": 4, "S": 4, "N": 4, "L": 4, "P": 18,
+}
+
+
+class _RecordReader(ABC):
+    """A reader of one game of a record, a move at a time.
+
+    :ivar board: board the moves are made on
+    :ivar info: the record's header (keys as in the file)
+    :ivar trusted: if moves are made without checking them
+    """
+
+    def __init__(
+            self,
+            lines: Iterable[str],
+            board: Optional[classes.Board] = None,
+            trusted: bool = False
+    ):
+        """Read the header of a record, up to its first move.
+
+        :param lines: lines of the record (such as an open file)
+        :param board: board to make the moves on, at the game's start
+            (None to set one up from the record)
+        :param trusted: if moves are made without checking them
+        :raises ValueError: invalid or unsupported header
+        """
+
+        self._lines: Iterator[str] = (x.rstrip("\r\n") for x in lines)
+        # The first line after the header, if it was read already
+        self._pending: Optional[str] = None
+        self.info: Dict[str, str] = {}
+        self.trusted: bool = trusted
+        position = self._read_header()
+        if board is None:
+            board = classes.Board.from_sfen(position or classes.START_SFEN)
+        self.board: classes.Board = board
+
+    def __iter__(self) -> Generator[classes.MoveRecord, None, None]:
+        return self._read_moves()
+
+    def _move_lines(self) -> Generator[str, None, None]:
+        """Yield the lines after the header.
+
+        :return: the lines
+        """
+
+        if self._pending is not None:
+            yield self._pending
+            self._pending = None
+        yield from self._lines
+
+    @abstractmethod
+    def _read_header(self) -> Optional[str]:
+        """Read the header, leaving the lines at the first move.
+
+        :return: SFEN of the start position (None for the usual one)
+        """
+
+    @abstractmethod
+    def _read_moves(self) -> Generator[classes.MoveRecord, None, None]:
+        """Make and yield each move, until the end of the game.
+
+        :return: the moves
+        """
+
+    def _make(
+            self,
+            text: str,
+            start: Optional[int],
+            end: int,
+            letters: str,
+            promote: bool
+    ) -> classes.MoveRecord:
+        """Make a move read from the record.
+
+        :param text: the move as written, for errors
+        :param start: index moved from (None for a drop)
+        :param end: index moved to
+        :param letters: SFEN letters (of color 0) of the piece moved
+        :param promote: if the piece promotes
+        :raises ValueError: illegal move, unless trusted
+        :return: the move
+        """
+
+        board = self.board
+        end_location = classes.index_square(end)
+        if start is None:
+            code = classes.SFEN_CODES[
+                letters if not int(board.current_player) else letters.lower()
+            ]
+            move = classes.MoveRecord(
+                None, end_location, classes.code_piece(code)
+            )
+        else:
+            piece = board.piece_at(start)
+            if not self.trusted:
+                if classes.SFEN_LETTERS[piece.code].upper() != letters:
+                    raise ValueError(f"Wrong piece moved: {text!r}")
+            zone = classes.PROMOTION_ZONES[int(piece.color)]
+            could_promote = (
+                piece.is_promotable and not piece.is_promoted
+                and (zone >> start | zone >> end) & 1
+            )
+            move = classes.MoveRecord(
+                classes.index_square(start), end_location, piece,
+                board.piece_at(end),
+                promote if could_promote or promote else None
+            )
+        if not self.trusted and move not in generate_moves(board):
+            raise ValueError(f"Illegal move: {text!r}")
+        board.make(move)
+        return move
+
+
+class CsaReader(_RecordReader):
+    """A reader of one game of a CSA record.
+
+    The record's lines are read up to the end of the game ("/" or a
+    "%" line), so a file of several games can be read by making
+    another reader of the same file.
+    """
+
+    def _read_header(self) -> Optional[str]:
+        cells: Optional[List[str]] = None
+        hands: List[str] = []
+        turn = 'b'
+        for line in self._lines:
+            if line.startswith("PI"):
+                cells = _start_cells()
+                # Pieces taken off for a handicap
+                for x in range(2, len(line) - 3, 4):
+                    cells[_csa_square(line[x:x + 2])] = ''
+            elif line[:2] in ("P+", "P-"):
+                cells = cells or [''] * 81
+                for x in range(2, len(line) - 3, 4):
+                    letters = line[x + 2:x + 4]
+                    if letters == "AL":
+                        hands.extend(_rest_of_pieces(cells, hands, line[1]))
+                        continue
+                    letters = _csa_letters(line[1] + letters)
+                    if line[x:x + 2] == "00":
+                        hands.append(letters)
+                    else:
+                        cells[_csa_square(line[x:x + 2])] = letters
+            elif line.startswith("P") and line[1:2].isdigit():
+                cells = cells or [''] * 81
+                y = int(line[1]) - 1
+                for x in range(9):
+                    cell = line[2 + 3*x:5 + 3*x]
+                    if cell.strip() != '*':
+                        cells[x + 9*y] = _csa_letters(cell)
+            elif line.startswith("$"):
+                key, _, value = line.partition(":")
+                self.info[key] = value
+            elif line[:2] in ("N+", "N-"):
+                self.info[line[:2]] = line[2:]
+            elif line in ("+", "-"):
+                turn = "bw"["+-".index(line)]
+                break
+            elif line[:1] in ("+", "-", "%", "/"):
+                self._pending = line
+                break
+        if cells is None:
+            return None
+        return _make_sfen(cells, hands, turn)
+
+    def _read_moves(self) -> Generator[classes.MoveRecord, None, None]:
+        for line in self._move_lines():
+            # A line may hold several statements, such as a move and
+            # the time it took
+            for statement in line.split(","):
+                if statement[:1] in ("%", "/"):
+                    return
+                if statement[:1] not in ("+", "-") or len(statement) != 7:
+                    continue
+                board = self.board
+                if (not self.trusted
+                        and "+-".index(statement[0])
+                        != int(board.current_player)):
+                    raise ValueError(f"Move out of turn: {statement!r}")
+                end = _csa_square(statement[3:5])
+                if statement[5:] not in _CSA_PIECES:
+                    raise ValueError(f"Unknown piece: {statement!r}")
+                letters = _CSA_PIECES[statement[5:]]
+                if statement[1:3] == "00":
+                    yield self._make(statement, None, end, letters, False)
+                    continue
+                start = _csa_square(statement[1:3])
+                # The piece is written as it is after the move
+                promote = (letters.startswith("+")
+                           and not board.piece_at(start).is_promoted)
+                if promote:
+                    letters = letters[1:]
+                yield self._make(statement, start, end, letters, promote)
+
+
+class KifReader(_RecordReader):
+    """A reader of the main line of a KIF record.
+
+    The start position is the usual one (手合割：平手), or a BOD
+    diagram; other handicaps need the board passed in. Reading stops at
+    the end of the game, or the first variation (変化).
+    """
+
+    def _read_header(self) -> Optional[str]:
+        cells: Optional[List[str]] = None
+        rows = 0
+        hands: List[str] = []
+        turn = 'b'
+        for line in self._lines:
+            line = line.lstrip("\ufeff")
+            if line.startswith("|"):
+                cells = cells or [''] * 81
+                for x in range(9):
+                    cell = line[1 + 2*x:3 + 2*x]
+                    if cell[1:] not in _KIF_PIECES:
+                        continue
+                    letters = _KIF_PIECES[cell[1]]
+                    cells[x + 9*rows] = (
+                        letters.lower() if cell[0] == "v" else letters
+                    )
+                rows += 1
+            elif line.startswith(("後手番", "上手番")):
+                turn = 'w'
+            elif line.startswith("手数"):
+                break
+            elif _KIF_MOVE.match(line):
+                self._pending = line
+                break
+            elif "：" in line and not line.startswith(("#", "*")):
+                key, _, value = line.partition("：")
+                self.info[key] = value
+                if key.endswith("の持駒"):
+                    lower = key.startswith(("後手", "上手"))
+                    hands.extend(_kif_hand(value, lower))
+        handicap = self.info.get("手合割", "平手")
+        if cells is None:
+            if not handicap.startswith("平手"):
+                raise ValueError(f"Unsupported handicap: {handicap!r}")
+            return None
+        return _make_sfen(cells, hands, turn)
+
+    def _read_moves(self) -> Generator[classes.MoveRecord, None, None]:
+        last_end: Optional[int] = None
+        for line in self._move_lines():
+            match = _KIF_MOVE.match(line)
+            if match is None:
+                stripped = line.strip()
+                if not stripped or stripped[0] in "*&#":
+                    continue
+                # The result (投了 etc.), a summary or a variation
+                return
+            square, name, suffix, file, rank = match.groups()
+            if square == "同":
+                if last_end is None:
+                    raise ValueError(f"No move to recapture: {line!r}")
+                end = last_end
+            else:
+                end = _square(
+                    _FILES.index(square[0]) + 1, _RANKS.index(square[1]) + 1
+                )
+            letters = _KIF_PIECES[name]
+            if file is None:
+                move = self._make(line, None, end, letters, False)
+            else:
+                start = _square(int(file), int(rank))
+                move = self._make(line, start, end, letters, suffix == "成")
+            last_end = end
+            yield move
+
+
+def write_csa(
+        out: TextIO,
+        moves: Iterable[classes.MoveRecord],
+        board: Optional[classes.Board] = None,
+        info: Optional[Dict[str, str]] = None
+):
+    """Write a game as a CSA record, a move at a time.
+
+    :param out: file to write to
+    :param moves: the moves of the game
+    :param board: position the game starts from (None for the usual
+        one); it is only read
+    :param info: header lines, as CsaReader.info has them
+    """
+
+    out.write("V2.2\n")
+    for key, value in (info or {}).items():
+        out.write(f"{key}:{value}\n" if key.startswith("$")
+                  else f"{key}{value}\n")
+    if board is None or _is_start(board):
+        out.write("PI\n+\n")
+    else:
+        for y in range(9):
+            row = ''.join(
+                _csa_piece(x) if x else " * "
+                for x in board.squares[9*y:9*y + 9]
+            )
+            out.write(f"P{y + 1}{row}\n")
+        for color, sign in ((classes.Color(0), "+"), (classes.Color(1), "-")):
+            hand = board.captured[color]
+            if hand:
+                pieces = ''.join(f"00{_csa_piece(x.code)[1:]}" for x in hand)
+                out.write(f"P{sign}{pieces}\n")
+        out.write("+-"[int(board.current_player)] + "\n")
+    for move in moves:
+        code = move.piece.code
+        if move.is_promote:
+            code = move.piece.promote().code
+        start = "00" if move.is_drop else _csa_coord(move.start)
+        out.write(
+            f"{_csa_piece(code)[0]}{start}{_csa_coord(move.end)}"
+            f"{_csa_piece(code)[1:]}\n"
+        )
+
+
+def write_kif(
+        out: TextIO,
+        moves: Iterable[classes.MoveRecord],
+        board: Optional[classes.Board] = None,
+        info: Optional[Dict[str, str]] = None
+):
+    """Write a game as a KIF record, a move at a time.
+
+    :param out: file to write to
+    :param moves: the moves of the game
+    :param board: position the game starts from (None for the usual
+        one, otherwise written as a BOD diagram); it is only read
+    :param info: header lines, as KifReader.info has them
+    """
+
+    for key, value in (info or {}).items():
+        if key != "手合割" and not key.endswith("の持駒"):
+            out.write(f"{key}：{value}\n")
+    if board is None or _is_start(board):
+        out.write("手合割：平手\n")
+    else:
+        _write_bod(out, board)
+    out.write(_KIF_MOVES_HEADER + "\n")
+    last_end: Optional[classes.AbsoluteCoord] = None
+    for number, move in enumerate(moves, 1):
+        if move.end == last_end:
+            square = "同　"
+        else:
+            file, rank = _file_rank(move.end)
+            square = _FILES[file - 1] + _RANKS[rank - 1]
+        name = _KIF_NAMES[classes.SFEN_LETTERS[move.piece.code].upper()]
+        if move.is_drop:
+            text = f"{square}{name}打"
+        else:
+            suffix = {None: "", True: "成", False: "不成"}[move.is_promote]
+            file, rank = _file_rank(move.start)
+            text = f"{square}{name}{suffix}({file}{rank})"
+        out.write(f"{number:>4} {text}\n")
+        last_end = move.end
+
+
+def _write_bod(out: TextIO, board: classes.Board):
+    """Write a position as a BOD diagram.
+
+    :param out: file to write to
+    :param board: the position
+    """
+
+    out.write(f"後手の持駒：{_kif_hand_str(board, classes.Color(1))}\n")
+    out.write("  ９ ８ ７ ６ ５ ４ ３ ２ １\n")
+    out.write("+---------------------------+\n")
+    for y in range(9):
+        row = ''
+        for code in board.squares[9*y:9*y + 9]:
+            if not code:
+                row += " ・"
+                continue
+            letters = classes.SFEN_LETTERS[code]
+            row += (" " if letters.upper() == letters else "v")
+            row += _BOD_NAMES[letters.upper()]
+        out.write(f"|{row}|{_RANKS[y]}\n")
+    out.write("+---------------------------+\n")
+    out.write(f"先手の持駒：{_kif_hand_str(board, classes.Color(0))}\n")
+    if int(board.current_player):
+        out.write("後手番\n")
+
+
+def _square(file: int, rank: int) -> int:
+    """Get the index of a square from its file and rank.
+
+    :param file: file of the square, 1 to 9
+    :param rank: rank of the square, 1 to 9
+    :return: index of the square
+    """
+    return 9 - file + 9*(rank - 1)
+
+
+def _file_rank(location: classes.AbsoluteCoord) -> Tuple[int, int]:
+    """Get the file and rank of a square.
+
+    :param location: the square
+    :return: file, rank
+    """
+    return 9 - location.x, location.y + 1
+
+
+def _csa_square(text: str) -> int:
+    """Get the index of a square written in CSA.
+
+    :param text: file and rank digits
+    :raises ValueError: not a square
+    :return: index of the square
+    """
+
+    if len(text) != 2 or not text.isdigit() or "0" in text:
+        raise ValueError(f"Invalid square: {text!r}")
+    return _square(int(text[0]), int(text[1]))
+
+
+def _csa_coord(location: classes.AbsoluteCoord) -> str:
+    """Write a square in CSA.
+
+    :param location: the square
+    :return: file and rank digits
+    """
+
+    file, rank = _file_rank(location)
+    return f"{file}{rank}"
+
+
+def _csa_letters(text: str) -> str:
+    """Get the SFEN letters of a piece written in CSA.
+
+    :param text: sign and piece name (such as "-FU")
+    :raises ValueError: not a piece
+    :return: SFEN letters of the piece
+    """
+
+    if text[1:] not in _CSA_PIECES or text[0] not in "+-":
+        raise ValueError(f"Invalid piece: {text!r}")
+    letters = _CSA_PIECES[text[1:]]
+    return letters if text[0] == "+" else letters.lower()
+
+
+def _csa_piece(code: int) -> str:
+    """Write a piece in CSA.
+
+    :param code: code of the piece
+    :return: sign and piece name
+    """
+
+    letters = classes.SFEN_LETTERS[code]
+    sign = "+" if letters.upper() == letters else "-"
+    return sign + _CSA_NAMES[letters.upper()]
+
+
+def _kif_number(text: str) -> int:
+    """Read a number written in kanji, up to 19.
+
+    :param text: the number ('' for 1)
+    :return: the number
+    """
+
+    if not text:
+        return 1
+    tens = 10 if text.startswith("十") else 0
+    rest = text.lstrip("十")
+    return tens + (_RANKS.index(rest) + 1 if rest else 0)
+
+
+def _kif_hand(text: str, lower: bool) -> List[str]:
+    """Read the pieces in a hand, as KIF lists them.
+
+    :param text: the list (such as "飛　歩三"), or なし for none
+    :param lower: if the hand is color 1's
+    :return: SFEN letters of each piece
+    """
+
+    pieces = []
+    for item in text.replace("　", " ").split():
+        if item == "なし":
+            continue
+        letters = _KIF_PIECES[item[0]]
+        pieces.extend(
+            [letters.lower() if lower else letters] * _kif_number(item[1:])
+        )
+    return pieces
+
+
+def _kif_hand_str(board: classes.Board, color: classes.Color) -> str:
+    """Write a hand, as KIF lists them.
+
+    :param board: board with the hand
+    :param color: color of the hand
+    :return: the list
+    """
+
+    counts = {x: 0 for x in _HAND_ORDER}
+    for piece in board.captured[color]:
+        counts[classes.SFEN_LETTERS[piece.code].upper()] += 1
+    items = []
+    for letters, count in counts.items():
+        if count:
+            number = ''
+            if count >= 10:
+                number = "十"
+            if count % 10 and count > 1:
+                number += _RANKS[count % 10 - 1]
+            items.append(_KIF_NAMES[letters] + number)
+    return "　".join(items) or "なし"
+
+
+def _start_cells() -> List[str]:
+    """Get the SFEN letters of each square of the usual start.
+
+    :return: [index] -> letters ('' for empty)
+    """
+
+    cells = []
+    for char in classes.START_SFEN.split()[0].replace("/", ''):
+        cells.extend([''] * int(char) if char.isdigit() else [char])
+    return cells
+
+
+def _rest_of_pieces(
+        cells: List[str],
+        hands: List[str],
+        sign: str
+) -> List[str]:
+    """Get the pieces of a game which aren't on the board or held.
+
+    :param cells: SFEN letters of each square
+    :param hands: SFEN letters of the pieces in hand
+    :param sign: + or -, the color to give the pieces to
+    :return: SFEN letters of the pieces, in that color
+    """
+
+    counts = dict(_PIECE_COUNTS)
+    for letters in (*cells, *hands):
+        rank = letters.lstrip("+").upper()
+        if rank in counts:
+            counts[rank] -= 1
+    return [
+        x if sign == "+" else x.lower()
+        for x in _HAND_ORDER for _ in range(counts[x])
+    ]
+
+
+def _make_sfen(cells: List[str], hands: List[str], turn: str) -> str:
+    """Put a position together as SFEN.
+
+    :param cells: SFEN letters of each square ('' for empty)
+    :param hands: SFEN letters of each piece in hand
+    :param turn: b or w, the side to move
+    :return: the SFEN
+    """
+
+    ranks = []
+    for y in range(9):
+        rank = ''
+        empty = 0
+        for letters in cells[9*y:9*y + 9]:
+            if letters:
+                rank += (str(empty) if empty else '') + letters
+                empty = 0
+            else:
+                empty += 1
+        ranks.append(rank + (str(empty) if empty else ''))
+    hand = ''.join(
+        f"{hands.count(x)}{x}" if hands.count(x) > 1 else x
+        for x in classes.SFEN_HAND_ORDER if x in hands
+    )
+    return f"{'/'.join(ranks)} {turn} {hand or '-'} 1"
+
+
+def _is_start(board: classes.Board) -> bool:
+    """Check if a board is at the usual start position.
+
+    :param board: the board
+    :return: if it is
+    """
+    return board.to_sfen().split()[:3] == classes.START_SFEN.split()[:3]